@@ -0,0 +1,187 @@
+"""Common part of the benchmarks : data coordinator fed with fixtures.
+
+The coordinator of the integration is built as by the integration,
+without Home Assistant running and without server : data comes from
+fixtures, files are in a temporary directory.
+"""
+# Python library
+import json
+import os
+import sys
+import tempfile
+import time
+
+# the integration is imported from the repository
+REPOSITORY_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPOSITORY_DIR not in sys.path:
+    sys.path.insert(0, REPOSITORY_DIR)
+
+from custom_components.worldtidesinfocustom import worldtidesinfo_data_coordinator
+from custom_components.worldtidesinfocustom.const import METRIC_CONF_UNIT
+from custom_components.worldtidesinfocustom.worldtides_data_coordinator import (
+    WordTide_Data_Coordinator,
+)
+from pyworldtidesinfo.worldtidesinfo_server import give_info_from_raw_data
+
+from fixtures import (
+    DEFAULT_FIXTURE_DIR,
+    give_benchmark_time,
+    load_height_data,
+    make_station_data,
+)
+
+BENCHMARK_KEY = "benchmark"
+
+
+class Benchmark_Config:
+    """Home Assistant configuration : files in a temporary directory"""
+
+    def __init__(self):
+        self._config_dir = tempfile.mkdtemp(prefix="worldtidesinfocustom_benchmark_")
+
+    def path(self, *path):
+        return os.path.join(self._config_dir, *path)
+
+
+class Benchmark_Hass:
+    """Home Assistant as used by the coordinator : executor jobs run inline"""
+
+    def __init__(self):
+        self.config = Benchmark_Config()
+        self.data = {}
+
+    async def async_add_executor_job(self, target, *args):
+        return target(*args)
+
+
+class Benchmark_Data_Coordinator(WordTide_Data_Coordinator):
+    """Data coordinator fed with fixtures instead of server"""
+
+    def __init__(
+        self,
+        name,
+        tide_prediction_duration,
+        unit_to_display=METRIC_CONF_UNIT,
+        fixture_dir=DEFAULT_FIXTURE_DIR,
+        hass=None,
+    ):
+        if hass is None:
+            hass = Benchmark_Hass()
+        # same setup as the integration : only data comes from fixtures
+        super().__init__(
+            hass,
+            name,
+            45.6,
+            -1.0,
+            BENCHMARK_KEY,
+            "LAT",
+            "2,102,255",
+            "255,255,255",
+            50,
+            tide_prediction_duration,
+            unit_to_display,
+            False,
+            plot_file_mirror=False,
+        )
+        # data file is not read : fixtures are the data stored
+        self._tide_cache_file_first_update = False
+
+        # data as fetched yesterday and today
+        current_time = give_benchmark_time()
+        today_data = load_height_data(tide_prediction_duration, fixture_dir)
+        yesterday_data = load_height_data(
+            tide_prediction_duration,
+            fixture_dir,
+            today_data["heights"][0]["dt"] - 86400,
+        )
+        self.store_fixture(make_station_data(), yesterday_data, current_time)
+        self.store_fixture(None, today_data, current_time)
+
+    def store_fixture(self, station_data, height_data, request_time):
+        """store data as if fetched from server"""
+        scheduler = self._worldtidesinfo_server_scheduler
+        if station_data is not None:
+            scheduler.store_init_data(station_data, request_time)
+        scheduler.store_new_data(height_data, request_time)
+        datum_content = give_info_from_raw_data(height_data).give_datum()
+        if datum_content.get("error") is None:
+            scheduler._Data_Retrieve.data_datums_offset = datum_content.get("datums")
+
+    def get_fetch_statistics(self):
+        return {}
+
+    def get_plot_statistics(self):
+        return {}
+
+
+def setup_coordinators(station_number, tide_prediction_duration, fixture_dir):
+    """give coordinators of stations, known by the integration"""
+    worldtidesinfo_data_coordinator.clear()
+    hass = Benchmark_Hass()
+    coordinators = []
+    for station_index in range(station_number):
+        name = "benchmark_{}".format(station_index)
+        coordinator = Benchmark_Data_Coordinator(
+            name, tide_prediction_duration, fixture_dir=fixture_dir, hass=hass
+        )
+        worldtidesinfo_data_coordinator[name] = coordinator
+        coordinators.append(coordinator)
+    return coordinators
+
+
+def give_cpu_time(function, repeat=5, number=1):
+    """give CPU time in ms of one call (best of repeat, number calls each)"""
+    best_time = None
+    for repeat_index in range(repeat):
+        start_time = time.process_time()
+        for call_index in range(number):
+            function()
+        cpu_time = (time.process_time() - start_time) * 1000 / number
+        if best_time is None or cpu_time < best_time:
+            best_time = cpu_time
+    return best_time
+
+
+def give_call_count(function):
+    """give the Python calls done by one call (same from run to run)"""
+    call_count = 0
+
+    def count_call(frame, event, arg):
+        nonlocal call_count
+        if event == "call":
+            call_count += 1
+
+    sys.setprofile(count_call)
+    try:
+        function()
+    finally:
+        sys.setprofile(None)
+    return call_count
+
+
+def compare_to_baseline(
+    results, baseline_filename, max_regression, min_delta=0, gated_names=None
+):
+    """give the results slower than baseline by more than max_regression
+
+    a result is not compared if gated_names is given and does not hold it,
+    a slow down smaller than min_delta is noise"""
+    with open(baseline_filename, "r") as file_handler:
+        baseline = json.load(file_handler)
+    regressions = []
+    for name, value in results.items():
+        if gated_names is not None and name not in gated_names:
+            continue
+        reference = baseline.get(name)
+        if reference is None or reference <= 0:
+            continue
+        if value - reference < min_delta:
+            continue
+        if value > reference * (1 + max_regression):
+            regressions.append((name, reference, value))
+    return regressions
+
+
+def save_baseline(results, baseline_filename):
+    with open(baseline_filename, "w") as file_handler:
+        json.dump(results, file_handler, indent=2, sort_keys=True)
@@ -0,0 +1,183 @@
+"""Benchmark of the plots drawn by Plot_Manager.
+
+For each plot (normal and long duration), each prediction (1, 7 and 30
+days) and each background (transparent or opaque), give :
+- wall time of a full plot (static layer and current position),
+- wall time of a plot of the current position only (static layer kept),
+- size of the PNG picture,
+- peak RSS of the process drawing the plot.
+Each case is drawn in its own process, so that peak RSS is its own.
+
+usage: python benchmark/bench_plot.py [--days 1 7 30] [--repeat 5]
+    [--fixture-dir DIR] [--profile DIR]
+    [--save-baseline FILE] [--baseline FILE] [--max-regression 0.25]
+with --profile, a cProfile dump of each case is written in DIR
+(to be read with pstats or snakeviz).
+exit code is 1 if a result is bigger than baseline by more than
+max-regression.
+"""
+# Python library
+import argparse
+import cProfile
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bench_common import compare_to_baseline, save_baseline
+from fixtures import (
+    DEFAULT_FIXTURE_DIR,
+    FIXTURE_DAYS,
+    give_benchmark_time,
+    load_height_data,
+)
+
+from custom_components.worldtidesinfocustom.const import METRIC_CONF_UNIT
+from custom_components.worldtidesinfocustom.plot_mngt import (
+    LONG_DURATION,
+    NORMAL_DURATION,
+    Plot_Manager,
+)
+from pyworldtidesinfo.worldtidesinfo_server import give_info_from_raw_data
+
+PLOT_DURATIONS = [NORMAL_DURATION, LONG_DURATION]
+# name of background : transparent
+PLOT_BACKGROUNDS = {"transparent": True, "opaque": False}
+
+# time between two plots of the current position
+PLOT_OVERLAY_STEP = 60
+
+
+def give_case_name(duration_type, days, background):
+    return "{}/{}d/{}".format(duration_type, days, background)
+
+
+def draw_plots(plot_manager, data, tide_info, current_time, repeat):
+    """give wall times (s) of full plots and of current position plots"""
+    full_times = []
+    overlay_times = []
+    for repeat_index in range(repeat):
+        # other data : static layer drawn again
+        plot_data = dict(data)
+        start_time = time.perf_counter()
+        plot_manager.compute_new_plot(plot_data, current_time, tide_info)
+        full_times.append(time.perf_counter() - start_time)
+
+        # current position moved : static layer kept
+        start_time = time.perf_counter()
+        plot_manager.compute_new_plot(
+            plot_data,
+            current_time + (repeat_index + 1) * PLOT_OVERLAY_STEP,
+            tide_info,
+        )
+        overlay_times.append(time.perf_counter() - start_time)
+    return full_times, overlay_times
+
+
+def bench_case(duration_type, days, background, repeat, fixture_dir, profile_dir):
+    """give results of one case (run in its own process)"""
+    data = load_height_data(days, fixture_dir)
+    tide_info = give_info_from_raw_data(data)
+    current_time = give_benchmark_time()
+    # the normal plot is drawn over one day, as by the coordinator
+    tide_prediction_duration = 1 if duration_type == NORMAL_DURATION else days
+
+    with tempfile.TemporaryDirectory() as picture_dir:
+        plot_manager = Plot_Manager(
+            "benchmark",
+            duration_type,
+            METRIC_CONF_UNIT,
+            tide_prediction_duration,
+            os.path.join(picture_dir, "benchmark.png"),
+            PLOT_BACKGROUNDS[background],
+            file_mirror=False,
+        )
+
+        # first plot : figure created
+        start_time = time.perf_counter()
+        plot_manager.compute_new_plot(data, current_time, tide_info)
+        first_time = time.perf_counter() - start_time
+
+        if profile_dir is None:
+            full_times, overlay_times = draw_plots(
+                plot_manager, data, tide_info, current_time, repeat
+            )
+        else:
+            profiler = cProfile.Profile()
+            full_times, overlay_times = profiler.runcall(
+                draw_plots, plot_manager, data, tide_info, current_time, repeat
+            )
+            profiler.dump_stats(
+                os.path.join(
+                    profile_dir,
+                    "plot_{}_{}d_{}.prof".format(duration_type, days, background),
+                )
+            )
+
+    picture = plot_manager.get_picture().give_picture()
+    case_name = give_case_name(duration_type, days, background)
+    return {
+        case_name + "/first_ms": first_time * 1000,
+        case_name + "/full_ms": min(full_times) * 1000,
+        case_name + "/overlay_ms": min(overlay_times) * 1000,
+        case_name + "/png_bytes": len(picture[1]),
+        # kilobytes on Linux
+        case_name + "/peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, nargs="+", default=FIXTURE_DAYS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--fixture-dir", default=DEFAULT_FIXTURE_DIR)
+    parser.add_argument("--profile")
+    parser.add_argument("--save-baseline")
+    parser.add_argument("--baseline")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    args = parser.parse_args()
+
+    if args.profile is not None:
+        os.makedirs(args.profile, exist_ok=True)
+
+    results = {}
+    for duration_type in PLOT_DURATIONS:
+        for days in args.days:
+            for background in PLOT_BACKGROUNDS:
+                # a new process per case : peak RSS of the case only
+                with ProcessPoolExecutor(
+                    max_workers=1, mp_context=multiprocessing.get_context("spawn")
+                ) as executor:
+                    results.update(
+                        executor.submit(
+                            bench_case,
+                            duration_type,
+                            days,
+                            background,
+                            args.repeat,
+                            args.fixture_dir,
+                            args.profile,
+                        ).result()
+                    )
+
+    for name, value in results.items():
+        print("{:<50} {:>12.1f}".format(name, value))
+
+    failed = False
+    if args.baseline is not None:
+        for name, reference, value in compare_to_baseline(
+            results, args.baseline, args.max_regression
+        ):
+            print("regression : {} {:.1f} -> {:.1f}".format(name, reference, value))
+            failed = True
+    if args.save_baseline is not None:
+        save_baseline(results, args.save_baseline)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
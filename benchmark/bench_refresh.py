@@ -0,0 +1,95 @@
+"""Benchmark of the load of daily refreshes around midnight.
+
+For N stations and each refresh window, the scans from some hours before
+midnight to some hours after are simulated with the scheduler of the
+integration. It gives the peak of stations fetched in one scan interval
+and the peak of executor jobs (data file write and two plots per fetch).
+
+usage: python benchmark/bench_refresh.py [--stations 50] [--windows 0 60 180]
+    [--days 1] [--fixture-dir DIR]
+"""
+# Python library
+import argparse
+import sys
+from datetime import datetime, timedelta
+
+from bench_common import setup_coordinators
+from fixtures import DEFAULT_FIXTURE_DIR
+
+from custom_components.worldtidesinfocustom.const import SCAN_INTERVAL_SECONDS
+from custom_components.worldtidesinfocustom.server_request_scheduler import (
+    give_refresh_offset,
+)
+
+# executor jobs of a fetch : data file write, normal and long plots
+EXECUTOR_JOBS_PER_FETCH = 3
+# simulation from window + margin before midnight to margin after
+SIMULATION_MARGIN = 2 * 3600
+
+
+def simulate_refreshes(coordinators, refresh_window):
+    """give the stations fetched at each scan (time, count)"""
+    next_midnight = datetime.now().replace(
+        hour=0, minute=0, second=0, microsecond=0
+    ) + timedelta(days=1)
+    start_time = next_midnight.timestamp() - refresh_window * 60 - SIMULATION_MARGIN
+    end_time = next_midnight.timestamp() + SIMULATION_MARGIN
+
+    schedulers = []
+    for coordinator in coordinators:
+        scheduler = coordinator._worldtidesinfo_server_scheduler
+        scheduler.set_refresh_offset(
+            give_refresh_offset(coordinator._name, refresh_window * 60)
+        )
+        # last fetch done before the simulation
+        scheduler._Data_Scheduling.last_request_time = start_time - 3600
+        scheduler.setup_next_data_midnight(start_time - 3600)
+        schedulers.append(scheduler)
+
+    fetches = []
+    current_time = start_time
+    while current_time <= end_time:
+        fetch_count = 0
+        for scheduler in schedulers:
+            if scheduler.data_to_be_fetched(False, current_time):
+                fetch_count += 1
+                scheduler.store_new_data(
+                    dict(scheduler._Data_Retrieve.data), current_time
+                )
+                scheduler.setup_next_data_midnight(current_time)
+        fetches.append((current_time, fetch_count))
+        current_time += SCAN_INTERVAL_SECONDS
+    return fetches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=50)
+    parser.add_argument("--windows", type=int, nargs="+", default=[0, 60, 180])
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--fixture-dir", default=DEFAULT_FIXTURE_DIR)
+    args = parser.parse_args()
+
+    print(
+        "{:>14} {:>10} {:>18} {:>18} {:>10}".format(
+            "window (min)", "fetches", "peak fetch/scan", "peak jobs/scan", "peak at"
+        )
+    )
+    for refresh_window in args.windows:
+        coordinators = setup_coordinators(args.stations, args.days, args.fixture_dir)
+        fetches = simulate_refreshes(coordinators, refresh_window)
+        peak_time, peak_count = max(fetches, key=lambda fetch: fetch[1])
+        print(
+            "{:>14} {:>10} {:>18} {:>18} {:>10}".format(
+                refresh_window,
+                sum(fetch_count for fetch_time, fetch_count in fetches),
+                peak_count,
+                peak_count * EXECUTOR_JOBS_PER_FETCH,
+                datetime.fromtimestamp(peak_time).strftime("%H:%M"),
+            )
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
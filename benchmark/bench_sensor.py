@@ -0,0 +1,303 @@
+"""Benchmark of the work done by the sensors at each scan interval.
+
+For 1, 7 and 30 days of prediction, give the CPU time of :
+- each function of sensor_service,
+- each property of each sensor read when its state is written (report only :
+  below the microsecond, too noisy to be compared),
+- one scan interval (tide state + state of all sensors) for N stations,
+  and the Python calls it does.
+
+Neither server nor Home Assistant running is needed.
+
+usage: python benchmark/bench_sensor.py [--stations 10] [--ticks 20]
+    [--days 1 7 30] [--fixture-dir DIR]
+    [--save-baseline FILE] [--baseline FILE] [--max-regression 0.25]
+    [--min-regression-ms 0.01] [--max-tick-ms MS]
+exit code is 1 if a function is slower than baseline (or a scan interval
+does more calls) by more than max-regression and by more than
+min-regression-ms, or if a scan interval takes more than max-tick-ms.
+Scan interval times are only reported : on a shared host they vary by
+more than max-regression.
+"""
+# Python library
+import argparse
+import sys
+
+from bench_common import (
+    compare_to_baseline,
+    give_call_count,
+    give_cpu_time,
+    save_baseline,
+    setup_coordinators,
+)
+from fixtures import DEFAULT_FIXTURE_DIR, FIXTURE_DAYS, give_benchmark_time
+
+from custom_components.worldtidesinfocustom import sensor, sensor_service
+from custom_components.worldtidesinfocustom.const import (
+    METRIC_CONF_UNIT,
+    SCAN_INTERVAL_SECONDS,
+    SENSOR_FORECAST_TIDE_HORIZONS,
+    STATIC_CONF,
+)
+from custom_components.worldtidesinfocustom.live_position_management import (
+    Live_Position_Management,
+)
+
+# calls of a function for one measure
+FUNCTION_CALL_NUMBER = 2000
+
+SENSOR_CLASSES = [
+    sensor.WorldTidesInfoCustomSensor,
+    sensor.WorldTidesInfoCustomSensorCurrentHeight,
+    sensor.WorldTidesInfoCustomSensorForecastHeight,
+    sensor.WorldTidesInfoCustomSensorNextLowTideHeight,
+    sensor.WorldTidesInfoCustomSensorNextLowTideTime,
+    sensor.WorldTidesInfoCustomSensorNextHighTideHeight,
+    sensor.WorldTidesInfoCustomSensorNextHighTideTime,
+    sensor.WorldTidesInfoCustomSensorNextRemainingTideTime,
+    sensor.WorldTidesInfoCustomSensorCurrentAmplitude,
+    sensor.WorldTidesInfoCustomSensorCurrentCoeffMWS,
+    sensor.WorldTidesInfoCustomSensorTideStationInfo,
+    sensor.WorldTidesInfoCustomSensorCreditUsed,
+    sensor.WorldTidesInfoCustomSensorGlobalCreditUsed,
+]
+
+# properties read by Home Assistant when a state is written
+SENSOR_STATE_PROPERTIES = [
+    "name",
+    "unique_id",
+    "native_value",
+    "native_unit_of_measurement",
+    "icon",
+    "extra_state_attributes",
+]
+
+
+def setup_sensors(coordinators):
+    """give all the sensors of the stations"""
+    sensors = []
+    for coordinator in coordinators:
+        live_position_manager = Live_Position_Management(
+            45.6,
+            -1.0,
+            give_benchmark_time(),
+            STATIC_CONF,
+            50,
+            METRIC_CONF_UNIT,
+            None,
+            None,
+            None,
+        )
+        for sensor_class in SENSOR_CLASSES:
+            sensors.append(
+                sensor_class(
+                    None,
+                    coordinator._name,
+                    METRIC_CONF_UNIT,
+                    True,
+                    coordinator,
+                    live_position_manager,
+                    coordinator._name,
+                )
+            )
+    return sensors
+
+
+def give_sensor_service_functions(coordinator, current_time):
+    """give each function of sensor_service with the arguments of a scan"""
+    tide_info, datums_info, init_tide_info = sensor_service.get_all_tide_info(
+        coordinator
+    )
+    convert_meter_to_feet, convert_km_to_miles = sensor_service.convert_to_perform(
+        METRIC_CONF_UNIT
+    )
+    tide_station_name = tide_info.give_tidal_station_used().get("station")
+    return {
+        "get_all_tide_info": lambda: sensor_service.get_all_tide_info(coordinator),
+        "current_height_attribute": lambda: sensor_service.current_height_attribute(
+            tide_info, current_time, convert_meter_to_feet
+        ),
+        "forecast_heights_attribute": lambda: sensor_service.forecast_heights_attribute(
+            tide_info,
+            current_time,
+            SENSOR_FORECAST_TIDE_HORIZONS,
+            convert_meter_to_feet,
+        ),
+        "current_height_state": lambda: sensor_service.current_height_state(
+            tide_info, current_time, convert_meter_to_feet
+        ),
+        "next_tide_attribute": lambda: sensor_service.next_tide_attribute(
+            tide_info, current_time, convert_meter_to_feet
+        ),
+        "next_low_tide_height_state": lambda: sensor_service.next_low_tide_height_state(
+            tide_info, current_time, convert_meter_to_feet
+        ),
+        "next_low_tide_time_state": lambda: sensor_service.next_low_tide_time_state(
+            tide_info, current_time
+        ),
+        "next_high_tide_height_state": lambda: sensor_service.next_high_tide_height_state(
+            tide_info, current_time, convert_meter_to_feet
+        ),
+        "next_high_tide_time_state": lambda: sensor_service.next_high_tide_time_state(
+            tide_info, current_time
+        ),
+        "remaining_time_to_next_tide": lambda: sensor_service.remaining_time_to_next_tide(
+            tide_info, current_time
+        ),
+        "current_amplitude_attribute": lambda: sensor_service.current_amplitude_attribute(
+            tide_info, datums_info, current_time, convert_meter_to_feet
+        ),
+        "next_amplitude_attribute": lambda: sensor_service.next_amplitude_attribute(
+            tide_info, datums_info, current_time, convert_meter_to_feet
+        ),
+        "current_amplitude_state": lambda: sensor_service.current_amplitude_state(
+            tide_info, datums_info, current_time, convert_meter_to_feet
+        ),
+        "current_coeff_state": lambda: sensor_service.current_coeff_state(
+            tide_info, datums_info, current_time, convert_meter_to_feet
+        ),
+        "tide_tendancy_attribute": lambda: sensor_service.tide_tendancy_attribute(
+            tide_info, current_time
+        ),
+        "icon_tendancy": lambda: sensor_service.icon_tendancy(tide_info, current_time),
+        "schedule_time_attribute": lambda: sensor_service.schedule_time_attribute(
+            coordinator
+        ),
+        "tide_station_attribute": lambda: sensor_service.tide_station_attribute(
+            45.6,
+            -1.0,
+            tide_station_name,
+            coordinator,
+            init_tide_info,
+            convert_km_to_miles,
+        ),
+        "next_tide_state": lambda: sensor_service.next_tide_state(
+            tide_info, current_time
+        ),
+    }
+
+
+def write_sensor_state(sensor_entity):
+    for property_name in SENSOR_STATE_PROPERTIES:
+        getattr(sensor_entity, property_name)
+
+
+def run_scan(coordinators, sensors, current_time):
+    """work done at one scan interval : tide state then state of sensors"""
+    for coordinator in coordinators:
+        coordinator.update_tide_state_frame(current_time)
+    for sensor_entity in sensors:
+        write_sensor_state(sensor_entity)
+
+
+def bench_prediction(days, station_number, tick_number, fixture_dir):
+    """give results (ms) for a prediction duration"""
+    results = {}
+    coordinators = setup_coordinators(station_number, days, fixture_dir)
+    sensors = setup_sensors(coordinators)
+    current_time = give_benchmark_time()
+    coordinators[0].update_tide_state_frame(current_time)
+
+    # sensor_service functions
+    for name, function in give_sensor_service_functions(
+        coordinators[0], current_time
+    ).items():
+        results["{}d/function/{}".format(days, name)] = give_cpu_time(
+            function, number=FUNCTION_CALL_NUMBER
+        )
+
+    # properties of sensors of one station
+    for sensor_entity in sensors[: len(SENSOR_CLASSES)]:
+        for property_name in SENSOR_STATE_PROPERTIES:
+            results[
+                "{}d/property/{}.{}".format(
+                    days, type(sensor_entity).__name__, property_name
+                )
+            ] = give_cpu_time(
+                lambda: getattr(sensor_entity, property_name), number=200
+            )
+
+    # scan intervals of all stations
+    tick_times = []
+    for tick_index in range(tick_number):
+        tick_time = current_time + tick_index * SCAN_INTERVAL_SECONDS
+        tick_times.append(
+            give_cpu_time(
+                lambda: run_scan(coordinators, sensors, tick_time), repeat=1
+            )
+        )
+    results["{}d/scan/{}_stations_mean".format(days, station_number)] = sum(
+        tick_times
+    ) / len(tick_times)
+    results["{}d/scan/{}_stations_max".format(days, station_number)] = max(
+        tick_times
+    )
+    results["{}d/scan/{}_stations_calls".format(days, station_number)] = (
+        give_call_count(lambda: run_scan(coordinators, sensors, current_time))
+    )
+    return results
+
+
+def give_gated_names(results):
+    """give the results compared to baseline : functions and scan calls"""
+    return [
+        name for name in results if "/function/" in name or name.endswith("_calls")
+    ]
+
+
+def give_unit(name):
+    return "calls" if name.endswith("_calls") else "ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=10)
+    parser.add_argument("--ticks", type=int, default=20)
+    parser.add_argument("--days", type=int, nargs="+", default=FIXTURE_DAYS)
+    parser.add_argument("--fixture-dir", default=DEFAULT_FIXTURE_DIR)
+    parser.add_argument("--save-baseline")
+    parser.add_argument("--baseline")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    parser.add_argument("--min-regression-ms", type=float, default=0.01)
+    parser.add_argument("--max-tick-ms", type=float)
+    args = parser.parse_args()
+
+    results = {}
+    for days in args.days:
+        results.update(
+            bench_prediction(days, args.stations, args.ticks, args.fixture_dir)
+        )
+
+    for name, value in results.items():
+        print("{:<90} {:>10.4f} {}".format(name, value, give_unit(name)))
+
+    failed = False
+    if args.max_tick_ms is not None:
+        for name, value in results.items():
+            if "/scan/" not in name or give_unit(name) != "ms":
+                continue
+            if value > args.max_tick_ms:
+                print("too slow : {} {:.3f} ms".format(name, value))
+                failed = True
+    if args.baseline is not None:
+        for name, reference, value in compare_to_baseline(
+            results,
+            args.baseline,
+            args.max_regression,
+            args.min_regression_ms,
+            give_gated_names(results),
+        ):
+            print(
+                "regression : {} {:.4f} -> {:.4f} {}".format(
+                    name, reference, value, give_unit(name)
+                )
+            )
+            failed = True
+    if args.save_baseline is not None:
+        save_baseline(results, args.save_baseline)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
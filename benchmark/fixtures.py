@@ -0,0 +1,186 @@
+"""WorldTides responses used by the benchmarks.
+
+A fixture is a JSON file holding the response of the server, as saved
+from a request (heights, extremes, datums, station). When no file is
+found, a response with the same layout is computed from two tide
+harmonics. Fixtures are shifted in time to start today (midnight UTC),
+so that the current time falls within the data.
+
+usage: python benchmark/fixtures.py [fixture_dir]
+    write the computed fixtures for 1, 7 and 30 days in fixture_dir
+"""
+# Python library
+import json
+import math
+import os
+import sys
+import time
+
+# prediction days used by the benchmarks
+FIXTURE_DAYS = [1, 7, 30]
+DEFAULT_FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+# time of day of the benchmarks : the same tide state from run to run
+BENCHMARK_TIME_OF_DAY = 14 * 3600
+
+# server layout
+HEIGHT_STEP = 900
+DATE_FORMAT = "%Y-%m-%dT%H:%M+0000"
+
+# tide harmonics : period (s), amplitude (m)
+MEAN_SEA_LEVEL = 3.2
+HARMONICS = [(12.4206 * 3600, 2.1), (12.0 * 3600, 0.7)]
+
+
+def give_date(epoch):
+    return time.strftime(DATE_FORMAT, time.gmtime(epoch))
+
+
+def give_today_midnight():
+    current_time = int(time.time())
+    return current_time - (current_time % 86400)
+
+
+def give_benchmark_time():
+    """give the time of today used by the benchmarks"""
+    return give_today_midnight() + BENCHMARK_TIME_OF_DAY
+
+
+def give_height(epoch):
+    height = MEAN_SEA_LEVEL
+    for period, amplitude in HARMONICS:
+        height += amplitude * math.cos(2 * math.pi * epoch / period)
+    return height
+
+
+def make_height_data(days, start=None):
+    """give a server response with heights and extremes over days (+1)"""
+    if start is None:
+        start = give_today_midnight()
+    # as the integration : prediction + 1 day
+    end = start + (days + 1) * 86400
+
+    heights = [
+        {
+            "dt": epoch,
+            "date": give_date(epoch),
+            "height": round(give_height(epoch), 3),
+        }
+        for epoch in range(start, end, HEIGHT_STEP)
+    ]
+
+    # extremes : minute where the slope changes sign
+    extremes = []
+    previous_slope = give_height(start + 60) - give_height(start)
+    for epoch in range(start + 60, end, 60):
+        slope = give_height(epoch + 60) - give_height(epoch)
+        if (slope < 0) != (previous_slope < 0):
+            extremes.append(
+                {
+                    "dt": epoch,
+                    "date": give_date(epoch),
+                    "height": round(give_height(epoch), 3),
+                    "type": "High" if previous_slope > 0 else "Low",
+                }
+            )
+        previous_slope = slope
+
+    spring_amplitude = sum(amplitude for period, amplitude in HARMONICS)
+    neap_amplitude = HARMONICS[0][1] - HARMONICS[1][1]
+    datums = [
+        {"name": "HAT", "height": round(MEAN_SEA_LEVEL + spring_amplitude, 3)},
+        {
+            "name": "MHWS",
+            "height": round(MEAN_SEA_LEVEL + spring_amplitude - 0.2, 3),
+        },
+        {"name": "MHWN", "height": round(MEAN_SEA_LEVEL + neap_amplitude, 3)},
+        {"name": "MSL", "height": MEAN_SEA_LEVEL},
+        {"name": "MLWN", "height": round(MEAN_SEA_LEVEL - neap_amplitude, 3)},
+        {
+            "name": "MLWS",
+            "height": round(MEAN_SEA_LEVEL - spring_amplitude + 0.2, 3),
+        },
+        {"name": "LAT", "height": round(MEAN_SEA_LEVEL - spring_amplitude, 3)},
+    ]
+
+    return {
+        "status": 200,
+        "callCount": 2,
+        "copyright": "Tidal data generated for benchmark",
+        "requestLat": 45.6,
+        "requestLon": -1.0,
+        "responseLat": 45.62,
+        "responseLon": -1.03,
+        "atlas": "FES",
+        "station": "BENCHMARK",
+        "responseDatum": "LAT",
+        "heights": heights,
+        "extremes": extremes,
+        "datums": datums,
+    }
+
+
+def make_station_data():
+    """give a server response to the stations request"""
+    return {
+        "status": 200,
+        "callCount": 1,
+        "stations": [
+            {
+                "id": "bench:1",
+                "name": "BENCHMARK",
+                "lat": 45.62,
+                "lon": -1.03,
+                "timezone": "Europe/Paris",
+            },
+            {
+                "id": "bench:2",
+                "name": "BENCHMARK EAST",
+                "lat": 45.65,
+                "lon": -0.9,
+                "timezone": "Europe/Paris",
+            },
+        ],
+    }
+
+
+def shift_height_data(data, start):
+    """give the response moved in time to begin at start"""
+    heights = data.get("heights", [])
+    if len(heights) == 0:
+        return data
+    offset = start - heights[0]["dt"]
+    shifted_data = dict(data)
+    for field in ["heights", "extremes"]:
+        shifted_data[field] = [
+            dict(item, dt=item["dt"] + offset, date=give_date(item["dt"] + offset))
+            for item in data.get(field, [])
+        ]
+    return shifted_data
+
+
+def give_fixture_filename(fixture_dir, days):
+    return os.path.join(fixture_dir, "heights_{}d.json".format(days))
+
+
+def load_height_data(days, fixture_dir=DEFAULT_FIXTURE_DIR, start=None):
+    """give the recorded response over days (computed if none)"""
+    if start is None:
+        start = give_today_midnight()
+    filename = give_fixture_filename(fixture_dir, days)
+    if not os.path.isfile(filename):
+        return make_height_data(days, start)
+    with open(filename, "r") as file_handler:
+        return shift_height_data(json.load(file_handler), start)
+
+
+def write_fixtures(fixture_dir):
+    os.makedirs(fixture_dir, exist_ok=True)
+    for days in FIXTURE_DAYS:
+        filename = give_fixture_filename(fixture_dir, days)
+        with open(filename, "w") as file_handler:
+            json.dump(make_height_data(days), file_handler)
+        print("written", filename)
+
+
+if __name__ == "__main__":
+    write_fixtures(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_FIXTURE_DIR)
@@ -17,7 +17,7 @@ from homeassistant.const import (
 )
 from homeassistant.core import callback
 from homeassistant.helpers import config_validation as cv
-from homeassistant.helpers.storage import STORAGE_DIR
+from homeassistant.helpers.storage import STORAGE_DIR, Store
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
@@ -34,6 +34,7 @@ from .const import (
     CONF_STATION_DISTANCE,
     CONF_UNIT,
     CONF_VERTICAL_REF,
+    CREDIT_LEDGER_STORAGE_VERSION,
     DATA_COORDINATOR,
     DEFAULT_CONF_LIVE_LOCATION,
     DEFAULT_CONF_UNIT,
@@ -50,10 +51,20 @@ from .const import (
     WORLD_TIDES_INFO_CUSTOM_DOMAIN,
     WWW_PATH,
 )
+from .credit_budget import Credit_Budget_Planner
+from .credit_ledger import Credit_Ledger
+from .fetch_pipeline import WorldTidesInfo_Fetch_Pipeline
+from .storage_mngt import Shared_Data_Store
 
 PLATFORMS = ["sensor", "camera", "calendar"]
 
 DATA_LISTENER = "listener"
+DATA_FETCH_PIPELINE = "fetch_pipeline"
+DATA_SHARED_DATA_STORE = "shared_data_store"
+DATA_SHARED_DATA_STORE_LOCK = "shared_data_store_lock"
+DATA_CREDIT_LEDGER = "credit_ledger"
+DATA_CREDIT_LEDGER_LOCK = "credit_ledger_lock"
+DATA_CREDIT_BUDGET_PLANNER = "credit_budget_planner"
 
 worldtidesinfo_data_coordinator = {}
 
@@ -111,6 +122,67 @@ def async_get_used_api_key(hass):
     return None
 
 
+@callback
+def async_get_fetch_pipeline(hass):
+    """Give the fetch pipeline shared by all coordinators."""
+    # sensor can be set from YAML : domain data may not exist
+    domain_data = hass.data.setdefault(
+        DOMAIN, {DATA_COORDINATOR: {}, DATA_LISTENER: {}}
+    )
+    if domain_data.get(DATA_FETCH_PIPELINE) is None:
+        domain_data[DATA_FETCH_PIPELINE] = WorldTidesInfo_Fetch_Pipeline(
+            worldtidesinfo_data_coordinator
+        )
+    return domain_data[DATA_FETCH_PIPELINE]
+
+
+async def async_get_shared_data_store(hass):
+    """Give the store of all stations, read once."""
+    domain_data = hass.data.setdefault(
+        DOMAIN, {DATA_COORDINATOR: {}, DATA_LISTENER: {}}
+    )
+    lock = domain_data.setdefault(DATA_SHARED_DATA_STORE_LOCK, asyncio.Lock())
+    async with lock:
+        if domain_data.get(DATA_SHARED_DATA_STORE) is None:
+            shared_data_store = Shared_Data_Store(
+                give_shared_data_store_filename(hass)
+            )
+            await hass.async_add_executor_job(shared_data_store.load)
+            domain_data[DATA_SHARED_DATA_STORE] = shared_data_store
+    return domain_data[DATA_SHARED_DATA_STORE]
+
+
+async def async_get_credit_ledger(hass):
+    """Give the credit ledger of all stations, read once."""
+    domain_data = hass.data.setdefault(
+        DOMAIN, {DATA_COORDINATOR: {}, DATA_LISTENER: {}}
+    )
+    credit_ledger = domain_data.get(DATA_CREDIT_LEDGER)
+    if credit_ledger is not None:
+        return credit_ledger
+    lock = domain_data.setdefault(DATA_CREDIT_LEDGER_LOCK, asyncio.Lock())
+    async with lock:
+        if domain_data.get(DATA_CREDIT_LEDGER) is None:
+            store = Store(
+                hass,
+                CREDIT_LEDGER_STORAGE_VERSION,
+                WORLD_TIDES_INFO_CUSTOM_DOMAIN + ".credit_ledger",
+            )
+            credit_ledger = Credit_Ledger(store)
+            credit_ledger.load_data(await store.async_load())
+            domain_data[DATA_CREDIT_LEDGER] = credit_ledger
+    return domain_data[DATA_CREDIT_LEDGER]
+
+
+async def async_get_credit_budget_planner(hass):
+    """Give the credit budget planner of all API keys."""
+    credit_ledger = await async_get_credit_ledger(hass)
+    domain_data = hass.data[DOMAIN]
+    if domain_data.get(DATA_CREDIT_BUDGET_PLANNER) is None:
+        domain_data[DATA_CREDIT_BUDGET_PLANNER] = Credit_Budget_Planner(credit_ledger)
+    return domain_data[DATA_CREDIT_BUDGET_PLANNER]
+
+
 async def async_setup(hass, config):
     """Set up the World Tide Custom component."""
     # hass.data[DOMAIN] = {DATA_COORDINATOR: {}, DATA_LISTENER: {}}
@@ -231,6 +303,11 @@ def give_persistent_filename(hass, name):
     }
 
 
+def give_shared_data_store_filename(hass):
+    """give the filename of store shared by all stations"""
+    return hass.config.path(STORAGE_DIR, WORLD_TIDES_INFO_CUSTOM_DOMAIN + ".db")
+
+
 async def async_remove_entry(hass, config_entry):
     """Handle removal of an entry."""
 
@@ -251,3 +328,15 @@ async def async_remove_entry(hass, config_entry):
     ## persistent data
     if os.path.isfile(filenames.get("persistent_data_filename")):
         os.remove(filenames.get("persistent_data_filename"))
+    shared_data_store_filename = give_shared_data_store_filename(hass)
+    if os.path.isfile(shared_data_store_filename):
+        shared_data_store = hass.data.get(DOMAIN, {}).get(DATA_SHARED_DATA_STORE)
+        if shared_data_store is None:
+            shared_data_store = Shared_Data_Store(shared_data_store_filename)
+        await hass.async_add_executor_job(shared_data_store.remove, name)
+    ## credit counted for the station
+    credit_ledger = await async_get_credit_ledger(hass)
+    credit_ledger.remove_station(name)
+    ## credit budget of the station
+    credit_budget_planner = await async_get_credit_budget_planner(hass)
+    credit_budget_planner.remove_station(name)
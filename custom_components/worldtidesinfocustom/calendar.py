@@ -21,10 +21,9 @@ from homeassistant.components.calendar import (
     CalendarEvent,
 )
 from homeassistant.const import CONF_LATITUDE, CONF_LONGITUDE, CONF_NAME, CONF_SOURCE
-from homeassistant.helpers.entity_registry import async_get
-from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.util.unit_system import IMPERIAL_SYSTEM
-from pyworldtidesinfo.worldtidesinfo_server import give_info_from_raw_data
 
 # Component Library
 from . import worldtidesinfo_data_coordinator
@@ -40,7 +39,7 @@ from .const import (
     METRIC_CONF_UNIT,
     ROUND_HEIGTH,
     SCAN_INTERVAL_SECONDS,
-    SENSOR_NEXT_TIDE_SUFFIX,
+    SIGNAL_TIDE_STATE_FRAME,
     STATIC_CONF,
 )
 from .sensor_service import convert_to_perform, get_tide_info, worldtidesinfo_unique_id
@@ -184,37 +183,30 @@ class TidesCalendarEntity(CalendarEntity):
         self._worldtide_data_coordinator = None
         self._event = None
 
-    def _async_worldtidesinfo_follower_sensor_state_listener(self, event):
-        # retrieve state
-        new_state = event.data.get("new_state")
-        if new_state is None:
-            return
+    @property
+    def should_poll(self):
+        """the main sensor notifies each new tide state"""
+        return False
 
-        self.schedule_update_ha_state(force_refresh=True)
+    @callback
+    def _async_worldtidesinfo_tide_state_frame_listener(self):
+        self._update_event()
+        self.async_write_ha_state()
 
     async def async_added_to_hass(self):
         """Handle added to Hass."""
         await super().async_added_to_hass()
 
-        entity_id_main_sensor = None
-
-        # Fetch the name of sensor
-        registry = async_get(self.hass)
-        entity_id_main_sensor = registry.async_get_entity_id(
-            "sensor", DOMAIN, self._unique_id + SENSOR_NEXT_TIDE_SUFFIX
-        )
-        _LOGGER.debug("Calendar: entity main sensor %s", entity_id_main_sensor)
-
-        if entity_id_main_sensor is None:
-            entity_id_main_sensor = "sensor." + self._name + SENSOR_NEXT_TIDE_SUFFIX
-
-        async_track_state_change_event(
-            self._hass,
-            [entity_id_main_sensor],
-            self._async_worldtidesinfo_follower_sensor_state_listener,
+        # listen to the main sensor of the station
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self._hass,
+                SIGNAL_TIDE_STATE_FRAME.format(self._unique_id),
+                self._async_worldtidesinfo_tide_state_frame_listener,
+            )
         )
 
-        _LOGGER.debug("Event: listen main sensor %s", entity_id_main_sensor)
+        _LOGGER.debug("Event: listen tide state of %s", self._name)
         # pure async i.e. wait for update of main sensor
         # no need to call self.schedule_update_ha_state
         # be robust to be sure to be update
@@ -232,15 +224,19 @@ class TidesCalendarEntity(CalendarEntity):
 
     async def async_update(self):
         """Update all Calendars."""
+        self._update_event()
+
+    def _update_event(self):
+        """Compute the next event (no I/O : run in event loop)."""
         self._worldtide_data_coordinator = worldtidesinfo_data_coordinator.get(
             self._name
         )
         if self._worldtide_data_coordinator is None:
             return
         # the tide info
-        tide_info = give_info_from_raw_data(
-            self._worldtide_data_coordinator.get_data().get("current_data")
-        )
+        tide_info = (
+            self._worldtide_data_coordinator.get_tide_info_snapshot()
+        ).get_current_tide_info()
         if tide_info is None:
             return
         current_time = time.time()
@@ -296,9 +292,9 @@ class TidesCalendarEntity(CalendarEntity):
             return events
 
         # the tide info
-        tide_info = give_info_from_raw_data(
-            self._worldtide_data_coordinator.get_data().get("current_data")
-        )
+        tide_info = (
+            self._worldtide_data_coordinator.get_tide_info_snapshot()
+        ).get_current_tide_info()
         epoch_frame_min = start_date.timestamp()
         epoch_frame_max = end_date.timestamp()
 
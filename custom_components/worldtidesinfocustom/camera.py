@@ -4,7 +4,6 @@ import logging
 
 _LOGGER = logging.getLogger(__name__)
 
-import os
 import time
 from datetime import datetime, timedelta
 
@@ -27,13 +26,13 @@ from homeassistant.const import (
 )
 from homeassistant.helpers.device_registry import DeviceEntryType
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.entity_registry import async_get
-from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.util.unit_system import IMPERIAL_SYSTEM
 from pyworldtidesinfo.worldtidesinfo_server import SERVER_API_VERSION
 
 # Component Library
-from . import give_persistent_filename
+from . import give_persistent_filename, worldtidesinfo_data_coordinator
 from .const import (
     ATTRIBUTION,
     CAMERA_CURVE_PICTURE_SUFFIX,
@@ -60,10 +59,12 @@ from .const import (
     IMPERIAL_CONF_UNIT,
     METRIC_CONF_UNIT,
     SCAN_INTERVAL_SECONDS,
-    SENSOR_NEXT_TIDE_SUFFIX,
+    SIGNAL_TIDE_STATE_FRAME,
     STATIC_CONF,
     WORLD_TIDES_INFO_CUSTOM_DOMAIN,
 )
+from .picture_cache import PICTURE_NOT_CACHED, Resized_Picture_Cache
+from .plot_mngt import LONG_DURATION, NORMAL_DURATION
 from .sensor_service import worldtidesinfo_unique_id
 
 # Sensor HA parameter
@@ -97,11 +98,16 @@ def setup_camera(
     )
 
     plot_picture = TidesPlotPicture(
-        hass, name, "", unique_id, filename.get("plot_filename")
+        hass, name, "", unique_id, filename.get("plot_filename"), NORMAL_DURATION
     )
 
     long_plot_picture = TidesPlotPicture(
-        hass, name, "_long", unique_id, filename.get("plot_long_prediction_filename")
+        hass,
+        name,
+        "_long",
+        unique_id,
+        filename.get("plot_long_prediction_filename"),
+        LONG_DURATION,
     )
 
     return [curve_picture, plot_picture, long_plot_picture]
@@ -168,7 +174,7 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
 
 
 class TidesPicture_FromFile(Camera):
-    """Curve Picture."""
+    """Picture kept in memory (a copy is in file)."""
 
     def __init__(
         self,
@@ -190,6 +196,10 @@ class TidesPicture_FromFile(Camera):
         self._generated_at = None
         self._last_requested_date = None
         self._image = None
+        # generation of image kept by data coordinator
+        self._image_generation = None
+        # image scaled to size asked
+        self._resized_pictures = Resized_Picture_Cache()
 
     @property
     def device_info(self):
@@ -207,86 +217,93 @@ class TidesPicture_FromFile(Camera):
     def no_data(self):
         return self._image is None
 
-    def _async_worldtidesinfo_follower_sensor_state_listener(self, event):
-        # retrieve state
-        new_state = event.data.get("new_state")
-        if new_state is None:
-            return
+    @property
+    def should_poll(self):
+        """the main sensor notifies each new tide state"""
+        return False
 
-        self.schedule_update_ha_state(force_refresh=True)
+    @callback
+    def _async_worldtidesinfo_tide_state_frame_listener(self):
+        # the picture file has to be read again
+        self.async_schedule_update_ha_state(force_refresh=True)
 
     async def async_added_to_hass(self):
         """Handle added to Hass."""
         await super().async_added_to_hass()
 
-        entity_id_main_sensor = None
-
-        # Fetch the name of sensor
-        registry = async_get(self.hass)
-        entity_id_main_sensor = registry.async_get_entity_id(
-            "sensor", DOMAIN, self._unique_id + SENSOR_NEXT_TIDE_SUFFIX
-        )
-        _LOGGER.debug("Camera: entity main sensor %s", entity_id_main_sensor)
-
-        if entity_id_main_sensor is None:
-            entity_id_main_sensor = "sensor." + self._name + SENSOR_NEXT_TIDE_SUFFIX
-
-        async_track_state_change_event(
-            self._hass,
-            [entity_id_main_sensor],
-            self._async_worldtidesinfo_follower_sensor_state_listener,
+        # listen to the main sensor of the station
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self._hass,
+                SIGNAL_TIDE_STATE_FRAME.format(self._unique_id),
+                self._async_worldtidesinfo_tide_state_frame_listener,
+            )
         )
 
-        _LOGGER.debug("Camera: listen main sensor %s", entity_id_main_sensor)
+        _LOGGER.debug("Camera: listen tide state of %s", self._name)
         # pure async i.e. wait for update of main sensor
         # no need to call self.schedule_update_ha_state
         # be robust to be sure to be update
         self.schedule_update_ha_state(force_refresh=True)
 
+    def _give_memory_picture(self, worldtide_data_coordinator):
+        """Give the picture kept by data coordinator : curve from server."""
+        return worldtide_data_coordinator.get_curve_picture()
+
     def _get_image(self):
-        """Read the contents of the file."""
-        current_time = time.time()
-        read_ok = False
-        read_image = None
-        _LOGGER.debug(
-            "Camera: Sync Fetch new picture image from %s", self._image_filename
+        """Take the last picture (no I/O : run in event loop)."""
+        worldtide_data_coordinator = worldtidesinfo_data_coordinator.get(self._name)
+        if worldtide_data_coordinator is None:
+            return
+        picture = self._give_memory_picture(worldtide_data_coordinator)
+        self._last_requested_date = time.time()
+        # same picture : nothing to take
+        if picture.give_generation() == self._image_generation:
+            return
+        image_generation, image, generated_at = picture.give_picture()
+        if image is None:
+            return
+        _LOGGER.debug("Camera: new picture image for %s", self._image_filename)
+        self._image = image
+        self._image_generation = image_generation
+        self._generated_at = time.ctime(generated_at)
+
+    def _give_image(self, width, height):
+        """Give image scaled to size asked."""
+        return self._resized_pictures.give_picture(
+            self._image_generation, self._image, width, height
         )
-        """Return image response."""
-        try:
-            with open(self._image_filename, "rb") as file:
-                read_image = file.read()
-            read_ok = True
-        except FileNotFoundError:
-            _LOGGER.warning(
-                "Could not read camera %s image from file: %s",
-                self._name,
-                self._image_filename,
+
+    async def _async_give_image(self, width, height):
+        """Give image scaled to size asked : scaled in executor."""
+        # no picture yet
+        if self._image is None:
+            return None
+        image = self._resized_pictures.give_cached_picture(
+            self._image_generation, self._image, width, height
+        )
+        if image is PICTURE_NOT_CACHED:
+            image = await self._hass.async_add_executor_job(
+                self._give_image, width, height
             )
-        if read_ok:
-            self._image = read_image
-            self._last_requested_date = current_time
-            self._generated_at = time.ctime(os.path.getmtime(self._image_filename))
+        return image
 
-    def camera_image(self, width, height):
+    def camera_image(self, width=None, height=None):
         """Return image response."""
         _LOGGER.debug("Camera : Sync Image Tides sensor %s", self._name)
-        return self._image
+        self._get_image()
+        return self._give_image(width, height)
 
-    async def async_camera_image(self, width, height):
-        """Fetch new image."""
+    async def async_camera_image(self, width=None, height=None):
+        """Give the last picture."""
         _LOGGER.debug("Camera : Async Image Tides sensor %s", self._name)
-        return self._image
-
-    def update(self):
-        """Read the contents of the file."""
         self._get_image()
-        _LOGGER.debug("Camera update :  %s", self._image_filename)
+        return await self._async_give_image(width, height)
 
     async def async_update(self):
         """Fetch new state data for the camera."""
         _LOGGER.debug("Camera Async Update %s", self._name)
-        ##Watch Out : only method name is given to function i.e. without ()
-        await self._hass.async_add_executor_job(self.update)
+        self._get_image()
 
     # name and unique_id function shall be implemented
 
@@ -306,6 +323,8 @@ class TidesPicture_FromFile(Camera):
             attr["last_requested_date"] = time.strftime(
                 "%H:%M:%S %d/%m/%y", time.localtime(self._last_requested_date)
             )
+        if DEBUG_FLAG:
+            attr.update(self._resized_pictures.get_statistics())
         return attr
 
 
@@ -323,7 +342,7 @@ class TidesCurvePicture(TidesPicture_FromFile):
 
 
 class TidesPlotPicture(TidesPicture_FromFile):
-    """Plot Picture."""
+    """Plot Picture : kept in memory by the data coordinator."""
 
     def __init__(
         self,
@@ -332,10 +351,16 @@ class TidesPlotPicture(TidesPicture_FromFile):
         suffix_name,
         unique_id,
         image_filename,
+        duration_type,
     ):
         """Initialize Curve Picture."""
         super().__init__(hass, name, unique_id, image_filename)
         self._suffix_name = suffix_name
+        self._duration_type = duration_type
+
+    def _give_memory_picture(self, worldtide_data_coordinator):
+        """Give the last plot drawn."""
+        return worldtide_data_coordinator.get_plot_picture(self._duration_type)
 
     @property
     def name(self):
@@ -20,12 +20,19 @@ from .const import (
     CONF_ATTRIBUTE_NAME_LAT,
     CONF_ATTRIBUTE_NAME_LONG,
     CONF_DAY_TIDE_PREDICTION,
+    CONF_HOT_PATH_TIMING,
+    CONF_INCREMENTAL_FETCH,
     CONF_LIVE_LOCATION,
     CONF_LIVE_LOCATION_TYPES,
     CONF_MAT_PLOT_TRANS_BCKGROUND,
+    CONF_MONTHLY_CREDIT_BUDGET,
     CONF_PLOT_BACKGROUND,
     CONF_PLOT_COLOR,
+    CONF_PLOT_FILE_MIRROR,
+    CONF_PREFETCH_TIME,
+    CONF_REFRESH_WINDOW,
     CONF_SENSOR_UPDATE_DISTANCE,
+    CONF_SHARED_DATA_STORE,
     CONF_STATION_DISTANCE,
     CONF_UNIT,
     CONF_UNIT_TYPES,
@@ -36,15 +43,24 @@ from .const import (
     DEFAULT_CONF_LIVE_LOCATION,
     DEFAULT_CONF_UNIT,
     DEFAULT_DAY_TIDE_PREDICTION,
+    DEFAULT_HOT_PATH_TIMING,
+    DEFAULT_INCREMENTAL_FETCH,
     DEFAULT_MAT_PLOT_TRANS_BCKGROUND,
+    DEFAULT_MONTHLY_CREDIT_BUDGET,
     DEFAULT_NAME,
     DEFAULT_PLOT_BACKGROUND,
     DEFAULT_PLOT_COLOR,
+    DEFAULT_PLOT_FILE_MIRROR,
+    DEFAULT_PREFETCH_TIME,
+    DEFAULT_REFRESH_WINDOW,
     DEFAULT_SENSOR_UPDATE_DISTANCE,
+    DEFAULT_SHARED_DATA_STORE,
     DEFAULT_STATION_DISTANCE,
     DEFAULT_VERTICAL_REF,
     DOMAIN,
     FROM_SENSOR_CONF,
+    MAX_PREFETCH_TIME,
+    MAX_REFRESH_WINDOW,
 )
 
 CONF_INTEGRATION_TYPE = "integration_type"
@@ -429,6 +445,48 @@ class WorldTidesInfoCustomOptionsFlowHandler(config_entries.OptionsFlow):
                             ),
                         ),
                     ): cv.positive_int,
+                    vol.Optional(
+                        CONF_SHARED_DATA_STORE,
+                        default=self.config_entry.options.get(
+                            CONF_SHARED_DATA_STORE, DEFAULT_SHARED_DATA_STORE
+                        ),
+                    ): cv.boolean,
+                    vol.Optional(
+                        CONF_PLOT_FILE_MIRROR,
+                        default=self.config_entry.options.get(
+                            CONF_PLOT_FILE_MIRROR, DEFAULT_PLOT_FILE_MIRROR
+                        ),
+                    ): cv.boolean,
+                    vol.Optional(
+                        CONF_HOT_PATH_TIMING,
+                        default=self.config_entry.options.get(
+                            CONF_HOT_PATH_TIMING, DEFAULT_HOT_PATH_TIMING
+                        ),
+                    ): cv.boolean,
+                    vol.Optional(
+                        CONF_MONTHLY_CREDIT_BUDGET,
+                        default=self.config_entry.options.get(
+                            CONF_MONTHLY_CREDIT_BUDGET, DEFAULT_MONTHLY_CREDIT_BUDGET
+                        ),
+                    ): cv.positive_int,
+                    vol.Optional(
+                        CONF_REFRESH_WINDOW,
+                        default=self.config_entry.options.get(
+                            CONF_REFRESH_WINDOW, DEFAULT_REFRESH_WINDOW
+                        ),
+                    ): vol.All(cv.positive_int, vol.Range(max=MAX_REFRESH_WINDOW)),
+                    vol.Optional(
+                        CONF_PREFETCH_TIME,
+                        default=self.config_entry.options.get(
+                            CONF_PREFETCH_TIME, DEFAULT_PREFETCH_TIME
+                        ),
+                    ): vol.All(cv.positive_int, vol.Range(max=MAX_PREFETCH_TIME)),
+                    vol.Optional(
+                        CONF_INCREMENTAL_FETCH,
+                        default=self.config_entry.options.get(
+                            CONF_INCREMENTAL_FETCH, DEFAULT_INCREMENTAL_FETCH
+                        ),
+                    ): cv.boolean,
                 }
             ),
         )
@@ -11,6 +11,20 @@ SCAN_INTERVAL_SECONDS = 900
 
 DATA_COORDINATOR = "coordinator"
 
+# Maximum number of stations fetched in parallel
+DEFAULT_FETCH_MAX_PARALLEL_REQUESTS = 4
+
+# Credit ledger written at most at this interval in seconds
+CREDIT_LEDGER_SAVE_DELAY = 60
+CREDIT_LEDGER_STORAGE_VERSION = 1
+# Longest interval in days between two refreshes to hold the credit budget
+CREDIT_BUDGET_MAX_REFRESH_INTERVAL = 7
+# Days of data charged by the server as one credit (for each kind of data)
+CREDIT_BLOCK_DAYS = 7
+
+# Signal sent to all entities of a station when a new tide state is available
+SIGNAL_TIDE_STATE_FRAME = DOMAIN + "_tide_state_frame_{}"
+
 # LAT reference as default
 DEFAULT_VERTICAL_REF = "LAT"
 CONF_VERTICAL_REF = "vertical_ref"
@@ -92,6 +106,36 @@ CONF_LIVE_LOCATION_TYPES = [STATIC_CONF, FROM_SENSOR_CONF]
 DEFAULT_SENSOR_UPDATE_DISTANCE = 50
 CONF_SENSOR_UPDATE_DISTANCE = "update_sensor_distance"
 
+# data of all stations in one file
+DEFAULT_SHARED_DATA_STORE = False
+CONF_SHARED_DATA_STORE = "shared_data_store"
+
+# copy of plot pictures in www
+DEFAULT_PLOT_FILE_MIRROR = True
+CONF_PLOT_FILE_MIRROR = "plot_file_mirror"
+
+# monthly credit budget of API key (0 : no budget)
+DEFAULT_MONTHLY_CREDIT_BUDGET = 0
+CONF_MONTHLY_CREDIT_BUDGET = "monthly_credit_budget"
+
+# refresh of stations spread over this time (minutes) before midnight
+DEFAULT_REFRESH_WINDOW = 0
+CONF_REFRESH_WINDOW = "refresh_window"
+MAX_REFRESH_WINDOW = 12 * 60
+
+# next day requested this time (minutes) before midnight, used at midnight
+DEFAULT_PREFETCH_TIME = 0
+CONF_PREFETCH_TIME = "prefetch_time"
+MAX_PREFETCH_TIME = 12 * 60
+
+# only the tail of data not yet held requested each day
+DEFAULT_INCREMENTAL_FETCH = False
+CONF_INCREMENTAL_FETCH = "incremental_fetch"
+
+# diagnostic sensors with measures of hot path
+DEFAULT_HOT_PATH_TIMING = False
+CONF_HOT_PATH_TIMING = "hot_path_timing"
+
 
 # Debug Flag
 DEBUG_FLAG = False
@@ -108,6 +152,16 @@ HALF_TIDE_SLACK_DURATION = 3600
 
 #Forecast Tide Duration in seconds
 SENSOR_FORECAST_TIDE_DURATION = 3600
+#Forecast Tide Horizons given as attributes in seconds
+SENSOR_FORECAST_TIDE_HORIZONS = [3600, 7200, 10800]
+
+# Plot drawn again when current position moves more than this (in pixel)
+PLOT_RENDER_PIXEL_THRESHOLD = 1
+# Plot drawn again at least at this interval in seconds (time labels)
+PLOT_RENDER_MIN_INTERVAL = 3600
+
+# Memory for scaled pictures of one camera (in bytes)
+CAMERA_RESIZED_PICTURE_MEMORY_BUDGET = 2 * 1024 * 1024
 
 # set constant to give suffix to camera name
 CAMERA_PLOT_PICTURE_SUFFIX = "_plot_picture"
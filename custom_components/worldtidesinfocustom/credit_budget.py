@@ -0,0 +1,111 @@
+"""Monthly credit budget of API keys."""
+# Python library
+import math
+from datetime import datetime
+
+# Component library
+from .const import CREDIT_BLOCK_DAYS, CREDIT_BUDGET_MAX_REFRESH_INTERVAL
+
+
+def give_month_remaining_time(current_time):
+    """give the seconds until next month (local time)"""
+    current_date = datetime.fromtimestamp(current_time)
+    if current_date.month == 12:
+        next_month = current_date.replace(year=current_date.year + 1, month=1)
+    else:
+        next_month = current_date.replace(month=current_date.month + 1)
+    next_month = next_month.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    return next_month.timestamp() - current_time
+
+
+class Credit_Budget_Planner:
+    """Refresh interval of stations that holds the monthly budget of API key"""
+
+    def __init__(self, credit_ledger):
+        """Initialize with the ledger of credits used"""
+        self._credit_ledger = credit_ledger
+        # budget by API key : the lowest budget set by a station
+        self._station_budget = {}
+        self._key_budget = {}
+        # last request of whole window of station : credit of one block of
+        # days, days requested beyond the refresh interval
+        self._station_refresh_credit = {}
+
+    def _update_key_budget(self, key):
+        budgets = [
+            budget
+            for station_key, budget in self._station_budget.values()
+            if station_key == key and budget > 0
+        ]
+        self._key_budget[key] = min(budgets) if len(budgets) > 0 else 0
+
+    def set_budget(self, key, station, monthly_credit):
+        """set the monthly budget (0 : no budget) given by station"""
+        previous_key = self._station_budget.get(station, (None, 0))[0]
+        self._station_budget[station] = (key, monthly_credit)
+        if previous_key is not None and previous_key != key:
+            self._update_key_budget(previous_key)
+        self._update_key_budget(key)
+
+    def record_refresh_credit(self, key, station, credit, days, refresh_interval):
+        """keep the credit of the last request of the whole window of station
+
+        days were requested to refresh every refresh_interval days : only
+        tail and prefetch are requested in between, they cost less"""
+        block_credit = credit / math.ceil(days / CREDIT_BLOCK_DAYS)
+        self._station_refresh_credit[station] = (
+            key,
+            block_credit,
+            days - refresh_interval,
+        )
+
+    def remove_station(self, station):
+        """forget budget and refresh credit of a station removed"""
+        self._station_refresh_credit.pop(station, None)
+        key = self._station_budget.pop(station, (None, 0))[0]
+        if key is not None:
+            self._update_key_budget(key)
+
+    def give_budget(self, key):
+        return self._key_budget.get(key, 0)
+
+    def give_refresh_credit(self, key, refresh_interval):
+        """give the credit of one refresh of all the stations of API key
+
+        refresh every n days requests n days more : more blocks of days"""
+        refresh_credit = 0
+        for station_refresh_credit in self._station_refresh_credit.values():
+            station_key, block_credit, other_days = station_refresh_credit
+            if station_key == key:
+                refresh_credit += block_credit * math.ceil(
+                    (other_days + refresh_interval) / CREDIT_BLOCK_DAYS
+                )
+        return refresh_credit
+
+    def _give_projected_month_end(self, key, current_time, refresh_interval):
+        month_credit = self._credit_ledger.give_key_counts(key, current_time)["month"]
+        refresh_count = math.ceil(
+            give_month_remaining_time(current_time) / (refresh_interval * 86400)
+        )
+        return month_credit + refresh_count * self.give_refresh_credit(
+            key, refresh_interval
+        )
+
+    def give_refresh_interval(self, key, current_time):
+        """give the days between refreshes so that budget holds (1 : daily)"""
+        budget = self.give_budget(key)
+        if budget == 0:
+            return 1
+        for refresh_interval in range(1, CREDIT_BUDGET_MAX_REFRESH_INTERVAL + 1):
+            if (
+                self._give_projected_month_end(key, current_time, refresh_interval)
+                <= budget
+            ):
+                return refresh_interval
+        return CREDIT_BUDGET_MAX_REFRESH_INTERVAL
+
+    def give_projected_month_end(self, key, current_time):
+        """give the credit expected at end of month with current interval"""
+        return self._give_projected_month_end(
+            key, current_time, self.give_refresh_interval(key, current_time)
+        )
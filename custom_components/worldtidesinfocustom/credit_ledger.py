@@ -0,0 +1,98 @@
+"""Credits used by all the stations."""
+# Python library
+import hashlib
+import time
+
+# Component library
+from .const import CREDIT_LEDGER_SAVE_DELAY
+
+# periods counted : name, local time format of period
+CREDIT_LEDGER_PERIODS = {
+    "hour": "%Y-%m-%dT%H",
+    "day": "%Y-%m-%d",
+    "month": "%Y-%m",
+}
+
+
+def give_key_id(key):
+    """give the API key as stored (not the key itself)"""
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:12]
+
+
+def give_period_ids(current_time):
+    """give the id of current hour, day and month (local time)"""
+    local_time = time.localtime(current_time)
+    return {
+        period: time.strftime(period_format, local_time)
+        for period, period_format in CREDIT_LEDGER_PERIODS.items()
+    }
+
+
+class Credit_Ledger:
+    """Credits of each fetch, counted per API key and per station"""
+
+    def __init__(self, store=None):
+        """Initialize the counters : store (HA Store) keeps them over restart"""
+        self._store = store
+        # by counter name ("key:<key id>" or "station:<name>") and period :
+        # [period id, credit of period]
+        self._counters = {}
+        # credit recorded since start : never decreases
+        self._overall_count = 0
+
+    def load_data(self, data):
+        """use the counters stored before restart"""
+        if data is None:
+            return
+        self._counters = data.get("counters", {})
+
+    def give_data(self):
+        """give the counters to be stored"""
+        return {"counters": self._counters}
+
+    def record(self, key, station, credit, request_time):
+        """count the credit of a fetch (once per fetch)"""
+        if credit == 0:
+            return
+        period_ids = give_period_ids(request_time)
+        for counter_name in ["key:" + give_key_id(key), "station:" + station]:
+            counter = self._counters.setdefault(counter_name, {})
+            for period, period_id in period_ids.items():
+                period_count = counter.get(period)
+                if period_count is None or period_count[0] != period_id:
+                    # a new period begins
+                    counter[period] = [period_id, credit]
+                else:
+                    period_count[1] += credit
+        self._overall_count += credit
+
+        if self._store is not None:
+            self._store.async_delay_save(self.give_data, CREDIT_LEDGER_SAVE_DELAY)
+
+    def remove_station(self, station):
+        self._counters.pop("station:" + station, None)
+        if self._store is not None:
+            self._store.async_delay_save(self.give_data, CREDIT_LEDGER_SAVE_DELAY)
+
+    def give_overall_count(self):
+        return self._overall_count
+
+    def _give_counts(self, counter_name, current_time):
+        counter = self._counters.get(counter_name, {})
+        counts = {}
+        for period, period_id in give_period_ids(current_time).items():
+            period_count = counter.get(period)
+            if period_count is None or period_count[0] != period_id:
+                # nothing recorded within current period
+                counts[period] = 0
+            else:
+                counts[period] = period_count[1]
+        return counts
+
+    def give_key_counts(self, key, current_time):
+        """give credit of current hour, day and month for API key"""
+        return self._give_counts("key:" + give_key_id(key), current_time)
+
+    def give_station_counts(self, station, current_time):
+        """give credit of current hour, day and month for station"""
+        return self._give_counts("station:" + station, current_time)
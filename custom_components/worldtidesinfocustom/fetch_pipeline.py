@@ -0,0 +1,128 @@
+"""Fetch pipeline shared by all the stations."""
+# Python library
+import asyncio
+import logging
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+# Component library
+from .const import DEFAULT_FETCH_MAX_PARALLEL_REQUESTS
+
+
+class WorldTidesInfo_Request_Coalescer:
+    """Share one in-flight request among all the stations asking the same"""
+
+    def __init__(self, max_parallel_requests):
+        """Initialize the requests in flight"""
+        self._in_flight = {}
+        # cap on requests really sent to server
+        self._request_semaphore = asyncio.Semaphore(max_parallel_requests)
+        # metrics
+        self._request_count = 0
+        self._coalesced_count = 0
+
+    async def _async_limited_request(self, request_factory):
+        async with self._request_semaphore:
+            return await request_factory()
+
+    async def async_request(self, request_key, request_factory):
+        """give the result of request and whether the caller owns the request"""
+        task = self._in_flight.get(request_key)
+        if task is not None:
+            self._coalesced_count += 1
+            return await asyncio.shield(task), False
+
+        self._request_count += 1
+        task = asyncio.ensure_future(self._async_limited_request(request_factory))
+        self._in_flight[request_key] = task
+        try:
+            # the request goes on for the others even if the owner is cancelled
+            return await asyncio.shield(task), True
+        finally:
+            self._in_flight.pop(request_key, None)
+
+    def get_statistics(self):
+        return {
+            "request_count": self._request_count,
+            "request_coalesced": self._coalesced_count,
+        }
+
+
+class WorldTidesInfo_Fetch_Pipeline:
+    """Fetch at once the data of all stations that need it"""
+
+    def __init__(
+        self, coordinators, max_parallel_requests=DEFAULT_FETCH_MAX_PARALLEL_REQUESTS
+    ):
+        """Initialize with the coordinators of all stations (by name)"""
+        self._coordinators = coordinators
+        self._max_parallel_requests = max_parallel_requests
+        # one batch at a time, the requests of a batch are in parallel
+        self._batch_lock = asyncio.Lock()
+        # identical requests of several stations are sent once
+        self._request_coalescer = WorldTidesInfo_Request_Coalescer(
+            max_parallel_requests
+        )
+
+        # metrics
+        self._batch_count = 0
+        self._last_batch_size = 0
+        self._last_batch_wall_time = 0
+        self._total_wall_time = 0
+
+    async def async_fetch(self, current_time):
+        """fetch the data of all stations that need it"""
+        async with self._batch_lock:
+            # the batch is computed once the lock is taken :
+            # a previous batch may have fetched a station in between
+            batch = [
+                (name, coordinator)
+                for name, coordinator in self._coordinators.items()
+                if coordinator.need_to_fetch_server_data(current_time)
+            ]
+            if len(batch) == 0:
+                return
+
+            start_time = time.monotonic()
+            results = await asyncio.gather(
+                *[
+                    coordinator.async_fetch_server_data(current_time)
+                    for name, coordinator in batch
+                ],
+                return_exceptions=True,
+            )
+            wall_time = time.monotonic() - start_time
+
+            # each station has committed its own data
+            for (name, coordinator), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    _LOGGER.error(
+                        "Error fetching data from WorldTidesInfo %s : %s",
+                        name,
+                        repr(result),
+                    )
+
+            self._batch_count += 1
+            self._last_batch_size = len(batch)
+            self._last_batch_wall_time = wall_time
+            self._total_wall_time += wall_time
+            _LOGGER.debug(
+                "Fetch of %s station(s) done in %.3f s (%s in parallel)",
+                len(batch),
+                wall_time,
+                self._max_parallel_requests,
+            )
+
+    def get_request_coalescer(self):
+        return self._request_coalescer
+
+    def get_statistics(self):
+        statistics = {
+            "fetch_batch_count": self._batch_count,
+            "fetch_last_batch_size": self._last_batch_size,
+            "fetch_last_batch_wall_time": round(self._last_batch_wall_time, 3),
+            "fetch_total_wall_time": round(self._total_wall_time, 3),
+        }
+        statistics.update(self._request_coalescer.get_statistics())
+        return statistics
@@ -0,0 +1,69 @@
+"""Measures of the hot path of a station."""
+# Python library
+import time
+
+# measures : name, unit
+HOT_PATH_FETCH_LATENCY = "fetch_latency"
+HOT_PATH_DECODE_TIME = "decode_time"
+HOT_PATH_PLOT_RENDER_TIME = "plot_render_time"
+HOT_PATH_SNAPSHOT_WRITE_TIME = "snapshot_write_time"
+HOT_PATH_BYTES_STORED = "bytes_stored"
+HOT_PATH_EXECUTOR_QUEUE_WAIT = "executor_queue_wait"
+HOT_PATH_MEASURES = {
+    HOT_PATH_FETCH_LATENCY: "ms",
+    HOT_PATH_DECODE_TIME: "ms",
+    HOT_PATH_PLOT_RENDER_TIME: "ms",
+    HOT_PATH_SNAPSHOT_WRITE_TIME: "ms",
+    HOT_PATH_BYTES_STORED: "B",
+    HOT_PATH_EXECUTOR_QUEUE_WAIT: "ms",
+}
+
+
+class Hot_Path_Timer:
+    """Last value, count and total of each measure, kept only if enabled"""
+
+    def __init__(self, enabled=False):
+        """Initialize the measures"""
+        self._enabled = enabled
+        # written from event loop, executor and render worker :
+        # each measure is only replaced, never read and written at once
+        self._last_value = {}
+        self._count = {}
+        self._total = {}
+
+    def is_enabled(self):
+        return self._enabled
+
+    def start(self):
+        """give the start time of a measure (None if disabled)"""
+        if not self._enabled:
+            return None
+        return time.monotonic()
+
+    def stop(self, measure, start_time):
+        """record the time elapsed since start (in ms)"""
+        if start_time is None:
+            return
+        self.record(measure, (time.monotonic() - start_time) * 1000)
+
+    def record(self, measure, value):
+        if not self._enabled:
+            return
+        self._last_value[measure] = value
+        self._count[measure] = self._count.get(measure, 0) + 1
+        self._total[measure] = self._total.get(measure, 0) + value
+
+    def give_last_value(self, measure):
+        value = self._last_value.get(measure)
+        if value is None:
+            return None
+        return round(value, 1)
+
+    def give_measure_statistics(self, measure):
+        count = self._count.get(measure, 0)
+        if count == 0:
+            return {"count": 0}
+        return {
+            "count": count,
+            "mean": round(self._total[measure] / count, 1),
+        }
@@ -0,0 +1,107 @@
+"""Scaled pictures given by cameras."""
+# Python library
+import io
+import threading
+from collections import OrderedDict
+
+# Pillow : without it the full size picture is given
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except:
+    PIL_AVAILABLE = False
+
+# Component library
+from .const import CAMERA_RESIZED_PICTURE_MEMORY_BUDGET
+
+# given by give_cached_picture when picture has to be scaled
+PICTURE_NOT_CACHED = object()
+
+
+def scale_picture(image, width, height):
+    """give the picture scaled down to fit in width x height (ratio kept)"""
+    with Image.open(io.BytesIO(image)) as picture:
+        target_width = width if width else picture.width
+        target_height = height if height else picture.height
+        if target_width >= picture.width and target_height >= picture.height:
+            # never scaled up
+            return image
+        picture.thumbnail((target_width, target_height))
+        scaled_image = io.BytesIO()
+        picture.save(scaled_image, format="PNG")
+    return scaled_image.getvalue()
+
+
+class Resized_Picture_Cache:
+    """Scaled pictures of one camera, least recently used dropped first"""
+
+    def __init__(self, memory_budget=CAMERA_RESIZED_PICTURE_MEMORY_BUDGET):
+        """Initialize the data"""
+        self._memory_budget = memory_budget
+        # scaled picture by (generation, width, height)
+        self._pictures = OrderedDict()
+        self._memory_used = 0
+        self._generation = None
+        # used from event loop and executor
+        self._lock = threading.Lock()
+
+        # metrics
+        self._hit_count = 0
+        self._miss_count = 0
+
+    def _forget_previous_generation(self, generation):
+        if generation != self._generation:
+            self._pictures.clear()
+            self._memory_used = 0
+            self._generation = generation
+
+    def give_cached_picture(self, generation, image, width, height):
+        """give the picture without scaling it (PICTURE_NOT_CACHED : to be scaled)"""
+        if image is None or not PIL_AVAILABLE or (not width and not height):
+            return image
+        with self._lock:
+            self._forget_previous_generation(generation)
+            picture_key = (generation, width, height)
+            scaled_image = self._pictures.get(picture_key)
+            if scaled_image is None:
+                return PICTURE_NOT_CACHED
+            self._pictures.move_to_end(picture_key)
+            self._hit_count += 1
+            return scaled_image
+
+    def give_picture(self, generation, image, width, height):
+        """give the picture, scaled if needed (CPU : run in executor)"""
+        # no picture yet
+        if image is None:
+            return None
+        scaled_image = self.give_cached_picture(generation, image, width, height)
+        if scaled_image is not PICTURE_NOT_CACHED:
+            return scaled_image
+
+        scaled_image = scale_picture(image, width, height)
+
+        with self._lock:
+            self._miss_count += 1
+            self._forget_previous_generation(generation)
+            picture_key = (generation, width, height)
+            # picture not scaled (kept by camera), or larger than budget
+            if scaled_image is image or len(scaled_image) > self._memory_budget:
+                return scaled_image
+            previous_image = self._pictures.pop(picture_key, None)
+            if previous_image is not None:
+                self._memory_used -= len(previous_image)
+            self._pictures[picture_key] = scaled_image
+            self._memory_used += len(scaled_image)
+            while self._memory_used > self._memory_budget:
+                _, evicted_image = self._pictures.popitem(last=False)
+                self._memory_used -= len(evicted_image)
+        return scaled_image
+
+    def get_statistics(self):
+        with self._lock:
+            return {
+                "resized_picture_count": len(self._pictures),
+                "resized_picture_memory": self._memory_used,
+                "resized_picture_hit": self._hit_count,
+                "resized_picture_miss": self._miss_count,
+            }
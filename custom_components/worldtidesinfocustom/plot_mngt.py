@@ -1,9 +1,15 @@
 # Python library
+import io
+import os
 import time
+from functools import partial
 
-# matplot lib
+# matplot lib : object API only, pyplot state is not thread safe
 try:
-    from matplotlib import pyplot as plt
+    import numpy as np
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from matplotlib.image import imsave
     MATPLOTLIB_AVAILABLE = True
 except:
     MATPLOTLIB_AVAILABLE = False
@@ -11,7 +17,11 @@ except:
 # from component
 from pyworldtidesinfo.worldtidesinfo_server import give_info_from_raw_data
 
+from .const import PLOT_RENDER_MIN_INTERVAL, PLOT_RENDER_PIXEL_THRESHOLD
+from .hot_path_timer import HOT_PATH_PLOT_RENDER_TIME, Hot_Path_Timer
+from .plot_render_worker import plot_render_worker
 from .sensor_service import convert_to_perform
+from .storage_mngt import File_Picture, Memory_Picture
 
 # duration type
 LONG_DURATION = "Long"
@@ -29,6 +39,8 @@ class Plot_Manager:
         tide_prediction_duration,
         filename,
         transparent_background,
+        file_mirror=True,
+        hot_path_timer=None,
     ):
         ### for trace
         self._name = name + duration_type
@@ -37,6 +49,36 @@ class Plot_Manager:
         self._tide_prediction_duration = tide_prediction_duration
         self._filename = filename
         self._transparent_background = transparent_background
+        # last picture drawn, given to camera
+        self._picture = Memory_Picture()
+        # copy of picture in www : written by render worker
+        self._file_mirror = file_mirror
+        self._file_picture = File_Picture(os.path.dirname(filename), filename)
+        if not self._file_mirror:
+            # the previous copy would not be updated anymore
+            plot_render_worker.submit(
+                self._name + "_file", self._file_picture.remove_previous_picturefile
+            )
+        # figure owned by the render worker
+        self._figure = None
+        # static layer (tide curve) : drawn once, then restored at each plot
+        self._static_layer = None
+        self._static_layer_data = None
+        self._static_layer_origin = None
+        # overlay : current position drawn over static layer
+        self._current_height_marker = None
+        self._current_height_label = None
+        # last plot asked : data, time and current height
+        self._last_plot_data = None
+        self._last_plot_time = None
+        self._last_plot_height = None
+        # size of one pixel in axis unit (time, height) : known once drawn
+        self._pixel_size = None
+        self._skipped_render_count = 0
+        # render time measured only if enabled
+        if hot_path_timer is None:
+            hot_path_timer = Hot_Path_Timer()
+        self._hot_path_timer = hot_path_timer
 
         convert_meter_to_feet, convert_km_to_miles = convert_to_perform(
             self._unit_to_display
@@ -46,11 +88,15 @@ class Plot_Manager:
         if self._duration_type == NORMAL_DURATION:
             # 1 hour
             self._time_scale = 60 * 60
-            self._time_scale_string = "hour"
+            # tick every 3 hours
+            self._time_tick = 3 * 60 * 60
+            self._time_tick_format = "%H:%M"
         else:
             # 1 day
             self._time_scale = 60 * 60 * 24
-            self._time_scale_string = "day"
+            # tick every day
+            self._time_tick = 60 * 60 * 24
+            self._time_tick_format = "%a %d"
 
     def convert_to_unit_to_display(self, heigh_array):
         heigh_value = []
@@ -59,30 +105,108 @@ class Plot_Manager:
             heigh_value.append(converted_heigh)
         return heigh_value
 
-    def convert_to_relative_time(self, epoch_array, current_time):
-        relative_time_value = []
-        for index in range(len(epoch_array)):
-            converted_time = (epoch_array[index] - current_time) / self._time_scale
-            relative_time_value.append(converted_time)
-        return relative_time_value
+    def give_local_time_ticks(self, epoch_frame_min, epoch_frame_max):
+        """give ticks at local round time within time frame"""
+        local_time = time.localtime(epoch_frame_min)
+        epoch_tick = time.mktime(
+            (
+                local_time.tm_year,
+                local_time.tm_mon,
+                local_time.tm_mday,
+                0,
+                0,
+                0,
+                0,
+                0,
+                -1,
+            )
+        )
+        ticks = []
+        while epoch_tick <= epoch_frame_max:
+            if epoch_tick >= epoch_frame_min:
+                ticks.append(epoch_tick)
+            epoch_tick = epoch_tick + self._time_tick
+        return ticks
+
+    def plot_has_changed(self, data, current_time, current_height):
+        """check if the plot would differ from the last one"""
+        if data is not self._last_plot_data:
+            return True
 
-    def compute_new_plot(self, data, current_time):
+        pixel_size = self._pixel_size
+        if pixel_size is None:
+            return True
+
+        if current_time - self._last_plot_time >= PLOT_RENDER_MIN_INTERVAL:
+            return True
+
+        # move of the current position on the canvas
+        time_pixel_size, height_pixel_size = pixel_size
+        time_move = abs(current_time - self._last_plot_time) / time_pixel_size
+        height_move = (
+            abs(current_height - self._last_plot_height) * self._convert_meter_to_feet
+        ) / height_pixel_size
+        return max(time_move, height_move) > PLOT_RENDER_PIXEL_THRESHOLD
+
+    def submit_new_plot(self, data, current_time, tide_info=None):
+        """ask the render worker to draw the plot if it has changed"""
         if not MATPLOTLIB_AVAILABLE:
-            return
+            return False
 
         if data is None:
-            return
+            return False
 
-        tide_info = give_info_from_raw_data(data)
+        # decoder of data : the one already built if given
+        if tide_info is None:
+            tide_info = give_info_from_raw_data(data)
 
+        current_height = tide_info.give_current_height_in_UTC(current_time).get(
+            "current_height"
+        )
+        if not self.plot_has_changed(data, current_time, current_height):
+            self._skipped_render_count += 1
+            return False
+
+        if not plot_render_worker.submit(
+            self._name, partial(self.compute_new_plot, data, current_time, tide_info)
+        ):
+            return False
+
+        self._last_plot_data = data
+        self._last_plot_time = current_time
+        self._last_plot_height = current_height
+        return True
+
+    def get_skipped_render_count(self):
+        return self._skipped_render_count
+
+    def get_picture(self):
+        return self._picture
+
+    def static_layer_usable(self, data, current_time):
+        """check if the static layer covers the current time"""
+        if self._static_layer is None or data is not self._static_layer_data:
+            return False
+        # the static layer is shifted once the current position
+        # has moved of one time scale
+        return (
+            self._static_layer_origin
+            <= current_time
+            < self._static_layer_origin + self._time_scale
+        )
+
+    def compute_static_layer(self, data, current_time, tide_info):
+        """draw all that changes only with data : axis, curve and tides"""
         # Retrieve plot within time frame
         # draw below 24h : from -6h to 18h (for one day)
         # otherwise : from -6h to 18h (+ time of prediction - 1)
+        # + one time scale for the current position to move in
         epoch_frame_min = current_time - 6 * 60 * 60
         epoch_frame_max = (
             current_time
             + 3 * 6 * 60 * 60
             + ((self._tide_prediction_duration - 1) * 24 * 60 * 60)
+            + self._time_scale
         )
 
         # Retrieve heigh within time frame
@@ -91,18 +215,7 @@ class Plot_Manager:
         )
 
         height_value = self.convert_to_unit_to_display(height_data.get("height_value"))
-        height_time = self.convert_to_relative_time(
-            height_data.get("height_epoch"), current_time
-        )
-
-        # current time and height
-        current_height_data = tide_info.give_current_height_in_UTC(current_time)
-        current_height_value = self.convert_to_unit_to_display(
-            [current_height_data.get("current_height")]
-        )
-        current_height_time = self.convert_to_relative_time(
-            [current_height_data.get("current_height_epoch")], current_time
-        )
+        height_time = height_data.get("height_epoch")
 
         # Retrieve extrema within time frame
         extrema_data = tide_info.give_tide_extrema_within_time_frame(
@@ -112,28 +225,26 @@ class Plot_Manager:
         extrema_value = self.convert_to_unit_to_display(
             extrema_data.get("extrema_value")
         )
-        extrema_time = self.convert_to_relative_time(
-            extrema_data.get("extrema_epoch"), current_time
-        )
+        extrema_time = extrema_data.get("extrema_epoch")
 
         # color to draw
         extrema_color = "firebrick"
         current_height_color = "black"
 
         ### Perform plotting
-        # name is used as an id --> all coordinators works in //
-        fig = plt.figure(self._name)
-        fig.clf()
+        # figure is kept from one plot to the other
+        if self._figure is None:
+            self._figure = Figure()
+            FigureCanvasAgg(self._figure)
+        fig = self._figure
+        fig.clear()
+        if self._transparent_background:
+            fig.patch.set_alpha(0)
         ax = fig.add_subplot(1, 1, 1)
+        if self._transparent_background:
+            ax.patch.set_alpha(0)
         # trace the predict tides
         ax.plot(height_time, height_value, color="cornflowerblue")
-        # plot the current position
-        ax.plot(
-            current_height_time,
-            current_height_value,
-            color=current_height_color,
-            marker="o",
-        )
         # plot the next tide
         ax.plot(
             extrema_time,
@@ -142,35 +253,25 @@ class Plot_Manager:
             marker="o",
             linestyle="none",
         )
-        # label on axis
+        # label on axis : absolute local time
         ax.set_ylabel("height " + self._unit_to_display)
-        current_time_string = time.strftime("%a %H:%M", time.localtime(current_time))
-        ax.set_xlabel(
-            "time in " + self._time_scale_string + " respect to " + current_time_string
+        ax.set_xlabel("local time")
+        time_ticks = self.give_local_time_ticks(epoch_frame_min, epoch_frame_max)
+        ax.set_xticks(time_ticks)
+        ax.set_xticklabels(
+            [
+                time.strftime(self._time_tick_format, time.localtime(time_tick))
+                for time_tick in time_ticks
+            ]
         )
         # grid + filling
         ax.grid()
         ax.fill_between(height_time, 0, height_value, color="lightblue")
-        # annotate the current position
-        label = "{:.2f}\n@ {}".format(current_height_value[0], current_time_string)
-        ax.annotate(
-            label,  # this is the text
-            (
-                current_height_time[0],
-                current_height_value[0],
-            ),  # this is the point to label
-            textcoords="offset points",  # how to position the text
-            xytext=(0, 15),  # distance from text to points (x,y)
-            ha="center",  # horizontal alignment can be left, right or center
-            color=current_height_color,
-        )  # color
         # annotate the next tide
         for extrema_index in range(len(extrema_value)):
             extrema_time_string = time.strftime(
                 "%a %H:%M",
-                time.localtime(
-                    (extrema_time[extrema_index] * self._time_scale) + current_time
-                ),
+                time.localtime(extrema_time[extrema_index]),
             )
             label = "{:.2f}\n@ {}".format(
                 extrema_value[extrema_index], extrema_time_string
@@ -191,5 +292,94 @@ class Plot_Manager:
                 color=extrema_color,
             )  # color
 
-        # save the figure
-        fig.savefig(self._filename, transparent=self._transparent_background)
+        # overlay : not drawn with static layer (animated)
+        (self._current_height_marker,) = ax.plot(
+            [],
+            [],
+            color=current_height_color,
+            marker="o",
+            animated=True,
+        )
+        self._current_height_label = ax.annotate(
+            "",  # this is the text
+            (current_time, 0),  # this is the point to label
+            textcoords="offset points",  # how to position the text
+            xytext=(0, 15),  # distance from text to points (x,y)
+            ha="center",  # horizontal alignment can be left, right or center
+            color=current_height_color,
+            animated=True,
+        )  # color
+
+        # rasterize and keep static layer
+        fig.canvas.draw()
+        self._static_layer = fig.canvas.copy_from_bbox(fig.bbox)
+        self._static_layer_data = data
+        self._static_layer_origin = current_time
+
+        # size of one pixel, to know when the current position moves
+        x_min, x_max = ax.get_xlim()
+        y_min, y_max = ax.get_ylim()
+        self._pixel_size = (
+            float((x_max - x_min) / ax.bbox.width),
+            float((y_max - y_min) / ax.bbox.height),
+        )
+
+    def compute_new_plot(self, data, current_time, tide_info=None):
+        if not MATPLOTLIB_AVAILABLE:
+            return
+
+        if data is None:
+            return
+
+        start_time = self._hot_path_timer.start()
+
+        # decoder of data : the one already built if given
+        if tide_info is None:
+            tide_info = give_info_from_raw_data(data)
+
+        if not self.static_layer_usable(data, current_time):
+            self.compute_static_layer(data, current_time, tide_info)
+
+        # current time and height
+        current_height_data = tide_info.give_current_height_in_UTC(current_time)
+        current_height_value = self.convert_to_unit_to_display(
+            [current_height_data.get("current_height")]
+        )
+        current_height_time = [current_height_data.get("current_height_epoch")]
+        current_time_string = time.strftime("%a %H:%M", time.localtime(current_time))
+
+        ### Perform overlay over static layer
+        fig = self._figure
+        ax = self._current_height_marker.axes
+        fig.canvas.restore_region(self._static_layer)
+        # plot the current position
+        self._current_height_marker.set_data(current_height_time, current_height_value)
+        ax.draw_artist(self._current_height_marker)
+        # annotate the current position
+        self._current_height_label.set_text(
+            "{:.2f}\n@ {}".format(current_height_value[0], current_time_string)
+        )
+        self._current_height_label.xy = (
+            current_height_time[0],
+            current_height_value[0],
+        )
+        ax.draw_artist(self._current_height_label)
+
+        # keep the figure in memory
+        picture_buffer = io.BytesIO()
+        imsave(
+            picture_buffer,
+            np.asarray(fig.canvas.buffer_rgba()),
+            format="png",
+            dpi=fig.dpi,
+        )
+        picture_content = picture_buffer.getvalue()
+        self._picture.store_picture(picture_content, current_time)
+        self._hot_path_timer.stop(HOT_PATH_PLOT_RENDER_TIME, start_time)
+
+        # and its copy in www, written after the plots already queued
+        if self._file_mirror:
+            plot_render_worker.submit(
+                self._name + "_file",
+                partial(self._file_picture.store_picture, picture_content),
+            )
@@ -0,0 +1,86 @@
+"""Render worker shared by all plots."""
+# Python library
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+_LOGGER = logging.getLogger(__name__)
+
+# number of plots waiting to be drawn
+PLOT_RENDER_QUEUE_SIZE = 64
+
+
+class Plot_Render_Worker:
+    """One thread draws all the plots, one at a time"""
+
+    def __init__(self, max_queued_requests=PLOT_RENDER_QUEUE_SIZE):
+        """Initialize the queue : the thread is started at first request"""
+        self._max_queued_requests = max_queued_requests
+        # request by plot name, in order of arrival
+        self._pending = OrderedDict()
+        self._condition = threading.Condition()
+        self._thread = None
+
+        # metrics
+        self._request_count = 0
+        self._coalesced_count = 0
+        self._dropped_count = 0
+        self._render_count = 0
+        self._render_time = 0
+
+    def submit(self, request_key, render_request):
+        """queue a render, replacing the one not yet drawn for the same plot"""
+        with self._condition:
+            self._request_count += 1
+            if request_key in self._pending:
+                # only the last request of a plot is worth drawing
+                self._pending[request_key] = render_request
+                self._coalesced_count += 1
+                return True
+
+            if len(self._pending) >= self._max_queued_requests:
+                self._dropped_count += 1
+                _LOGGER.debug("Render queue full : %s not drawn", request_key)
+                return False
+
+            self._pending[request_key] = render_request
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="worldtidesinfocustom_plot", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify()
+        return True
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while len(self._pending) == 0:
+                    self._condition.wait()
+                request_key, render_request = self._pending.popitem(last=False)
+
+            start_time = time.monotonic()
+            try:
+                render_request()
+            except Exception:
+                _LOGGER.exception("Error drawing plot %s", request_key)
+            render_time = time.monotonic() - start_time
+
+            with self._condition:
+                self._render_count += 1
+                self._render_time += render_time
+
+    def get_statistics(self):
+        with self._condition:
+            return {
+                "render_request_count": self._request_count,
+                "render_coalesced": self._coalesced_count,
+                "render_dropped": self._dropped_count,
+                "render_count": self._render_count,
+                "render_total_time": round(self._render_time, 3),
+            }
+
+
+# worker shared by all coordinators
+plot_render_worker = Plot_Render_Worker()
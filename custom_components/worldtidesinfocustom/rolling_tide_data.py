@@ -0,0 +1,62 @@
+"""Rolling window of tide data : only the tail not yet held is requested."""
+# Python library
+import math
+from datetime import datetime
+
+# internal const
+## full window requested at least every 7 days (curve picture, station)
+ROLLING_FULL_FETCH_INTERVAL = 7 * 86400
+## history kept before beginning of window
+ROLLING_HISTORY_DURATION = 86400
+## time between two heights (step of request)
+ROLLING_HEIGHT_STEP = 900
+
+
+def give_data_end(data):
+    """give epoch of last height held (None if no height)"""
+    if data is None or len(data.get("heights", [])) == 0:
+        return None
+    return data["heights"][-1]["dt"]
+
+
+def give_tail_request(data, window_start, window_end):
+    """give date and days of the tail not yet held (None : full window)"""
+    data_end = give_data_end(data)
+    if data_end is None or data["heights"][0]["dt"] > window_start:
+        return None
+    # from the day of first height not held (local time) : if the server
+    # begins a day at another hour, a gap is found once the tail is received
+    tail_start = datetime.fromtimestamp(data_end + ROLLING_HEIGHT_STEP).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    return {
+        "date": tail_start.strftime("%Y-%m-%d"),
+        "days": max(1, math.ceil((window_end - tail_start.timestamp()) / 86400)),
+    }
+
+
+def tail_follows_data(data, tail_data):
+    """check that tail begins before the end of data held (no gap)"""
+    data_end = give_data_end(data)
+    if data_end is None or len(tail_data.get("heights", [])) == 0:
+        return False
+    return tail_data["heights"][0]["dt"] <= data_end + ROLLING_HEIGHT_STEP
+
+
+def merge_tide_data(data, tail_data, trim_time):
+    """give data held then tail (that replaces overlap), history trimmed"""
+    tail_start = tail_data["heights"][0]["dt"]
+    # station, datum of last response
+    merged_data = dict(tail_data)
+    merged_data["heights"] = [
+        height for height in data["heights"] if trim_time <= height["dt"] < tail_start
+    ] + tail_data["heights"]
+    merged_data["extremes"] = [
+        extrema
+        for extrema in data.get("extremes", [])
+        if trim_time <= extrema["dt"] < tail_start
+    ] + tail_data.get("extremes", [])
+    # datums only given by full request
+    if "datums" not in merged_data and "datums" in data:
+        merged_data["datums"] = data["datums"]
+    return merged_data
@@ -30,7 +30,11 @@ from homeassistant.const import (
 )
 from homeassistant.helpers.device_registry import DeviceEntryType
 from homeassistant.helpers.entity import DeviceInfo, Entity, EntityCategory
-from homeassistant.helpers.entity_registry import async_get
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import (
+    async_dispatcher_connect,
+    async_dispatcher_send,
+)
 
 # HA library
 from homeassistant.helpers.event import async_track_state_change_event
@@ -46,7 +50,11 @@ from pyworldtidesinfo.worldtidesinfo_server import (
 )
 
 # Component Library
-from . import give_persistent_filename, worldtidesinfo_data_coordinator
+from . import (
+    async_get_shared_data_store,
+    give_persistent_filename,
+    worldtidesinfo_data_coordinator,
+)
 
 # Live Position Management
 from .basic_service import distance_lat_long
@@ -58,22 +66,36 @@ from .const import (
     CONF_ATTRIBUTE_NAME_LAT,
     CONF_ATTRIBUTE_NAME_LONG,
     CONF_DAY_TIDE_PREDICTION,
+    CONF_HOT_PATH_TIMING,
+    CONF_INCREMENTAL_FETCH,
     CONF_LIVE_LOCATION,
     CONF_MAT_PLOT_TRANS_BCKGROUND,
+    CONF_MONTHLY_CREDIT_BUDGET,
     CONF_PLOT_BACKGROUND,
     CONF_PLOT_COLOR,
+    CONF_PLOT_FILE_MIRROR,
+    CONF_PREFETCH_TIME,
+    CONF_REFRESH_WINDOW,
     CONF_SENSOR_UPDATE_DISTANCE,
+    CONF_SHARED_DATA_STORE,
     CONF_STATION_DISTANCE,
     CONF_UNIT,
     CONF_VERTICAL_REF,
     DATA_COORDINATOR,
     DEFAULT_CONF_UNIT,
     DEFAULT_DAY_TIDE_PREDICTION,
+    DEFAULT_HOT_PATH_TIMING,
+    DEFAULT_INCREMENTAL_FETCH,
     DEFAULT_MAT_PLOT_TRANS_BCKGROUND,
+    DEFAULT_MONTHLY_CREDIT_BUDGET,
     DEFAULT_NAME,
     DEFAULT_PLOT_BACKGROUND,
     DEFAULT_PLOT_COLOR,
+    DEFAULT_PLOT_FILE_MIRROR,
+    DEFAULT_PREFETCH_TIME,
+    DEFAULT_REFRESH_WINDOW,
     DEFAULT_SENSOR_UPDATE_DISTANCE,
+    DEFAULT_SHARED_DATA_STORE,
     DEFAULT_STATION_DISTANCE,
     DEFAULT_VERTICAL_REF,
     DEVICE_CONF_URL,
@@ -99,37 +121,25 @@ from .const import (
     SENSOR_NEXT_TIDE_SUFFIX,
     SENSOR_REMAINING_TIME_FOR_NEXT_TIDE_SUFFIX,
     SENSOR_TIDE_STATION_INFO_SUFFIX,
+    SIGNAL_TIDE_STATE_FRAME,
     STATIC_CONF,
     WORLD_TIDES_INFO_CUSTOM_DOMAIN,
 )
 
+# Hot path measures
+from .hot_path_timer import HOT_PATH_BYTES_STORED, HOT_PATH_MEASURES
+
 # Live Position Management
 from .live_position_management import Live_Position_Management
 
 # sensor_service
 from .sensor_service import (
     convert_to_perform,
-    current_amplitude_attribute,
-    current_amplitude_state,
-    current_coeff_state,
-    current_height_attribute,
-    current_height_state,
     get_all_tide_info,
     get_tide_info,
-    get_tide_info_and_offset,
     give_unit_attribute,
-    icon_tendancy,
-    next_amplitude_attribute,
-    next_high_tide_height_state,
-    next_high_tide_time_state,
-    next_low_tide_height_state,
-    next_low_tide_time_state,
-    next_tide_attribute,
-    next_tide_state,
-    remaining_time_to_next_tide,
     schedule_time_attribute,
     tide_station_attribute,
-    tide_tendancy_attribute,
     worldtidesinfo_unique_id,
 )
 from .server_request_scheduler import WorldTidesInfo_server_scheduler
@@ -193,6 +203,13 @@ def setup_sensor(
     source,
     source_attr_lat,
     source_attr_long,
+    shared_data_store=None,
+    plot_file_mirror=DEFAULT_PLOT_FILE_MIRROR,
+    hot_path_timing=DEFAULT_HOT_PATH_TIMING,
+    monthly_credit_budget=DEFAULT_MONTHLY_CREDIT_BUDGET,
+    refresh_window=DEFAULT_REFRESH_WINDOW,
+    prefetch_time=DEFAULT_PREFETCH_TIME,
+    incremental_fetch=DEFAULT_INCREMENTAL_FETCH,
 ):
     """setup sensor with server, server scheduler in async or sync configuration"""
     unique_id = worldtidesinfo_unique_id(lat, lon, live_position_management, source)
@@ -223,6 +240,13 @@ def setup_sensor(
         tide_prediction_duration,
         unit_to_display,
         mat_plot_transparent_background,
+        shared_data_store,
+        plot_file_mirror,
+        hot_path_timing,
+        monthly_credit_budget,
+        refresh_window,
+        prefetch_time,
+        incremental_fetch,
     )
     worldtidesinfo_data_coordinator[name] = worldtide_data_coordinator
 
@@ -363,6 +387,23 @@ def setup_sensor(
         unique_id,
     )
 
+    # measures of hot path
+    tides_hot_path = []
+    if hot_path_timing:
+        for measure in HOT_PATH_MEASURES:
+            tides_hot_path.append(
+                WorldTidesInfoCustomSensorHotPath(
+                    hass,
+                    name,
+                    unit_to_display,
+                    show_on_map,
+                    worldtide_data_coordinator,
+                    live_position_manager,
+                    unique_id,
+                    measure,
+                )
+            )
+
     return [
         tides,
         tides_current_height,
@@ -377,7 +418,7 @@ def setup_sensor(
         tide_station_info,
         tides_credit_used,
         tides_global_credit_used,
-    ]
+    ] + tides_hot_path
 
 
 def setup_platform(hass, config, add_entities, discovery_info=None):
@@ -513,6 +554,39 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
     source_attr_lat = config.get(CONF_ATTRIBUTE_NAME_LAT)
     source_attr_long = config.get(CONF_ATTRIBUTE_NAME_LONG)
 
+    # data of all stations in one file (read once for all)
+    shared_data_store = None
+    if config_entry.options.get(CONF_SHARED_DATA_STORE, DEFAULT_SHARED_DATA_STORE):
+        shared_data_store = await async_get_shared_data_store(hass)
+
+    # copy of plot pictures in www
+    plot_file_mirror = config_entry.options.get(
+        CONF_PLOT_FILE_MIRROR, DEFAULT_PLOT_FILE_MIRROR
+    )
+
+    # diagnostic sensors with measures of hot path
+    hot_path_timing = config_entry.options.get(
+        CONF_HOT_PATH_TIMING, DEFAULT_HOT_PATH_TIMING
+    )
+
+    # monthly credit budget of API key
+    monthly_credit_budget = config_entry.options.get(
+        CONF_MONTHLY_CREDIT_BUDGET, DEFAULT_MONTHLY_CREDIT_BUDGET
+    )
+
+    # refresh spread over a window before midnight
+    refresh_window = config_entry.options.get(
+        CONF_REFRESH_WINDOW, DEFAULT_REFRESH_WINDOW
+    )
+
+    # next day prefetched before midnight
+    prefetch_time = config_entry.options.get(CONF_PREFETCH_TIME, DEFAULT_PREFETCH_TIME)
+
+    # only tail of data requested each day
+    incremental_fetch = config_entry.options.get(
+        CONF_INCREMENTAL_FETCH, DEFAULT_INCREMENTAL_FETCH
+    )
+
     tides_sensors = setup_sensor(
         hass,
         name,
@@ -532,6 +606,13 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
         source,
         source_attr_lat,
         source_attr_long,
+        shared_data_store,
+        plot_file_mirror,
+        hot_path_timing,
+        monthly_credit_budget,
+        refresh_window,
+        prefetch_time,
+        incremental_fetch,
     )
 
     _LOGGER.debug(f"Launch fetching data available for this location: {name}")
@@ -593,10 +674,9 @@ class WorldTidesInfoCustomSensorGeneric(SensorEntity):
     @property
     def icon(self):
         """return icon tendancy"""
-        current_time = time.time()
-        # the tide info
-        tide_info = get_tide_info(self._worldtide_data_coordinator)
-        return icon_tendancy(tide_info, current_time)
+        # the tide state
+        tide_state = self._worldtide_data_coordinator.get_tide_state_frame()
+        return tide_state.get_icon()
 
     # state : to be defined by class
 
@@ -613,35 +693,29 @@ class WorldTidesInfoCustomSensorGeneric(SensorEntity):
 
 
 class WorldTidesInfoCustomSensorFollower(WorldTidesInfoCustomSensorGeneric):
-    def _async_worldtidesinfo_follower_sensor_state_listener(self, event):
-        # retrieve state
-        new_state = event.data.get("new_state")
-        if new_state is None:
-            return
+    @property
+    def should_poll(self):
+        """the main sensor notifies each new tide state"""
+        return False
 
-        self.schedule_update_ha_state(force_refresh=True)
+    @callback
+    def _async_worldtidesinfo_tide_state_frame_listener(self):
+        # the values are read from the tide state of coordinator
+        self.async_write_ha_state()
 
     async def async_added_to_hass(self):
         """Handle added to Hass."""
         await super().async_added_to_hass()
 
-        entity_id_main_sensor = None
-
-        # Fetch the name of sensor
-        registry = async_get(self.hass)
-        entity_id_main_sensor = registry.async_get_entity_id(
-            "sensor", DOMAIN, self._unique_id + SENSOR_NEXT_TIDE_SUFFIX
-        )
-        _LOGGER.debug("Sensor: entity main sensor %s", entity_id_main_sensor)
-
-        if entity_id_main_sensor is None:
-            entity_id_main_sensor = "sensor." + self._name + SENSOR_NEXT_TIDE_SUFFIX
-
-        async_track_state_change_event(
-            self._hass,
-            [entity_id_main_sensor],
-            self._async_worldtidesinfo_follower_sensor_state_listener,
+        # listen to the main sensor of the station
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self._hass,
+                SIGNAL_TIDE_STATE_FRAME.format(self._unique_id),
+                self._async_worldtidesinfo_tide_state_frame_listener,
+            )
         )
+        _LOGGER.debug("Sensor: listen tide state of %s", self._name)
 
 
 class WorldTidesInfoCustomSensorCurrentHeight(WorldTidesInfoCustomSensorFollower):
@@ -676,20 +750,14 @@ class WorldTidesInfoCustomSensorCurrentHeight(WorldTidesInfoCustomSensorFollower
     def extra_state_attributes(self):
         """Return the state attributes of this device."""
         attr = {ATTR_ATTRIBUTION: ATTRIBUTION}
-        current_time = time.time()
-        convert_meter_to_feet, convert_km_to_miles = convert_to_perform(
-            self._unit_to_display
-        )
 
         # Unit system
         attr.update(give_unit_attribute(self._unit_to_display))
 
-        # the tide info
-        tide_info = get_tide_info(self._worldtide_data_coordinator)
+        # the tide state
+        tide_state = self._worldtide_data_coordinator.get_tide_state_frame()
         # The height
-        attr.update(
-            current_height_attribute(tide_info, current_time, convert_meter_to_feet)
-        )
+        attr.update(tide_state.get_attribute("current_height"))
 
         return attr
 
@@ -697,15 +765,10 @@ class WorldTidesInfoCustomSensorCurrentHeight(WorldTidesInfoCustomSensorFollower
     def native_value(self):
         """Return the state of the device."""
 
-        current_time = time.time()
-        convert_meter_to_feet, convert_km_to_miles = convert_to_perform(
-            self._unit_to_display
-        )
-
-        # the tide info
-        tide_info = get_tide_info(self._worldtide_data_coordinator)
+        # the tide state
+        tide_state = self._worldtide_data_coordinator.get_tide_state_frame()
         # The height
-        return current_height_state(tide_info, current_time, convert_meter_to_feet)
+        return tide_state.get_attribute("current_height").get("current_height")
 
 
 class WorldTidesInfoCustomSensorForecastHeight(WorldTidesInfoCustomSensorFollower):
@@ -714,11 +777,9 @@ class WorldTidesInfoCustomSensorForecastHeight(WorldTidesInfoCustomSensorFollowe
     @property
     def icon(self):
         """return icon tendancy"""
-        current_time = time.time()
-        forecast_time = current_time + SENSOR_FORECAST_TIDE_DURATION
-        # the tide info
-        tide_info = get_tide_info(self._worldtide_data_coordinator)
-        return icon_tendancy(tide_info, forecast_time)
+        # the tide state
+        tide_state = self._worldtide_data_coordinator.get_tide_state_frame()
+        return tide_state.get_forecast_icon()
 
 
     @property
@@ -750,22 +811,16 @@ class WorldTidesInfoCustomSensorForecastHeight(WorldTidesInfoCustomSensorFollowe
     def extra_state_attributes(self):
         """Return the state attributes of this device."""
         attr = {ATTR_ATTRIBUTION: ATTRIBUTION}
-        current_time = time.time()
-        forecast_time = current_time + SENSOR_FORECAST_TIDE_DURATION
-
-        convert_meter_to_feet, convert_km_to_miles = convert_to_perform(
-            self._unit_to_display
-        )
 
         # Unit system
         attr.update(give_unit_attribute(self._unit_to_display))
 
-        # the tide info
-        tide_info = get_tide_info(self._worldtide_data_coordinator)
+        # the tide state
+        tide_state = self._worldtide_data_coordinator.get_tide_state_frame()
         # The height
-        attr.update(
-            current_height_attribute(tide_info, forecast_time, convert_meter_to_feet)
-        )
+        attr.update(tide_state.get_attribute("forecast_height"))
+        # The height at several horizons
+        attr.update(tide_state.get_attribute("forecast_heights"))
 
         #forecast duration in hour
         attr["forecast_duration_in_hour"] = SENSOR_FORECAST_TIDE_DURATION/60/60
@@ -776,16 +831,10 @@ class WorldTidesInfoCustomSensorForecastHeight(WorldTidesInfoCustomSensorFollowe
     def native_value(self):
         """Return the state of the device."""
 
-        current_time = time.time()
-        forecast_time = current_time + SENSOR_FORECAST_TIDE_DURATION
-        convert_meter_to_feet, convert_km_to_miles = convert_to_perform(
-            self._unit_to_display
-        )
-
-        # the tide info
-        tide_info = get_tide_info(self._worldtide_data_coordinator)
+        # the tide state
+        tide_state = self._worldtide_data_coordinator.get_tide_state_frame()
         # The height
-        return current_height_state(tide_info, forecast_time, convert_meter_to_feet)
+        return tide_state.get_attribute("forecast_height").get("current_height")
 
 
 class WorldTidesInfoCustomSensorNextLowTideHeight(WorldTidesInfoCustomSensorFollower):
@@ -812,10 +861,6 @@ class WorldTidesInfoCustomSensorNextLowTideHeight(WorldTidesInfoCustomSensorFoll
     def extra_state_attributes(self):
         """Return the state attributes of this device."""
         attr = {ATTR_ATTRIBUTION: ATTRIBUTION}
-        current_time = time.time()
-        convert_meter_to_feet, convert_km_to_miles = convert_to_perform(
-            self._unit_to_display
-        )
 
         # Unit system
         attr.update(give_unit_attribute(self._unit_to_display))
@@ -823,10 +868,10 @@ class WorldTidesInfoCustomSensorNextLowTideHeight(WorldTidesInfoCustomSensorFoll
         if self._worldtide_data_coordinator.no_data():
             return attr
 
-        # the tide info
-        tide_info = get_tide_info(self._worldtide_data_coordinator)
+        # the tide state
+        tide_state = self._worldtide_data_coordinator.get_tide_state_frame()
         # Next tide
-        attr.update(next_tide_attribute(tide_info, current_time, convert_meter_to_feet))
+        attr.update(tide_state.get_attribute("next_tide"))
 
         return attr
 
@@ -834,21 +879,15 @@ class WorldTidesInfoCustomSensorNextLowTideHeight(WorldTidesInfoCustomSensorFoll
     def native_value(self):
         """Return the state of the device."""
         state_value = None
-        current_time = time.time()
-        convert_meter_to_feet, convert_km_to_miles = convert_to_perform(
-            self._unit_to_display
-        )
 
         # Unit system
         if self._worldtide_data_coordinator.no_data():
             return state_value
 
-        # the tide info
-        tide_info = get_tide_info(self._worldtide_data_coordinator)
+        # the tide state
+        tide_state = self._worldtide_data_coordinator.get_tide_state_frame()
         # Next low tide Height
-        state_value = next_low_tide_height_state(
-            tide_info, current_time, convert_meter_to_feet
-        )
+        state_value = tide_state.get_attribute("next_tide").get("low_tide_height")
         return state_value
 
 
@@ -868,10 +907,6 @@ class WorldTidesInfoCustomSensorNextLowTideTime(WorldTidesInfoCustomSensorFollow
     def extra_state_attributes(self):
         """Return the state attributes of this device."""
         attr = {ATTR_ATTRIBUTION: ATTRIBUTION}
-        current_time = time.time()
-        convert_meter_to_feet, convert_km_to_miles = convert_to_perform(
-            self._unit_to_display
-        )
 
         # Unit system
         attr.update(give_unit_attribute(self._unit_to_display))
@@ -879,10 +914,10 @@ class WorldTidesInfoCustomSensorNextLowTideTime(WorldTidesInfoCustomSensorFollow
         if self._worldtide_data_coordinator.no_data():
             return attr
 
-        # the tide info
-        tide_info = get_tide_info(self._worldtide_data_coordinator)
+        # the tide state
+        tide_state = self._worldtide_data_coordinator.get_tide_state_frame()
         # Next tide
-        attr.update(next_tide_attribute(tide_info, current_time, convert_meter_to_feet))
+        attr.update(tide_state.get_attribute("next_tide"))
 
         return attr
 
@@ -890,15 +925,14 @@ class WorldTidesInfoCustomSensorNextLowTideTime(WorldTidesInfoCustomSensorFollow
     def native_value(self):
         """Return the state of the device."""
         state_value = None
-        current_time = time.time()
 
         if self._worldtide_data_coordinator.no_data():
             return state_value
 
-        # the tide info
-        tide_info = get_tide_info(self._worldtide_data_coordinator)
+        # the tide state
+        tide_state = self._worldtide_data_coordinator.get_tide_state_frame()
         # Next low tide time
-        state_value = next_low_tide_time_state(tide_info, current_time)
+        state_value = tide_state.get_attribute("next_tide").get("low_tide_time_local")
         return state_value
 
 
@@ -926,10 +960,6 @@ class WorldTidesInfoCustomSensorNextHighTideHeight(WorldTidesInfoCustomSensorFol
     def extra_state_attributes(self):
         """Return the state attributes of this device."""
         attr = {ATTR_ATTRIBUTION: ATTRIBUTION}
-        current_time = time.time()
-        convert_meter_to_feet, convert_km_to_miles = convert_to_perform(
-            self._unit_to_display
-        )
 
         # Unit system
         attr.update(give_unit_attribute(self._unit_to_display))
@@ -937,10 +967,10 @@ class WorldTidesInfoCustomSensorNextHighTideHeight(WorldTidesInfoCustomSensorFol
         if self._worldtide_data_coordinator.no_data():
             return attr
 
-        # the tide info
-        tide_info = get_tide_info(self._worldtide_data_coordinator)
+        # the tide state
+        tide_state = self._worldtide_data_coordinator.get_tide_state_frame()
         # Next tide
-        attr.update(next_tide_attribute(tide_info, current_time, convert_meter_to_feet))
+        attr.update(tide_state.get_attribute("next_tide"))
 
         return attr
 
@@ -948,21 +978,15 @@ class WorldTidesInfoCustomSensorNextHighTideHeight(WorldTidesInfoCustomSensorFol
     def native_value(self):
         """Return the state of the device."""
         state_value = None
-        current_time = time.time()
-        convert_meter_to_feet, convert_km_to_miles = convert_to_perform(
-            self._unit_to_display
-        )
 
         # Unit system
         if self._worldtide_data_coordinator.no_data():
             return state_value
 
-        # the tide info
-        tide_info = get_tide_info(self._worldtide_data_coordinator)
-        # Next low tide Height
-        state_value = next_high_tide_height_state(
-            tide_info, current_time, convert_meter_to_feet
-        )
+        # the tide state
+        tide_state = self._worldtide_data_coordinator.get_tide_state_frame()
+        # Next high tide Height
+        state_value = tide_state.get_attribute("next_tide").get("high_tide_height")
 
         return state_value
 
@@ -983,10 +1007,6 @@ class WorldTidesInfoCustomSensorNextHighTideTime(WorldTidesInfoCustomSensorFollo
     def extra_state_attributes(self):
         """Return the state attributes of this device."""
         attr = {ATTR_ATTRIBUTION: ATTRIBUTION}
-        current_time = time.time()
-        convert_meter_to_feet, convert_km_to_miles = convert_to_perform(
-            self._unit_to_display
-        )
 
         # Unit system
         attr.update(give_unit_attribute(self._unit_to_display))
@@ -994,10 +1014,10 @@ class WorldTidesInfoCustomSensorNextHighTideTime(WorldTidesInfoCustomSensorFollo
         if self._worldtide_data_coordinator.no_data():
             return attr
 
-        # the tide info
-        tide_info = get_tide_info(self._worldtide_data_coordinator)
+        # the tide state
+        tide_state = self._worldtide_data_coordinator.get_tide_state_frame()
         # Next tide
-        attr.update(next_tide_attribute(tide_info, current_time, convert_meter_to_feet))
+        attr.update(tide_state.get_attribute("next_tide"))
 
         return attr
 
@@ -1005,15 +1025,14 @@ class WorldTidesInfoCustomSensorNextHighTideTime(WorldTidesInfoCustomSensorFollo
     def native_value(self):
         """Return the state of the device."""
         state_value = None
-        current_time = time.time()
 
         if self._worldtide_data_coordinator.no_data():
             return state_value
 
-        # the tide info
-        tide_info = get_tide_info(self._worldtide_data_coordinator)
+        # the tide state
+        tide_state = self._worldtide_data_coordinator.get_tide_state_frame()
         # Next high tide time
-        state_value = next_high_tide_time_state(tide_info, current_time)
+        state_value = tide_state.get_attribute("next_tide").get("high_tide_time_local")
         return state_value
 
 
@@ -1048,10 +1067,6 @@ class WorldTidesInfoCustomSensorNextRemainingTideTime(
     def extra_state_attributes(self):
         """Return the state attributes of this device."""
         attr = {ATTR_ATTRIBUTION: ATTRIBUTION}
-        current_time = time.time()
-        convert_meter_to_feet, convert_km_to_miles = convert_to_perform(
-            self._unit_to_display
-        )
 
         # Unit system
         attr.update(give_unit_attribute(self._unit_to_display))
@@ -1059,26 +1074,25 @@ class WorldTidesInfoCustomSensorNextRemainingTideTime(
         if self._worldtide_data_coordinator.no_data():
             return attr
 
-        # the tide info
-        tide_info = get_tide_info(self._worldtide_data_coordinator)
+        # the tide state
+        tide_state = self._worldtide_data_coordinator.get_tide_state_frame()
         # Next tide
-        attr.update(next_tide_attribute(tide_info, current_time, convert_meter_to_feet))
+        attr.update(tide_state.get_attribute("next_tide"))
 
         return attr
 
     @property
     def native_value(self):
         """Return the state of the device."""
-        current_time = time.time()
         state_value = None
 
         if self._worldtide_data_coordinator.no_data():
             return state_value
 
-        # the tide info
-        tide_info = get_tide_info(self._worldtide_data_coordinator)
-        # Compute remainig time
-        state_value = remaining_time_to_next_tide(tide_info, current_time)
+        # the tide state
+        tide_state = self._worldtide_data_coordinator.get_tide_state_frame()
+        # Remainig time
+        state_value = tide_state.get_remaining_time()
         return state_value
 
 
@@ -1114,10 +1128,6 @@ class WorldTidesInfoCustomSensorCurrentAmplitude(WorldTidesInfoCustomSensorFollo
     def extra_state_attributes(self):
         """Return the state attributes of this device."""
         attr = {ATTR_ATTRIBUTION: ATTRIBUTION}
-        current_time = time.time()
-        convert_meter_to_feet, convert_km_to_miles = convert_to_perform(
-            self._unit_to_display
-        )
 
         # Unit system
         attr.update(give_unit_attribute(self._unit_to_display))
@@ -1125,15 +1135,9 @@ class WorldTidesInfoCustomSensorCurrentAmplitude(WorldTidesInfoCustomSensorFollo
         if self._worldtide_data_coordinator.no_data():
             return attr
 
-        # the tide info : coeff and amplitude
-        tide_info, datums_info = get_tide_info_and_offset(
-            self._worldtide_data_coordinator
-        )
-        attr.update(
-            current_amplitude_attribute(
-                tide_info, datums_info, current_time, convert_meter_to_feet
-            )
-        )
+        # the tide state : coeff and amplitude
+        tide_state = self._worldtide_data_coordinator.get_tide_state_frame()
+        attr.update(tide_state.get_attribute("current_amplitude"))
 
         return attr
 
@@ -1141,22 +1145,14 @@ class WorldTidesInfoCustomSensorCurrentAmplitude(WorldTidesInfoCustomSensorFollo
     def native_value(self):
         """Return the state of the device."""
         state_value = None
-        current_time = time.time()
-        convert_meter_to_feet, convert_km_to_miles = convert_to_perform(
-            self._unit_to_display
-        )
 
         # Unit system
         if self._worldtide_data_coordinator.no_data():
             return state_value
 
-        # the tide info : amplitude
-        tide_info, datums_info = get_tide_info_and_offset(
-            self._worldtide_data_coordinator
-        )
-        state_value = current_amplitude_state(
-            tide_info, datums_info, current_time, convert_meter_to_feet
-        )
+        # the tide state : amplitude
+        tide_state = self._worldtide_data_coordinator.get_tide_state_frame()
+        state_value = tide_state.get_attribute("current_amplitude").get("tide_amplitude")
 
         return state_value
 
@@ -1190,10 +1186,6 @@ class WorldTidesInfoCustomSensorCurrentCoeffMWS(WorldTidesInfoCustomSensorFollow
     def extra_state_attributes(self):
         """Return the state attributes of this device."""
         attr = {ATTR_ATTRIBUTION: ATTRIBUTION}
-        current_time = time.time()
-        convert_meter_to_feet, convert_km_to_miles = convert_to_perform(
-            self._unit_to_display
-        )
 
         # Unit system
         attr.update(give_unit_attribute(self._unit_to_display))
@@ -1201,15 +1193,9 @@ class WorldTidesInfoCustomSensorCurrentCoeffMWS(WorldTidesInfoCustomSensorFollow
         if self._worldtide_data_coordinator.no_data():
             return attr
 
-        # the tide info: compute amplitude and coeff
-        tide_info, datums_info = get_tide_info_and_offset(
-            self._worldtide_data_coordinator
-        )
-        attr.update(
-            current_amplitude_attribute(
-                tide_info, datums_info, current_time, convert_meter_to_feet
-            )
-        )
+        # the tide state : coeff and amplitude
+        tide_state = self._worldtide_data_coordinator.get_tide_state_frame()
+        attr.update(tide_state.get_attribute("current_amplitude"))
 
         return attr
 
@@ -1217,22 +1203,14 @@ class WorldTidesInfoCustomSensorCurrentCoeffMWS(WorldTidesInfoCustomSensorFollow
     def native_value(self):
         """Return the state of the device."""
         state_value = None
-        current_time = time.time()
-        convert_meter_to_feet, convert_km_to_miles = convert_to_perform(
-            self._unit_to_display
-        )
 
         # Unit system
         if self._worldtide_data_coordinator.no_data():
             return state_value
 
-        # the tide info : coeff
-        tide_info, datums_info = get_tide_info_and_offset(
-            self._worldtide_data_coordinator
-        )
-        state_value = current_coeff_state(
-            tide_info, datums_info, current_time, convert_meter_to_feet
-        )
+        # the tide state : coeff
+        tide_state = self._worldtide_data_coordinator.get_tide_state_frame()
+        state_value = tide_state.get_attribute("current_amplitude").get("Coeff_resp_MWS")
 
         return state_value
 
@@ -1253,7 +1231,6 @@ class WorldTidesInfoCustomSensorTideStationInfo(WorldTidesInfoCustomSensorFollow
     def extra_state_attributes(self):
         """Return the state attributes of this device."""
         attr = {ATTR_ATTRIBUTION: ATTRIBUTION}
-        current_time = time.time()
         convert_meter_to_feet, convert_km_to_miles = convert_to_perform(
             self._unit_to_display
         )
@@ -1351,6 +1328,18 @@ class WorldTidesInfoCustomSensorCreditUsed(WorldTidesInfoCustomSensorFollower):
         )
         return SensorStateClass.MEASUREMENT
 
+    @property
+    def extra_state_attributes(self):
+        """Return the state attributes of this device."""
+        attr = {}
+
+        # credit of location within current hour, day and month
+        credit_counts = self._worldtide_data_coordinator.get_credit_counts(time.time())
+        for period, credit in credit_counts.get("station", {}).items():
+            attr["credit_current_" + period] = credit
+
+        return attr
+
     @property
     def native_value(self):
         """Return the state of the device."""
@@ -1404,13 +1393,21 @@ class WorldTidesInfoCustomSensorGlobalCreditUsed(WorldTidesInfoCustomSensorFollo
             monitored_location = monitored_location + "," + name
         attr["monitored_location"] = monitored_location
 
+        # credit of API key within current hour, day and month
+        credit_counts = self._worldtide_data_coordinator.get_credit_counts(time.time())
+        for period, credit in credit_counts.get("key", {}).items():
+            attr["credit_current_" + period] = credit
+
+        # budget of API key and credit expected at end of month
+        attr.update(self._worldtide_data_coordinator.get_credit_budget(time.time()))
+
         return attr
 
     @property
     def native_value(self):
         """Return the state of the device."""
-        # The credit used to display the update
-        return self._worldtide_data_coordinator.overall_count
+        # The credit used by all locations since last update
+        return self._worldtide_data_coordinator.get_global_credit_used()
 
     @property
     def icon(self):
@@ -1418,6 +1415,78 @@ class WorldTidesInfoCustomSensorGlobalCreditUsed(WorldTidesInfoCustomSensorFollo
         return "mdi:credit-card-multiple-outline"
 
 
+class WorldTidesInfoCustomSensorHotPath(WorldTidesInfoCustomSensorFollower):
+    """Representation of a measure of hot path."""
+
+    def __init__(
+        self,
+        hass,
+        name,
+        unit_to_display,
+        show_on_map,
+        worldtide_data_coordinator,
+        live_position_manager,
+        unique_id,
+        measure,
+    ):
+        """Initialize the sensor."""
+        super().__init__(
+            hass,
+            name,
+            unit_to_display,
+            show_on_map,
+            worldtide_data_coordinator,
+            live_position_manager,
+            unique_id,
+        )
+        self._measure = measure
+
+    @property
+    def entity_category(self):
+        """Return the entity category."""
+        return EntityCategory.DIAGNOSTIC
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return self._name + "_" + self._measure
+
+    @property
+    def unique_id(self):
+        return self._unique_id + "_" + self._measure
+
+    @property
+    def native_unit_of_measurement(self):
+        """Return the unit the value is expressed in."""
+        return HOT_PATH_MEASURES[self._measure]
+
+    @property
+    def state_class(self):
+        """Return the state class for long term statistics."""
+        return SensorStateClass.MEASUREMENT
+
+    @property
+    def extra_state_attributes(self):
+        """Return the state attributes of this device."""
+        # number of measures and mean since start
+        hot_path_timer = self._worldtide_data_coordinator.get_hot_path_timer()
+        return hot_path_timer.give_measure_statistics(self._measure)
+
+    @property
+    def native_value(self):
+        """Return the state of the device."""
+        # the last measure
+        hot_path_timer = self._worldtide_data_coordinator.get_hot_path_timer()
+        return hot_path_timer.give_last_value(self._measure)
+
+    @property
+    def icon(self):
+        """return icon of measure"""
+        if self._measure == HOT_PATH_BYTES_STORED:
+            return "mdi:database-outline"
+        return "mdi:timer-outline"
+
+
 class WorldTidesInfoCustomSensor(RestoreEntity, WorldTidesInfoCustomSensorGeneric):
     """Representation of a WorldTidesInfo sensor."""
 
@@ -1434,7 +1503,6 @@ class WorldTidesInfoCustomSensor(RestoreEntity, WorldTidesInfoCustomSensorGeneri
     def extra_state_attributes(self):
         """Return the state attributes of this device."""
         attr = {ATTR_ATTRIBUTION: ATTRIBUTION}
-        current_time = time.time()
         convert_meter_to_feet, convert_km_to_miles = convert_to_perform(
             self._unit_to_display
         )
@@ -1466,30 +1534,23 @@ class WorldTidesInfoCustomSensor(RestoreEntity, WorldTidesInfoCustomSensorGeneri
         else:
             attr["tidal_station_used"] = "No Tide station used"
 
+        # the tide state
+        tide_state = self._worldtide_data_coordinator.get_tide_state_frame()
+
         # Next tide : height and time
-        attr.update(next_tide_attribute(tide_info, current_time, convert_meter_to_feet))
+        attr.update(tide_state.get_attribute("next_tide"))
 
         # Tide Tendancy and time_to_next_tide
-        attr.update(tide_tendancy_attribute(tide_info, current_time))
+        attr.update(tide_state.get_attribute("tide_tendancy"))
 
         # Next Amplitude , Coeff
-        attr.update(
-            next_amplitude_attribute(
-                tide_info, datums_info, current_time, convert_meter_to_feet
-            )
-        )
+        attr.update(tide_state.get_attribute("next_amplitude"))
 
         # The height
-        attr.update(
-            current_height_attribute(tide_info, current_time, convert_meter_to_feet)
-        )
+        attr.update(tide_state.get_attribute("current_height"))
 
         # Current Amplitude , Coeff
-        attr.update(
-            current_amplitude_attribute(
-                tide_info, datums_info, current_time, convert_meter_to_feet
-            )
-        )
+        attr.update(tide_state.get_attribute("current_amplitude"))
 
         # The credit used to display the update
         attr["CreditCallUsed"] = self._worldtide_data_coordinator.get_credit_used()
@@ -1547,11 +1608,10 @@ class WorldTidesInfoCustomSensor(RestoreEntity, WorldTidesInfoCustomSensorGeneri
     @property
     def native_value(self):
         """Return the state of the device."""
-        current_time = time.time()
-        # the tide info
-        tide_info = get_tide_info(self._worldtide_data_coordinator)
+        # the tide state
+        tide_state = self._worldtide_data_coordinator.get_tide_state_frame()
         # give next tide
-        return next_tide_state(tide_info, current_time)
+        return tide_state.get_next_tide_state()
 
     def _async_worldtidesinfo_sensor_state_listener(self, event):
         """Handle sensor state changes."""
@@ -1672,19 +1732,12 @@ class WorldTidesInfoCustomSensor(RestoreEntity, WorldTidesInfoCustomSensorGeneri
 
         self.schedule_update_ha_state(force_refresh=True)
 
-    def update(self):
-        """Update of sensors."""
-        _LOGGER.debug("Sync Update Tides sensor %s", self._name)
-        self._worldtide_data_coordinator.update_server_data()
-
-        # managment of global count
-        for name, coordinator in worldtidesinfo_data_coordinator.items():
-            coordinator.overall_count_tmp = (
-                coordinator.overall_count_tmp
-                + self._worldtide_data_coordinator.get_credit_used()
-            )
+    async def async_update(self):
+        """Fetch new state data and notify the other entities."""
+        _LOGGER.debug("Async Update Tides sensor %s", self._name)
+        # the global credit is counted by the credit ledger
+        await self._worldtide_data_coordinator.async_update_server_data()
 
-        self._worldtide_data_coordinator.overall_count = (
-            self._worldtide_data_coordinator.overall_count_tmp
+        async_dispatcher_send(
+            self._hass, SIGNAL_TIDE_STATE_FRAME.format(self._unique_id)
         )
-        self._worldtide_data_coordinator.overall_count_tmp = 0
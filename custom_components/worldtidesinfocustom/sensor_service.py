@@ -11,13 +11,6 @@ KM_PER_MI = DistanceConverter.convert(1, UnitOfLength.MILES, UnitOfLength.KILOME
 MI_PER_KM = DistanceConverter.convert(1, UnitOfLength.KILOMETERS, UnitOfLength.MILES)
 FT_PER_M = DistanceConverter.convert(1, UnitOfLength.METERS, UnitOfLength.FEET)
 
-# import .storage_mngt
-from pyworldtidesinfo.worldtidesinfo_server import (
-    give_info_from_raw_data,
-    give_info_from_raw_data_N_and_N_1,
-    give_info_from_raw_datums_data,
-)
-
 from .basic_service import distance_lat_long
 
 # import component
@@ -60,21 +53,14 @@ def convert_to_perform(unit_to_display):
 
 def get_all_tide_info(worldtide_data_coordinator):
     """Retrieve the tide data within its decoder"""
-    # retrieve tide data (current & previous)
-    data_result = worldtide_data_coordinator.get_data()
-    data = data_result.get("current_data")
-    previous_data = data_result.get("previous_data")
-    init_data = data_result.get("init_data")
-    data_datums_offset = data_result.get("data_datums_offset")
+    # decoders are shared by all entities and rebuilt only on new data
+    snapshot = worldtide_data_coordinator.get_tide_info_snapshot()
 
-    # the decoder
-    tide_info = give_info_from_raw_data_N_and_N_1(data, previous_data)
-    # retrieve init data
-    init_tide_info = give_info_from_raw_data(init_data)
-    # retrieve the datum
-    datums_info = give_info_from_raw_datums_data(data_datums_offset)
-
-    return tide_info, datums_info, init_tide_info
+    return (
+        snapshot.get_tide_info(),
+        snapshot.get_datums_info(),
+        snapshot.get_init_tide_info(),
+    )
 
 
 def get_tide_info_and_offset(worldtide_data_coordinator):
@@ -116,6 +102,28 @@ def current_height_attribute(tide_info, current_time, convert_meter_to_feet):
     return attr
 
 
+def forecast_heights_attribute(
+    tide_info, current_time, forecast_durations, convert_meter_to_feet
+):
+    """Compute attributes linked to forecast heights"""
+    attr = {}
+
+    forecast_times = [
+        current_time + forecast_duration for forecast_duration in forecast_durations
+    ]
+    forecast_height_values = tide_info.give_current_heights_in_UTC(forecast_times)
+    for forecast_duration, forecast_height_value in zip(
+        forecast_durations, forecast_height_values
+    ):
+        if forecast_height_value.get("error") is None:
+            attr["forecast_height_in_{:g}h".format(forecast_duration / 60 / 60)] = round(
+                forecast_height_value.get("current_height") * convert_meter_to_feet,
+                ROUND_HEIGTH,
+            )
+
+    return attr
+
+
 def current_height_state(tide_info, current_time, convert_meter_to_feet):
     """Compute state linked to current height"""
     state_value = None
@@ -382,6 +390,12 @@ def schedule_time_attribute(worldtide_data_coordinator):
         "%H:%M:%S %d/%m/%y",
         time.localtime(schedule_time_result.get("data_request_time")),
     )
+    # data of next day prefetched, used at midnight
+    if schedule_time_result.get("staged_data_request_time") is not None:
+        attr["Staged_Data_request_time"] = time.strftime(
+            "%H:%M:%S %d/%m/%y",
+            time.localtime(schedule_time_result.get("staged_data_request_time")),
+        )
     # KEEP FOR DEBUG:
     if DEBUG_FLAG:
         if schedule_time_result.get("previous_data_request_time") is not None:
@@ -401,6 +415,12 @@ def schedule_time_attribute(worldtide_data_coordinator):
         attr["next month midnight"] = (
             schedule_time_result.get("next_month_midnight")
         ).strftime("%H:%M:%S %d/%m/%y")
+        # decoded data shared by all entities
+        attr.update(worldtide_data_coordinator.get_snapshot_statistics())
+        # fetch of all stations
+        attr.update(worldtide_data_coordinator.get_fetch_statistics())
+        # plots of all stations
+        attr.update(worldtide_data_coordinator.get_plot_statistics())
 
     return attr
 
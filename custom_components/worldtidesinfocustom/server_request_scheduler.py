@@ -1,16 +1,31 @@
 """Server request scheduler."""
 
 # python library
+import base64
+import hashlib
+import struct
 import time
 from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# pyworldtidesinfo library
+from pyworldtidesinfo.worldtidesinfo_server import Server_Parameter
 
 # Component library
+from .rolling_tide_data import (
+    ROLLING_FULL_FETCH_INTERVAL,
+    give_tail_request,
+    merge_tide_data,
+    tail_follows_data,
+)
 
 # internal const
 ## fetch init data every 30 days
 FORCE_FETCH_INIT_DATA_INTERVAL = 30
 # set 25h : wacth dog to retrieve data
 DEFAULT_WORLDTIDES_REQUEST_INTERVAL = 90000
+## prefetch of next day not retried within 1h
+PREFETCH_RETRY_INTERVAL = 3600
 
 # snapshot_version
 # snapshot 1 : 1rst one
@@ -18,7 +33,13 @@ DEFAULT_WORLDTIDES_REQUEST_INTERVAL = 90000
 # snapshot 3 : add last request time
 # snapshot 4 : add last init request time
 # snapshot 5 : in parameter add prediction time
-snapshot_version = 5
+# snapshot 6 : sections of JSON instead of pickled objects
+# snapshot 7 : only fields used by decoders, heights packed
+#              (data of next day prefetched added later, absent if not)
+snapshot_version = 7
+# snapshots read from files written by previous versions
+json_snapshot_version = 6
+legacy_snapshot_version = 5
 
 # Python library
 import logging
@@ -26,6 +47,186 @@ import logging
 _LOGGER = logging.getLogger(__name__)
 
 
+SERVER_PARAMETER_FIELDS = [
+    "_version",
+    "_key",
+    "_lat",
+    "_lon",
+    "_vertical_ref",
+    "_tide_station_distance",
+    "_tide_prediction_duration",
+    "_plot_color",
+    "_plot_background",
+    "_unit_curve_picture",
+]
+DATA_SCHEDULING_TIME_FIELDS = ["next_day_midnight", "next_month_midnight"]
+DATA_SCHEDULING_FIELDS = DATA_SCHEDULING_TIME_FIELDS + [
+    "last_request_time",
+    "last_init_request_time",
+    "last_full_request_time",
+]
+DATA_RETRIEVE_FIELDS = [
+    "init_data",
+    "init_data_request_time",
+    "data_datums_offset",
+    "data",
+    "data_request_time",
+    "previous_data",
+    "previous_data_request_time",
+    "staged_data",
+    "staged_data_request_time",
+    "staged_data_midnight",
+]
+# field of data with the curve picture (base64) : not kept
+DATA_PICTURE_FIELD = "plot"
+
+
+# fields of data kept in snapshot (heights are packed)
+TIDE_DATA_FIELDS = ["station", "responseDatum", "datums", "extremes"]
+TIDE_STATION_DATA_FIELDS = ["stations"]
+# date of heights given by server : rebuilt from epoch
+HEIGHT_DATE_FORMAT = "%Y-%m-%dT%H:%M+0000"
+
+
+def give_refresh_offset(name, refresh_window):
+    """give the time (s) before midnight of station refresh : same at each run"""
+    if refresh_window <= 0:
+        return 0
+    digest = hashlib.sha256(name.encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") % refresh_window
+
+
+def give_height_date(epoch):
+    return time.strftime(HEIGHT_DATE_FORMAT, time.gmtime(epoch))
+
+
+def pack_heights(heights):
+    """give heights as packed arrays, None if dates can not be rebuilt"""
+    height_epoch = []
+    height_value = []
+    for height in heights:
+        if height.get("date") != give_height_date(height["dt"]):
+            return None
+        height_epoch.append(height["dt"])
+        height_value.append(height["height"])
+    count = len(height_epoch)
+    return {
+        "count": count,
+        "epoch": base64.b64encode(
+            struct.pack("!{}q".format(count), *height_epoch)
+        ).decode("ascii"),
+        "value": base64.b64encode(
+            struct.pack("!{}d".format(count), *height_value)
+        ).decode("ascii"),
+    }
+
+
+def unpack_heights(packed_heights):
+    """give heights as given by server"""
+    count = packed_heights["count"]
+    height_epoch = struct.unpack(
+        "!{}q".format(count), base64.b64decode(packed_heights["epoch"])
+    )
+    height_value = struct.unpack(
+        "!{}d".format(count), base64.b64decode(packed_heights["value"])
+    )
+    return [
+        {"dt": epoch, "date": give_height_date(epoch), "height": value}
+        for epoch, value in zip(height_epoch, height_value)
+    ]
+
+
+def project_tide_data(data):
+    """give data to store : only what decoders use"""
+    if data is None:
+        return None
+    projected_data = {field: data[field] for field in TIDE_DATA_FIELDS if field in data}
+    heights = data.get("heights")
+    if heights is not None:
+        packed_heights = pack_heights(heights)
+        if packed_heights is None:
+            projected_data["heights"] = heights
+        else:
+            projected_data["packed_heights"] = packed_heights
+    return projected_data
+
+
+def unproject_tide_data(projected_data):
+    if projected_data is None:
+        return None
+    data = dict(projected_data)
+    packed_heights = data.pop("packed_heights", None)
+    if packed_heights is not None:
+        data["heights"] = unpack_heights(packed_heights)
+    return data
+
+
+def project_tide_station_data(init_data):
+    if init_data is None:
+        return None
+    return {
+        field: init_data[field]
+        for field in TIDE_STATION_DATA_FIELDS
+        if field in init_data
+    }
+
+
+def give_data_without_picture(data):
+    """give data without curve picture (data received is not modified)"""
+    if data is None or DATA_PICTURE_FIELD not in data:
+        return data
+    return {key: value for key, value in data.items() if key != DATA_PICTURE_FIELD}
+
+
+def encode_server_parameter(parameter):
+    return {field: getattr(parameter, field) for field in SERVER_PARAMETER_FIELDS}
+
+
+def decode_server_parameter(parameter_read):
+    parameter = Server_Parameter(None, None, None, None, None, None, None, None, None)
+    for field in SERVER_PARAMETER_FIELDS:
+        setattr(parameter, field, parameter_read.get(field))
+    return parameter
+
+
+def encode_data_scheduling(data_scheduling):
+    scheduling = {
+        field: getattr(data_scheduling, field) for field in DATA_SCHEDULING_FIELDS
+    }
+    for field in DATA_SCHEDULING_TIME_FIELDS:
+        if scheduling[field] is not None:
+            scheduling[field] = scheduling[field].isoformat()
+    return scheduling
+
+
+def decode_data_scheduling(scheduling_read):
+    scheduling = {
+        field: scheduling_read.get(field) for field in DATA_SCHEDULING_FIELDS
+    }
+    for field in DATA_SCHEDULING_TIME_FIELDS:
+        if scheduling[field] is not None:
+            scheduling[field] = datetime.fromisoformat(scheduling[field])
+    return SimpleNamespace(**scheduling)
+
+
+def encode_data_retrieve(data_retrieve):
+    data = {field: getattr(data_retrieve, field) for field in DATA_RETRIEVE_FIELDS}
+    data["init_data"] = project_tide_station_data(data["init_data"])
+    data["data"] = project_tide_data(data["data"])
+    data["previous_data"] = project_tide_data(data["previous_data"])
+    data["staged_data"] = project_tide_data(data["staged_data"])
+    return data
+
+
+def decode_data_retrieve(data_read, version=snapshot_version):
+    data = {field: data_read.get(field) for field in DATA_RETRIEVE_FIELDS}
+    if version == snapshot_version:
+        data["data"] = unproject_tide_data(data["data"])
+        data["previous_data"] = unproject_tide_data(data["previous_data"])
+        data["staged_data"] = unproject_tide_data(data["staged_data"])
+    return SimpleNamespace(**data)
+
+
 class Data_Retrieve:
     """Data retrieve from server."""
 
@@ -38,17 +239,34 @@ class Data_Retrieve:
         # in order to manage midnight (ie. switch between 2 requests)
         self.previous_data = None
         self.previous_data_request_time = None
+        # data of next day prefetched before midnight (used at midnight)
+        self.staged_data = None
+        self.staged_data_request_time = None
+        self.staged_data_midnight = None
 
     def store_read_input(self, read_data):
         """Update data from cloud server"""
         self.init_data = read_data.init_data
         self.init_data_request_time = read_data.init_data_request_time
         self.data_datums_offset = read_data.data_datums_offset
-        self.data = read_data.data
+        self.data = give_data_without_picture(read_data.data)
         self.data_request_time = read_data.data_request_time
         # in order to manage midnight (ie. switch between 2 requests)
-        self.previous_data = read_data.previous_data
+        self.previous_data = give_data_without_picture(read_data.previous_data)
         self.previous_data_request_time = read_data.previous_data_request_time
+        # not in snapshot written by previous versions
+        self.staged_data = give_data_without_picture(
+            getattr(read_data, "staged_data", None)
+        )
+        self.staged_data_request_time = getattr(
+            read_data, "staged_data_request_time", None
+        )
+        self.staged_data_midnight = getattr(read_data, "staged_data_midnight", None)
+
+    def clear_staged_data(self):
+        self.staged_data = None
+        self.staged_data_request_time = None
+        self.staged_data_midnight = None
 
 
 class Data_Scheduling:
@@ -59,19 +277,30 @@ class Data_Scheduling:
         self.next_month_midnight = None
         self.last_request_time = None
         self.last_init_request_time = None
-
-    def setup_next_data_midnight(self):
-        self.next_day_midnight = timedelta(days=1) + (datetime.today()).replace(
-            hour=0, minute=0, second=0, microsecond=0
-        )
+        # last request of the whole window (rolling window)
+        self.last_full_request_time = None
+        # last prefetch of next day (not kept over restart)
+        self.last_prefetch_request_time = None
+
+    def setup_next_data_midnight(self, refresh_offset=0, current_time=None):
+        if current_time is None:
+            current_time = time.time()
+        self.next_day_midnight = timedelta(days=1) + (
+            datetime.fromtimestamp(current_time)
+        ).replace(hour=0, minute=0, second=0, microsecond=0)
+        # refresh done within window before midnight : next one the day after
+        if datetime.fromtimestamp(current_time) >= self.next_day_midnight - timedelta(
+            seconds=refresh_offset
+        ):
+            self.next_day_midnight = self.next_day_midnight + timedelta(days=1)
 
     def setup_next_init_data_midnight(self):
         self.next_month_midnight = timedelta(days=FORCE_FETCH_INIT_DATA_INTERVAL) + (
             datetime.today()
         ).replace(hour=0, minute=0, second=0, microsecond=0)
 
-    def setup_next_midnights(self):
-        self.setup_next_data_midnight()
+    def setup_next_midnights(self, refresh_offset=0):
+        self.setup_next_data_midnight(refresh_offset)
         self.setup_next_init_data_midnight()
 
     def store_read_input(self, read_data):
@@ -79,6 +308,10 @@ class Data_Scheduling:
         self.next_month_midnight = read_data.next_month_midnight
         self.last_request_time = read_data.last_request_time
         self.last_init_request_time = read_data.last_request_time
+        # not in snapshot written by previous versions
+        self.last_full_request_time = getattr(
+            read_data, "last_full_request_time", None
+        )
 
 
 class WorldTidesInfo_server_scheduler:
@@ -95,6 +328,13 @@ class WorldTidesInfo_server_scheduler:
         self._Data_Retrieve = Data_Retrieve()
         self._Data_Scheduling = Data_Scheduling()
 
+        # days between two refreshes (more than 1 to hold credit budget)
+        self._refresh_interval = 1
+        # refresh done this time (s) before midnight : spread among stations
+        self._refresh_offset = 0
+        # next day prefetched this time (s) before midnight (0 : no prefetch)
+        self._prefetch_time = 0
+
     def update_parameter(self, worldtidesinfo_server_parameter):
         self._Server_Parameter = worldtidesinfo_server_parameter
         # if parameter has been already reinit , no need to reinit
@@ -102,6 +342,8 @@ class WorldTidesInfo_server_scheduler:
         # in parameter = True (If doing then it will request data from server)
         if self._Data_Retrieve.init_data is not None:
             self._parameter_updated = True
+        # next day prefetched for previous parameter
+        self._Data_Retrieve.clear_staged_data()
 
     def give_parameter(self):
         return self._Server_Parameter
@@ -109,6 +351,40 @@ class WorldTidesInfo_server_scheduler:
     def no_data(self):
         return self._Data_Retrieve.data is None or self._Data_Retrieve.data is None
 
+    def set_refresh_interval(self, refresh_interval):
+        self._refresh_interval = refresh_interval
+
+    def give_refresh_interval(self):
+        return self._refresh_interval
+
+    def set_refresh_offset(self, refresh_offset):
+        self._refresh_offset = refresh_offset
+
+    def give_refresh_offset(self):
+        return self._refresh_offset
+
+    def set_prefetch_time(self, prefetch_time):
+        self._prefetch_time = prefetch_time
+
+    def give_prefetch_time(self):
+        return self._prefetch_time
+
+    def _give_data_refresh_offset(self):
+        """give time before midnight of refresh (at midnight if prefetched)"""
+        if self._prefetch_time > 0:
+            return 0
+        return self._refresh_offset
+
+    def data_covers_prediction(self, current_time):
+        """check if data held gives prediction from current time"""
+        data = self._Data_Retrieve.data
+        if data is None or len(data.get("heights", [])) == 0:
+            return False
+        return (
+            data["heights"][-1]["dt"]
+            >= current_time + self._Server_Parameter._tide_prediction_duration * 86400
+        )
+
     def no_datum(self):
         return self._Data_Retrieve.data_datums_offset is None
 
@@ -138,12 +414,67 @@ class WorldTidesInfo_server_scheduler:
                 self._Data_Retrieve.data_request_time
             )
         # normal process
-        self._Data_Retrieve.data = data
+        self._Data_Retrieve.data = give_data_without_picture(data)
         self._Data_Retrieve.data_request_time = data_request_time
         self._Data_Scheduling.last_request_time = data_request_time
+        # data of next day fetched again : the one prefetched is useless
+        if self._Data_Retrieve.staged_data_midnight is not None and (
+            data_request_time >= self._Data_Retrieve.staged_data_midnight
+        ):
+            self._Data_Retrieve.clear_staged_data()
 
         self._parameter_updated = False
 
+    def store_staged_data(self, data, data_request_time):
+        """Store data of next day, used once midnight is reached"""
+        self._Data_Retrieve.staged_data = give_data_without_picture(data)
+        self._Data_Retrieve.staged_data_request_time = data_request_time
+        self._Data_Retrieve.staged_data_midnight = (
+            self._Data_Scheduling.next_day_midnight.timestamp()
+        )
+        self._Data_Scheduling.last_request_time = data_request_time
+
+    def store_full_request_time(self, full_request_time):
+        self._Data_Scheduling.last_full_request_time = full_request_time
+
+    def give_tail_request(self, window_start, window_days, current_time):
+        """give date and days of data not yet held (None : whole window)"""
+        last_full_request_time = self._Data_Scheduling.last_full_request_time
+        if self._parameter_updated or last_full_request_time is None:
+            return None
+        if current_time >= last_full_request_time + ROLLING_FULL_FETCH_INTERVAL:
+            return None
+        return give_tail_request(
+            self._Data_Retrieve.data, window_start, window_start + window_days * 86400
+        )
+
+    def tail_follows_data(self, tail_data):
+        return tail_follows_data(self._Data_Retrieve.data, tail_data)
+
+    def merge_tail_data(self, tail_data, trim_time):
+        """give data held followed by the tail received"""
+        return merge_tide_data(self._Data_Retrieve.data, tail_data, trim_time)
+
+    def process_no_staged_data(self, last_prefetch_request_time):
+        self._Data_Scheduling.last_prefetch_request_time = last_prefetch_request_time
+
+    def staged_data_to_be_used(self, current_time):
+        """check if data prefetched is the one of current day"""
+        staged_midnight = self._Data_Retrieve.staged_data_midnight
+        if self._Data_Retrieve.staged_data is None or staged_midnight is None:
+            return False
+        return staged_midnight <= current_time < staged_midnight + 86400
+
+    def use_staged_data(self):
+        """Switch to data prefetched : previous data is the one of yesterday"""
+        data_retrieve = self._Data_Retrieve
+        # no await in between : readers see either old or new data
+        data_retrieve.previous_data = data_retrieve.data
+        data_retrieve.previous_data_request_time = data_retrieve.data_request_time
+        data_retrieve.data = data_retrieve.staged_data
+        data_retrieve.data_request_time = data_retrieve.staged_data_request_time
+        data_retrieve.clear_staged_data()
+
     def process_no_new_data(self, last_request_time):
         if self._parameter_updated:
             self._Data_Retrieve.previous_data = None
@@ -155,10 +486,12 @@ class WorldTidesInfo_server_scheduler:
 
     def setup_next_midnights(self):
         """update all midnights"""
-        self._Data_Scheduling.setup_next_midnights()
+        self._Data_Scheduling.setup_next_midnights(self._give_data_refresh_offset())
 
-    def setup_next_data_midnight(self):
-        self._Data_Scheduling.setup_next_data_midnight()
+    def setup_next_data_midnight(self, current_time=None):
+        self._Data_Scheduling.setup_next_data_midnight(
+            self._give_data_refresh_offset(), current_time
+        )
 
     def setup_next_init_data_midnight(self):
         self._Data_Scheduling.setup_next_init_data_midnight()
@@ -174,8 +507,12 @@ class WorldTidesInfo_server_scheduler:
             datetime.fromtimestamp(current_time)
             >= self._Data_Scheduling.next_month_midnight
         ):
-            init_data_to_require = True
-            reason = "month midnight reached"
+            if self._refresh_interval > 1 and self._Data_Retrieve.init_data is not None:
+                # credit budget : station (and datums) kept
+                init_data_to_require = False
+            else:
+                init_data_to_require = True
+                reason = "month midnight reached"
         elif self._parameter_updated:
             init_data_to_require = True
             reason = "parameter has changed"
@@ -188,17 +525,39 @@ class WorldTidesInfo_server_scheduler:
 
     def give_scheduler_image(self):
         """Give Scheduler snapshot intended to be saved on disk"""
+        # each item is a section of file, decoded only if needed
         snapshot = {"Version": snapshot_version}
-        snapshot["Parameter"] = self._Server_Parameter
-        snapshot["Scheduling"] = self._Data_Scheduling
-        snapshot["Data"] = self._Data_Retrieve
+        snapshot["Parameter"] = encode_server_parameter(self._Server_Parameter)
+        snapshot["Scheduling"] = encode_data_scheduling(self._Data_Scheduling)
+        snapshot["Data"] = encode_data_retrieve(self._Data_Retrieve)
         return snapshot
 
+    def scheduler_snapshot_pickled(self, snapshot_read):
+        """check if snapshot is made of pickled objects"""
+        return snapshot_read.get("Version") == legacy_snapshot_version
+
+    def scheduler_snapshot_legacy(self, snapshot_read):
+        """check if snapshot has been written by a previous version"""
+        return snapshot_read.get("Version") in [
+            json_snapshot_version,
+            legacy_snapshot_version,
+        ]
+
     def scheduler_snapshot_usable(self, snapshot_read):
         Usable = False
         try:
             if snapshot_read.get("Version") is not None:
-                if snapshot_read.get("Version") == snapshot_version:
+                if snapshot_read.get("Version") in [
+                    snapshot_version,
+                    json_snapshot_version,
+                ]:
+                    if snapshot_read.get("Parameter") is not None:
+                        if self._Server_Parameter.compare_parameter(
+                            decode_server_parameter(snapshot_read.get("Parameter"))
+                        ):
+                            Usable = True
+                elif self.scheduler_snapshot_pickled(snapshot_read):
+                    # pickled objects
                     if snapshot_read.get("Parameter") is not None:
                         if self._Server_Parameter.compare_parameter(
                             snapshot_read.get("Parameter")
@@ -215,6 +574,15 @@ class WorldTidesInfo_server_scheduler:
         try:
             Read_Data_Scheduling = snapshot_read.get("Scheduling")
             Read_Data_Retrieve = snapshot_read.get("Data")
+            if not self.scheduler_snapshot_pickled(snapshot_read):
+                if Read_Data_Scheduling is not None:
+                    Read_Data_Scheduling = decode_data_scheduling(
+                        Read_Data_Scheduling
+                    )
+                if Read_Data_Retrieve is not None:
+                    Read_Data_Retrieve = decode_data_retrieve(
+                        Read_Data_Retrieve, snapshot_read.get("Version")
+                    )
             scheduler_image_usable = True
         except:
             scheduler_image_usable = False
@@ -241,17 +609,57 @@ class WorldTidesInfo_server_scheduler:
         elif current_time >= (
             self._Data_Scheduling.last_request_time
             + DEFAULT_WORLDTIDES_REQUEST_INTERVAL
+            + (self._refresh_interval - 1) * 86400
         ):
             data_to_require = True
             reason = "Data Scheduling too old"
-        elif (
-            datetime.fromtimestamp(current_time)
-            >= self._Data_Scheduling.next_day_midnight
+        elif datetime.fromtimestamp(
+            current_time
+        ) >= self._Data_Scheduling.next_day_midnight - timedelta(
+            seconds=self._give_data_refresh_offset()
         ):
-            data_to_require = True
-            reason = "Midnight is reached"
+            if self._refresh_interval > 1 and self.data_covers_prediction(
+                current_time
+            ):
+                # credit budget : data held over several days
+                data_to_require = False
+            elif self.staged_data_to_be_used(current_time):
+                # data of the day prefetched before midnight
+                data_to_require = False
+            else:
+                data_to_require = True
+                reason = "Midnight is reached"
         else:
             data_to_require = False
         if data_to_require:
             _LOGGER.debug("Tide Height to be fetched due to : %s", reason)
         return data_to_require
+
+    def data_to_be_prefetched(self, current_time):
+        """Decide whether or not data of next day has to be retrieved"""
+        if self._prefetch_time == 0 or self._Data_Retrieve.data is None:
+            return False
+        next_day_midnight = self._Data_Scheduling.next_day_midnight.timestamp()
+        if self._Data_Retrieve.staged_data_midnight == next_day_midnight:
+            # already prefetched
+            return False
+        # within the window before midnight (after it : normal fetch)
+        if not (
+            next_day_midnight - self._prefetch_time - self._refresh_offset
+            <= current_time
+            < next_day_midnight
+        ):
+            return False
+        if self._refresh_interval > 1 and self.data_covers_prediction(
+            next_day_midnight
+        ):
+            # credit budget : data held over several days
+            return False
+        last_prefetch_request_time = self._Data_Scheduling.last_prefetch_request_time
+        if (
+            last_prefetch_request_time is not None
+            and current_time < last_prefetch_request_time + PREFETCH_RETRY_INTERVAL
+        ):
+            return False
+        _LOGGER.debug("Tide Height of next day to be prefetched")
+        return True
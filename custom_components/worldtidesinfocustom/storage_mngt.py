@@ -3,8 +3,14 @@
 import base64
 import hashlib
 import hmac
+import json
 import os
 import pickle
+import sqlite3
+import struct
+import threading
+import time
+import zlib
 
 # Component library
 
@@ -21,6 +27,8 @@ class File_Picture:
         """Initialize the data"""
         self._path = path
         self._full_path_name = full_path_name
+        # hash of picture on disk (if known)
+        self._content_hash = None
 
         # check path
         ensure_dir(self._path)
@@ -30,27 +38,114 @@ class File_Picture:
         return self._full_path_name
 
     def store_picture_base64(self, string):
-        """convert and store picture"""
+        """convert and store picture : give the picture"""
         imgdata = base64.b64decode(string)
-        with open(self._full_path_name, "wb") as filehandler:
-            filehandler.write(imgdata)
+        self.store_picture_if_changed(imgdata)
+        return imgdata
+
+    def store_picture(self, content):
+        """store picture : the file is never seen partially written"""
+        temporary_path = self._full_path_name + ".tmp"
+        with open(temporary_path, "wb") as filehandler:
+            filehandler.write(content)
+        os.replace(temporary_path, self._full_path_name)
+        self._content_hash = hashlib.sha256(content).digest()
+
+    def store_picture_if_changed(self, content):
+        """store picture only if it differs from the one on disk"""
+        if hashlib.sha256(content).digest() == self._content_hash:
+            return False
+        self.store_picture(content)
+        return True
+
+    def load_picture(self):
+        """give the picture on disk if any"""
+        try:
+            with open(self._full_path_name, "rb") as filehandler:
+                content = filehandler.read()
+        except OSError:
+            return None
+        self._content_hash = hashlib.sha256(content).digest()
+        return content
 
     def remove_previous_picturefile(self):
         """remove previous file if any"""
+        self._content_hash = None
         if os.path.isfile(self._full_path_name):
             os.remove(self._full_path_name)
 
 
+class Memory_Picture:
+    """Class to keep the last picture in memory"""
+
+    def __init__(self):
+        """Initialize with no picture"""
+        # generation, content and time of picture are replaced at once
+        self._picture = (0, None, None)
+
+    def store_picture(self, content, generated_at=None):
+        """keep the new picture : generation is increased"""
+        if generated_at is None:
+            generated_at = time.time()
+        generation = self._picture[0] + 1
+        self._picture = (generation, content, generated_at)
+
+    def give_generation(self):
+        """give the generation of last picture (0 if none)"""
+        return self._picture[0]
+
+    def give_picture(self):
+        """give generation, content and time of last picture"""
+        return self._picture
+
+
 class SignedPickle:
     """Class to save."""
 
-    # This class will be save on disk
+    # This class has been saved on disk up to snapshot version 5
+    # it is kept to read these files
     def __init__(self, pickle_data, hmac):
         """Initialize the data."""
         self._pickle_data = pickle_data
         self._hmac = hmac
 
 
+# binary format of data cache
+# header : magic, format version, number of section
+# section : name length, name, payload length, payload (JSON compressed)
+# tag : HMAC-SHA256 of header and sections
+DATA_CACHE_MAGIC = b"WTIC"
+DATA_CACHE_FORMAT_VERSION = 1
+DATA_CACHE_HEADER = struct.Struct("!4sHH")
+DATA_CACHE_SECTION_NAME = struct.Struct("!H")
+DATA_CACHE_SECTION_PAYLOAD = struct.Struct("!I")
+DATA_CACHE_TAG_SIZE = hashlib.sha256().digest_size
+
+
+class Lazy_Sections:
+    """Sections read from disk, each one decoded at first use"""
+
+    def __init__(self, content, sections):
+        """Initialize with the content read and the place of each section"""
+        self._content = content
+        self._sections = sections
+        self._decoded = {}
+
+    def keys(self):
+        return self._sections.keys()
+
+    def get(self, name, default=None):
+        """give the decoded section"""
+        if name not in self._sections:
+            return default
+        if name not in self._decoded:
+            start, end = self._sections[name]
+            self._decoded[name] = json.loads(
+                zlib.decompress(self._content[start:end])
+            )
+        return self._decoded[name]
+
+
 class File_Data_Cache:
     """Class to manage the data cache"""
 
@@ -59,6 +154,8 @@ class File_Data_Cache:
         self._storage_full_path = storage_full_path
         self._key = key
         self._data_read = None
+        # size of last content read or written
+        self._content_size = 0
 
     def full_filename(self):
         """give the full filename"""
@@ -67,58 +164,205 @@ class File_Data_Cache:
     def Data_Read(self):
         return self._data_read
 
+    def give_content_size(self):
+        """give size in bytes of last content read or written"""
+        return self._content_size
+
+    def _give_tag(self, content):
+        return hmac.new(self._key.encode("utf-8"), content, hashlib.sha256).digest()
+
+    def _decode_sections(self, file_content):
+        """check HMAC and locate the sections : nothing is decoded"""
+        if len(file_content) < DATA_CACHE_HEADER.size + DATA_CACHE_TAG_SIZE:
+            return None
+        content = file_content[:-DATA_CACHE_TAG_SIZE]
+        if not hmac.compare_digest(
+            self._give_tag(content), file_content[-DATA_CACHE_TAG_SIZE:]
+        ):
+            return None
+
+        magic, format_version, section_number = DATA_CACHE_HEADER.unpack_from(
+            content, 0
+        )
+        if format_version != DATA_CACHE_FORMAT_VERSION:
+            return None
+
+        sections = {}
+        offset = DATA_CACHE_HEADER.size
+        for section_index in range(section_number):
+            (name_length,) = DATA_CACHE_SECTION_NAME.unpack_from(content, offset)
+            offset += DATA_CACHE_SECTION_NAME.size
+            name = content[offset : offset + name_length].decode("utf-8")
+            offset += name_length
+            (payload_length,) = DATA_CACHE_SECTION_PAYLOAD.unpack_from(
+                content, offset
+            )
+            offset += DATA_CACHE_SECTION_PAYLOAD.size
+            sections[name] = (offset, offset + payload_length)
+            offset += payload_length
+        if offset != len(content):
+            return None
+
+        return Lazy_Sections(content, sections)
+
+    def _decode_signed_pickle(self, file_content):
+        """decode the format used up to snapshot version 5"""
+        # Data Read is expected to be SignedPickle
+        Fetch_Data = pickle.loads(file_content)
+        hmac_data = hmac.new(
+            self._key.encode("utf-8"), Fetch_Data._pickle_data, hashlib.sha1
+        ).hexdigest()
+        if hmac.compare_digest(hmac_data, Fetch_Data._hmac):
+            # HMACis ok. Then check if data stored correspond the current parameters
+            return pickle.loads(Fetch_Data._pickle_data)
+        return None
+
+    def _read_content(self):
+        """give the content stored or None"""
+        try:
+            with open(self._storage_full_path, "rb") as file_handler:
+                return file_handler.read()
+        except OSError:
+            return None
+
+    def _write_content(self, content):
+        """store the content"""
+        # write a temporary file then rename : file is never partially written
+        temporary_path = self._storage_full_path + ".tmp"
+        with open(temporary_path, "wb") as file_handler:
+            file_handler.write(content)
+            file_handler.flush()
+            os.fsync(file_handler.fileno())
+        os.replace(temporary_path, self._storage_full_path)
+
     def Fetch_Stored_Data(self):
         """Fetch the data save on disk and check HMAC"""
         # Read previous received data
         # 1) Fetch on disk
-        Fetch_Data_status = False
-        Fetch_Data = None
-        # 2) check HMAC
-        Data_Read_Status = False
+        # 2) check HMAC : sections are decoded only when used
         Data_Read = None
 
-        try:
-            file_handler = open(self._storage_full_path, "rb")
-            unpickler = pickle.Unpickler(file_handler)
-            Fetch_Data = unpickler.load()
-            file_handler.close()
-            Fetch_Data_status = True
-        except:
-            Fetch_Data_status = False
-            Fetch_Data = None
-
-        if Fetch_Data_status:
+        file_content = self._read_content()
+
+        if file_content is not None:
+            self._content_size = len(file_content)
             try:
-                # Data Read is expected to be SignedPickle
-                hmac_data = hmac.new(
-                    self._key.encode("utf-8"), Fetch_Data._pickle_data, hashlib.sha1
-                ).hexdigest()
-                if hmac_data == Fetch_Data._hmac:
-                    # HMACis ok. Then check if data stored correspond the current parameters
-                    Data_Read = pickle.loads(Fetch_Data._pickle_data)
-                    Data_Read_Status = True
+                if file_content.startswith(DATA_CACHE_MAGIC):
+                    Data_Read = self._decode_sections(file_content)
                 else:
-                    Data_Read = None
-                    Data_Read_Status = False
+                    Data_Read = self._decode_signed_pickle(file_content)
             except:
                 Data_Read = None
-                Data_Read_Status = False
 
         self._data_read = Data_Read
-        return Data_Read_Status
+        return Data_Read is not None
 
     def store_data(self, data_to_store):
-        """Store data on disk and compute HAMC"""
+        """Store data on disk and compute HMAC"""
+        # data_to_store : dict of section name and JSON serializable value
+        content = bytearray(
+            DATA_CACHE_HEADER.pack(
+                DATA_CACHE_MAGIC, DATA_CACHE_FORMAT_VERSION, len(data_to_store)
+            )
+        )
+        for name, value in data_to_store.items():
+            encoded_name = name.encode("utf-8")
+            payload = zlib.compress(
+                json.dumps(value, separators=(",", ":")).encode("utf-8")
+            )
+            content += DATA_CACHE_SECTION_NAME.pack(len(encoded_name))
+            content += encoded_name
+            content += DATA_CACHE_SECTION_PAYLOAD.pack(len(payload))
+            content += payload
+        content += self._give_tag(bytes(content))
 
-        # pickle and compute HMAC
-        data_pickle = pickle.dumps(data_to_store, pickle.HIGHEST_PROTOCOL)
-        hmac_data = hmac.new(
-            self._key.encode("utf-8"), data_pickle, hashlib.sha1
-        ).hexdigest()
-        to_save = SignedPickle(data_pickle, hmac_data)
+        self._content_size = len(content)
+        self._write_content(bytes(content))
+
+
+class Shared_Data_Store:
+    """One SQLite file that holds the data cache of all stations"""
+
+    def __init__(self, storage_full_path):
+        """Initialize the store"""
+        self._storage_full_path = storage_full_path
+        self._lock = threading.Lock()
+        self._content = {}
+
+    def full_filename(self):
+        """give the full filename"""
+        return self._storage_full_path
+
+    def _connect(self):
+        connection = sqlite3.connect(self._storage_full_path)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS station (name TEXT PRIMARY KEY, content BLOB)"
+        )
+        return connection
+
+    def load(self):
+        """read the records of all stations in one pass"""
+        with self._lock:
+            connection = self._connect()
+            try:
+                self._content = {
+                    name: content
+                    for name, content in connection.execute(
+                        "SELECT name, content FROM station"
+                    )
+                }
+            finally:
+                connection.close()
+
+    def give_content(self, name):
+        """give the record of the station read at load"""
+        with self._lock:
+            return self._content.get(name)
+
+    def store(self, name, content):
+        """write the record of one station"""
+        with self._lock:
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO station (name, content) VALUES (?, ?)",
+                        (name, content),
+                    )
+            finally:
+                connection.close()
+            self._content[name] = content
+
+    def remove(self, name):
+        """remove the record of one station"""
+        with self._lock:
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.execute("DELETE FROM station WHERE name = ?", (name,))
+            finally:
+                connection.close()
+            self._content.pop(name, None)
+
+
+class Shared_Data_Cache(File_Data_Cache):
+    """Data cache of one station kept in the shared store"""
+
+    def __init__(self, shared_data_store, name, storage_full_path, key):
+        """Initialize the data."""
+        # storage_full_path : file of station, read if no record in store
+        super().__init__(storage_full_path, key)
+        self._shared_data_store = shared_data_store
+        self._name = name
+
+    def _read_content(self):
+        content = self._shared_data_store.give_content(self._name)
+        if content is None:
+            content = super()._read_content()
+        return content
 
-        # Dump : store received data
-        file_handler = open(self._storage_full_path, "wb")
-        pickler = pickle.Pickler(file_handler, pickle.HIGHEST_PROTOCOL)
-        pickler.dump(to_save)
-        file_handler.close()
+    def _write_content(self, content):
+        self._shared_data_store.store(self._name, content)
+        # data is now in the store
+        if os.path.isfile(self._storage_full_path):
+            os.remove(self._storage_full_path)
@@ -0,0 +1,288 @@
+"""Decoders of tide data based on sorted arrays and binary search."""
+# Python library
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+# numpy
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except:
+    NUMPY_AVAILABLE = False
+
+# pyworldtidesinfo library
+from pyworldtidesinfo.worldtidesinfo_server import (
+    give_info_from_raw_data,
+    give_info_from_raw_data_N_and_N_1,
+)
+
+
+# decoders shared by the stations that have received the same data
+INDEXED_TIDE_INFO_CACHE_SIZE = 16
+
+
+def give_tide_type(raw_type):
+    """normalize the extrema type given by server"""
+    if "High" in str(raw_type):
+        return "High"
+    elif "Low" in str(raw_type):
+        return "Low"
+    else:
+        return "None"
+
+
+class Tide_Extrema_Index:
+    """Parallel arrays of extrema sorted by epoch"""
+
+    def __init__(self, extremes):
+        """Build the arrays once"""
+        ordered_extremes = sorted(extremes, key=lambda extrema: extrema["dt"])
+        self.epoch = [extrema["dt"] for extrema in ordered_extremes]
+        self.height = [extrema["height"] for extrema in ordered_extremes]
+        self.date = [extrema["date"] for extrema in ordered_extremes]
+        self.raw_type = [extrema["type"] for extrema in ordered_extremes]
+        self.tide_type = [give_tide_type(raw_type) for raw_type in self.raw_type]
+
+    def __len__(self):
+        return len(self.epoch)
+
+    def give_index(self, current_time, next_tide_flag):
+        """give the index of next tide or of the tide just before current time"""
+        # first extrema at or after current time
+        next_tide = bisect_left(self.epoch, current_time)
+        if next_tide_flag:
+            return next_tide
+        return max(next_tide - 1, 0)
+
+    def give_index_within_time_frame(self, epoch_frame_min, epoch_frame_max):
+        """give the index range of extrema strictly within the time frame"""
+        return (
+            bisect_right(self.epoch, epoch_frame_min),
+            bisect_left(self.epoch, epoch_frame_max),
+        )
+
+
+class Tide_Height_Series:
+    """Heights sorted by epoch, queried for any number of times at once"""
+
+    def __init__(self, heights):
+        """Build the arrays once"""
+        ordered_heights = sorted(heights, key=lambda height: height["dt"])
+        self.epoch = [height["dt"] for height in ordered_heights]
+        self.height = [height["height"] for height in ordered_heights]
+        self.date = [height["date"] for height in ordered_heights]
+        if NUMPY_AVAILABLE:
+            self._np_epoch = np.array(self.epoch, dtype=np.int64)
+            self._np_height = np.array(self.height, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.epoch)
+
+    def give_index(self, current_times):
+        """give for each time the index of the last sample before it"""
+        # same rule as pyworldtidesinfo : last sample strictly before the time
+        # (or the first one if none)
+        if NUMPY_AVAILABLE:
+            query = np.array([int(current_time) for current_time in current_times])
+            index = np.searchsorted(self._np_epoch, query, side="left") - 1
+            return np.maximum(index, 0).tolist()
+        return [
+            max(bisect_left(self.epoch, int(current_time)) - 1, 0)
+            for current_time in current_times
+        ]
+
+    def give_index_within_time_frame(self, epoch_frame_min, epoch_frame_max):
+        """give the index range of samples strictly within the time frame"""
+        return (
+            bisect_right(self.epoch, epoch_frame_min),
+            bisect_left(self.epoch, epoch_frame_max),
+        )
+
+
+class Indexed_Tide_Info(give_info_from_raw_data):
+    """Decoder answering next/previous tide queries with binary search"""
+
+    def __init__(self, data):
+        """Set data and build the index"""
+        super().__init__(data)
+        self._extrema_index = None
+        if data is not None and "extremes" in data:
+            self._extrema_index = Tide_Extrema_Index(data["extremes"])
+        self._height_series = None
+        if data is not None and len(data.get("heights", [])) > 0:
+            self._height_series = Tide_Height_Series(data["heights"])
+
+    def give_tide_in_epoch(self, current_epoch_time, next_tide_flag):
+        """Give Tide info from X seconds from epoch."""
+        if self._extrema_index is None:
+            return super().give_tide_in_epoch(current_epoch_time, next_tide_flag)
+
+        current_time = int(current_epoch_time)
+        index = self._extrema_index
+        next_tide = index.give_index(current_time, next_tide_flag)
+
+        if next_tide >= len(index):
+            return {"error": "no date in future"}
+        if next_tide_flag is False:
+            if index.epoch[next_tide] > current_time:
+                return {"error": "no date in past"}
+
+        return {
+            "tide_type": index.tide_type[next_tide],
+            "tide_time": index.epoch[next_tide],
+        }
+
+    def give_high_low_tide_in_UTC(self, current_epoch_time, next_tide_flag):
+        """Give High/Low Tide info from X seconds from epoch."""
+        if self._extrema_index is None:
+            return super().give_high_low_tide_in_UTC(
+                current_epoch_time, next_tide_flag
+            )
+
+        current_time = int(current_epoch_time)
+        index = self._extrema_index
+        next_tide = index.give_index(current_time, next_tide_flag)
+
+        if next_tide >= len(index):
+            return {"error": "no date in future"}
+
+        # As we are looking also for next one
+        if (next_tide + 1) >= len(index):
+            return {"error": "no date in future for next one"}
+
+        if not next_tide_flag:
+            if index.epoch[next_tide] > current_time:
+                return {"error": "no date in past"}
+
+        if index.tide_type[next_tide] == "High":
+            high_tide = next_tide
+            low_tide = next_tide + 1
+        elif index.tide_type[next_tide] == "Low":
+            high_tide = next_tide + 1
+            low_tide = next_tide
+        else:
+            # unknown extrema type : let the library decide
+            return super().give_high_low_tide_in_UTC(
+                current_epoch_time, next_tide_flag
+            )
+
+        return {
+            "high_tide_time_utc": index.date[high_tide],
+            "high_tide_time_epoch": index.epoch[high_tide],
+            "high_tide_height": index.height[high_tide],
+            "low_tide_time_utc": index.date[low_tide],
+            "low_tide_time_epoch": index.epoch[low_tide],
+            "low_tide_height": index.height[low_tide],
+        }
+
+    def give_tide_extrema_within_time_frame(self, epoch_frame_min, epoch_frame_max):
+        """Retrieve data extrema from frame_min to frame_max."""
+        if self._extrema_index is None:
+            return super().give_tide_extrema_within_time_frame(
+                epoch_frame_min, epoch_frame_max
+            )
+
+        index = self._extrema_index
+        first, last = index.give_index_within_time_frame(
+            epoch_frame_min, epoch_frame_max
+        )
+        return {
+            "extrema_value": index.height[first:last],
+            "extrema_epoch": index.epoch[first:last],
+            "extrema_type": index.raw_type[first:last],
+        }
+
+    def give_current_heights_in_UTC(self, current_epoch_times):
+        """Give current height at each of the X seconds from epoch."""
+        if self._data is None:
+            return [{"error": "no data"} for current_time in current_epoch_times]
+        if self._height_series is None:
+            return [
+                give_info_from_raw_data.give_current_height_in_UTC(self, current_time)
+                for current_time in current_epoch_times
+            ]
+
+        series = self._height_series
+        return [
+            {
+                "current_height": series.height[index],
+                "current_height_utc": series.date[index],
+                "current_height_epoch": series.epoch[index],
+            }
+            for index in series.give_index(current_epoch_times)
+        ]
+
+    def give_current_height_in_UTC(self, current_epoch_time):
+        """Give current height at X seconds from epoch."""
+        return self.give_current_heights_in_UTC([current_epoch_time])[0]
+
+    def give_tide_prediction_within_time_frame(self, epoch_frame_min, epoch_frame_max):
+        """Retrieve data from frame_min to frame_max."""
+        if self._height_series is None:
+            return super().give_tide_prediction_within_time_frame(
+                epoch_frame_min, epoch_frame_max
+            )
+
+        series = self._height_series
+        first, last = series.give_index_within_time_frame(
+            epoch_frame_min, epoch_frame_max
+        )
+        return {
+            "height_value": series.height[first:last],
+            "height_epoch": series.epoch[first:last],
+        }
+
+
+class Indexed_Tide_Info_Cache:
+    """Last decoders built, found back from the identity of data"""
+
+    def __init__(self, size):
+        self._size = size
+        self._lock = threading.Lock()
+        # id of data : (data, decoder), data is kept so that id is not reused
+        self._entries = OrderedDict()
+
+    def give_indexed_tide_info(self, data):
+        """give the decoder of data, built once for all stations"""
+        if data is None:
+            return Indexed_Tide_Info(None)
+        with self._lock:
+            entry = self._entries.get(id(data))
+            if entry is not None and entry[0] is data:
+                self._entries.move_to_end(id(data))
+                return entry[1]
+
+        # build outside lock : decoders are immutable
+        indexed_tide_info = Indexed_Tide_Info(data)
+        with self._lock:
+            self._entries[id(data)] = (data, indexed_tide_info)
+            while len(self._entries) > self._size:
+                self._entries.popitem(last=False)
+        return indexed_tide_info
+
+
+indexed_tide_info_cache = Indexed_Tide_Info_Cache(INDEXED_TIDE_INFO_CACHE_SIZE)
+
+
+class Indexed_Tide_Info_N_and_N_1(give_info_from_raw_data_N_and_N_1):
+    """Decoder of current or previous data based on indexed decoders"""
+
+    def __init__(self, data, previous_data):
+        """Set the flip flop data."""
+        self._info = indexed_tide_info_cache.give_indexed_tide_info(data)
+        self._previous_info = indexed_tide_info_cache.give_indexed_tide_info(
+            previous_data
+        )
+
+    def give_current_info(self):
+        """give the decoder of current data only"""
+        return self._info
+
+    def give_current_heights_in_UTC(self, current_epoch_times):
+        """Give current heights in current or previous data ."""
+        # current data has heights for any time as soon as it exists
+        if self._info._data is not None:
+            return self._info.give_current_heights_in_UTC(current_epoch_times)
+        return self._previous_info.give_current_heights_in_UTC(current_epoch_times)
@@ -0,0 +1,72 @@
+"""Decoded tide data shared by all entities of a station."""
+
+# pyworldtidesinfo library
+from pyworldtidesinfo.worldtidesinfo_server import (
+    give_info_from_raw_data,
+    give_info_from_raw_datums_data,
+)
+
+# component library
+from .tide_info_index import Indexed_Tide_Info_N_and_N_1
+
+
+class Tide_Info_Snapshot:
+    """Immutable set of decoders built from one version of the retrieved data"""
+
+    __slots__ = (
+        "_data",
+        "_previous_data",
+        "_init_data",
+        "_data_datums_offset",
+        "_version",
+        "_tide_info",
+        "_current_tide_info",
+        "_init_tide_info",
+        "_datums_info",
+    )
+
+    def __init__(self, data_retrieve):
+        """Decode the raw data once"""
+        # keep a reference on raw data : used to detect a change
+        self._data = data_retrieve.data
+        self._previous_data = data_retrieve.previous_data
+        self._init_data = data_retrieve.init_data
+        self._data_datums_offset = data_retrieve.data_datums_offset
+        self._version = data_retrieve.data_request_time
+
+        # the decoders : extrema are indexed once per version of data
+        self._tide_info = Indexed_Tide_Info_N_and_N_1(
+            self._data, self._previous_data
+        )
+        self._current_tide_info = self._tide_info.give_current_info()
+        self._init_tide_info = give_info_from_raw_data(self._init_data)
+        self._datums_info = give_info_from_raw_datums_data(self._data_datums_offset)
+
+    def is_built_from(self, data_retrieve):
+        """check if the snapshot has been built from the given data"""
+        return (
+            self._data is data_retrieve.data
+            and self._previous_data is data_retrieve.previous_data
+            and self._init_data is data_retrieve.init_data
+            and self._data_datums_offset is data_retrieve.data_datums_offset
+        )
+
+    def get_version(self):
+        """give the data request time used to build the snapshot"""
+        return self._version
+
+    def get_tide_info(self):
+        """give the decoder of current and previous data"""
+        return self._tide_info
+
+    def get_current_tide_info(self):
+        """give the decoder of current data only"""
+        return self._current_tide_info
+
+    def get_init_tide_info(self):
+        """give the decoder of tide station data"""
+        return self._init_tide_info
+
+    def get_datums_info(self):
+        """give the decoder of datums"""
+        return self._datums_info
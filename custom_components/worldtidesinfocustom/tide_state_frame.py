@@ -0,0 +1,142 @@
+"""Tide state computed once per scan interval and read by all entities."""
+
+# component library
+from .const import SENSOR_FORECAST_TIDE_DURATION, SENSOR_FORECAST_TIDE_HORIZONS
+from .sensor_service import (
+    convert_to_perform,
+    current_amplitude_attribute,
+    current_height_attribute,
+    forecast_heights_attribute,
+    icon_tendancy,
+    next_amplitude_attribute,
+    next_tide_attribute,
+    next_tide_state,
+    remaining_time_to_next_tide,
+    tide_tendancy_attribute,
+)
+
+
+class Frame_Tide_Info:
+    """Decoder front end that computes each query once for a given time"""
+
+    def __init__(self, tide_info):
+        """Initialize with the decoder of the snapshot"""
+        self._tide_info = tide_info
+        self._result = {}
+
+    def _query(self, method_name, current_epoch_time):
+        key = (method_name, current_epoch_time)
+        result = self._result.get(key)
+        if result is None:
+            result = getattr(self._tide_info, method_name)(current_epoch_time)
+            self._result[key] = result
+        return result
+
+    def give_current_heights_in_UTC(self, current_epoch_times):
+        """compute in one call the heights not yet known"""
+        unknown_times = [
+            current_time
+            for current_time in current_epoch_times
+            if ("give_current_height_in_UTC", current_time) not in self._result
+        ]
+        if len(unknown_times) > 0:
+            results = self._tide_info.give_current_heights_in_UTC(unknown_times)
+            for current_time, result in zip(unknown_times, results):
+                self._result[("give_current_height_in_UTC", current_time)] = result
+        return [
+            self._result[("give_current_height_in_UTC", current_time)]
+            for current_time in current_epoch_times
+        ]
+
+    def give_current_height_in_UTC(self, current_epoch_time):
+        return self.give_current_heights_in_UTC([current_epoch_time])[0]
+
+    def give_next_high_low_tide_in_UTC(self, current_epoch_time):
+        return self._query("give_next_high_low_tide_in_UTC", current_epoch_time)
+
+    def give_current_high_low_tide_in_UTC(self, current_epoch_time):
+        return self._query("give_current_high_low_tide_in_UTC", current_epoch_time)
+
+    def give_next_tide_in_epoch(self, current_epoch_time):
+        return self._query("give_next_tide_in_epoch", current_epoch_time)
+
+    def give_previous_tide_in_epoch(self, current_epoch_time):
+        return self._query("give_previous_tide_in_epoch", current_epoch_time)
+
+
+class Tide_State_Frame:
+    """Tide state at a given time : height, next tide, tendancy, amplitude"""
+
+    def __init__(self, snapshot, current_time, unit_to_display):
+        """Compute all the values displayed by the entities"""
+        self._snapshot = snapshot
+        self._current_time = current_time
+        self._forecast_time = current_time + SENSOR_FORECAST_TIDE_DURATION
+
+        convert_meter_to_feet, convert_km_to_miles = convert_to_perform(
+            unit_to_display
+        )
+
+        tide_info = Frame_Tide_Info(snapshot.get_tide_info())
+        datums_info = snapshot.get_datums_info()
+
+        # all the heights needed by the frame in one call
+        tide_info.give_current_heights_in_UTC(
+            [current_time, self._forecast_time]
+            + [
+                current_time + forecast_duration
+                for forecast_duration in SENSOR_FORECAST_TIDE_HORIZONS
+            ]
+        )
+
+        self._attribute = {
+            "next_tide": next_tide_attribute(
+                tide_info, current_time, convert_meter_to_feet
+            ),
+            "tide_tendancy": tide_tendancy_attribute(tide_info, current_time),
+            "next_amplitude": next_amplitude_attribute(
+                tide_info, datums_info, current_time, convert_meter_to_feet
+            ),
+            "current_height": current_height_attribute(
+                tide_info, current_time, convert_meter_to_feet
+            ),
+            "current_amplitude": current_amplitude_attribute(
+                tide_info, datums_info, current_time, convert_meter_to_feet
+            ),
+            "forecast_height": current_height_attribute(
+                tide_info, self._forecast_time, convert_meter_to_feet
+            ),
+            "forecast_heights": forecast_heights_attribute(
+                tide_info,
+                current_time,
+                SENSOR_FORECAST_TIDE_HORIZONS,
+                convert_meter_to_feet,
+            ),
+        }
+        self._next_tide_state = next_tide_state(tide_info, current_time)
+        self._remaining_time = remaining_time_to_next_tide(tide_info, current_time)
+        self._icon = icon_tendancy(tide_info, current_time)
+        self._forecast_icon = icon_tendancy(tide_info, self._forecast_time)
+
+    def is_built_from(self, snapshot):
+        """check if the frame has been computed from the given snapshot"""
+        return self._snapshot is snapshot
+
+    def get_current_time(self):
+        return self._current_time
+
+    def get_attribute(self, attribute_name):
+        """give the attributes of next_tide, tide_tendancy, current_height, ..."""
+        return self._attribute.get(attribute_name)
+
+    def get_next_tide_state(self):
+        return self._next_tide_state
+
+    def get_remaining_time(self):
+        return self._remaining_time
+
+    def get_icon(self):
+        return self._icon
+
+    def get_forecast_icon(self):
+        return self._forecast_icon
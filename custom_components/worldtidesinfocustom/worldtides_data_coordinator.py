@@ -1,5 +1,6 @@
 """Data Coordinator."""
 # Python library
+import base64
 import logging
 
 _LOGGER = logging.getLogger(__name__)
@@ -9,6 +10,7 @@ from datetime import datetime, timedelta
 
 # HA library
 from homeassistant.const import UnitOfLength
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from homeassistant.util.unit_conversion import DistanceConverter
 from homeassistant.util.unit_system import IMPERIAL_SYSTEM
@@ -20,18 +22,54 @@ FT_PER_M = DistanceConverter.convert(1, UnitOfLength.METERS, UnitOfLength.FEET)
 from pyworldtidesinfo.worldtidesinfo_server import (
     PLOT_CURVE_UNIT_FT,
     PLOT_CURVE_UNIT_M,
-    WorldTidesInfo_server,
     give_info_from_raw_data,
     give_info_from_raw_data_N_and_N_1,
     give_info_from_raw_datums_data,
 )
 
 # Component library
-from . import give_persistent_filename
-from .const import IMPERIAL_CONF_UNIT, WWW_PATH
+from . import (
+    async_get_credit_budget_planner,
+    async_get_credit_ledger,
+    async_get_fetch_pipeline,
+    give_persistent_filename,
+)
+from .const import (
+    DEFAULT_HOT_PATH_TIMING,
+    DEFAULT_INCREMENTAL_FETCH,
+    DEFAULT_MONTHLY_CREDIT_BUDGET,
+    DEFAULT_PLOT_FILE_MIRROR,
+    DEFAULT_PREFETCH_TIME,
+    DEFAULT_REFRESH_WINDOW,
+    IMPERIAL_CONF_UNIT,
+    MAX_PREFETCH_TIME,
+    MAX_REFRESH_WINDOW,
+    WWW_PATH,
+)
+from .hot_path_timer import (
+    HOT_PATH_BYTES_STORED,
+    HOT_PATH_DECODE_TIME,
+    HOT_PATH_EXECUTOR_QUEUE_WAIT,
+    HOT_PATH_FETCH_LATENCY,
+    HOT_PATH_SNAPSHOT_WRITE_TIME,
+    Hot_Path_Timer,
+)
 from .plot_mngt import LONG_DURATION, NORMAL_DURATION, Plot_Manager
-from .server_request_scheduler import WorldTidesInfo_server_scheduler
-from .storage_mngt import File_Data_Cache, File_Picture
+from .plot_render_worker import plot_render_worker
+from .rolling_tide_data import ROLLING_HISTORY_DURATION
+from .server_request_scheduler import (
+    WorldTidesInfo_server_scheduler,
+    give_refresh_offset,
+)
+from .storage_mngt import (
+    File_Data_Cache,
+    File_Picture,
+    Memory_Picture,
+    Shared_Data_Cache,
+)
+from .tide_info_snapshot import Tide_Info_Snapshot
+from .tide_state_frame import Tide_State_Frame
+from .worldtidesinfo_async_server import WorldTidesInfo_async_server
 
 
 class WordTide_Data_Coordinator:
@@ -51,20 +89,47 @@ class WordTide_Data_Coordinator:
         tide_prediction_duration,
         unit_to_display,
         mat_plot_transparent_background,
+        shared_data_store=None,
+        plot_file_mirror=DEFAULT_PLOT_FILE_MIRROR,
+        hot_path_timing=DEFAULT_HOT_PATH_TIMING,
+        monthly_credit_budget=DEFAULT_MONTHLY_CREDIT_BUDGET,
+        refresh_window=DEFAULT_REFRESH_WINDOW,
+        prefetch_time=DEFAULT_PREFETCH_TIME,
+        incremental_fetch=DEFAULT_INCREMENTAL_FETCH,
     ):
         ### for trace
         self._name = name
+        self._hass = hass
 
         ### Self
+        self._key = key
         self._tide_picture_file = None
         self._tide_cache_file = None
         self._worldtidesinfo_server = None
         self._worldtidesinfo_server_scheduler = None
         self._credit_used = 0
-
-        # managment og global count
-        self.overall_count = 0
-        self.overall_count_tmp = 0
+        # credit of fetch done (possibly by the fetch of another station)
+        self._credit_fetched = 0
+
+        # credit of all stations (from credit ledger) since last update
+        self._credit_ledger = None
+        self._global_credit_used = 0
+        self._overall_count_mark = None
+        # monthly budget of API key (0 : no budget)
+        self._monthly_credit_budget = monthly_credit_budget
+        self._credit_budget_planner = None
+
+        # decoded data shared by all entities
+        self._tide_info_snapshot = None
+        self._snapshot_hit_count = 0
+        self._snapshot_rebuild_count = 0
+        # tide state computed at each scan interval
+        self._tide_state_frame = None
+        # measures of hot path (diagnostic sensors)
+        self._hot_path_timer = Hot_Path_Timer(hot_path_timing)
+
+        # only tail of data requested each day (prediction over several days)
+        self._incremental_fetch = incremental_fetch and tide_prediction_duration > 1
 
         # prepare filename
         filenames = give_persistent_filename(hass, name)
@@ -75,13 +140,26 @@ class WordTide_Data_Coordinator:
             hass.config.path(WWW_PATH), filenames.get("curve_filename")
         )
         self._tide_picture_file = tide_picture_file
+        # curve picture given to camera, and the one received not yet stored
+        self._tide_picture = Memory_Picture()
+        self._tide_picture_received = None
+        # curve picture of next day prefetched (not kept over restart)
+        self._tide_picture_staged = None
 
         ### Self
         # prepare persistent file management
-        tide_cache_file = File_Data_Cache(
-            filenames.get("persistent_data_filename"),
-            key,
-        )
+        if shared_data_store is None:
+            tide_cache_file = File_Data_Cache(
+                filenames.get("persistent_data_filename"),
+                key,
+            )
+        else:
+            tide_cache_file = Shared_Data_Cache(
+                shared_data_store,
+                name,
+                filenames.get("persistent_data_filename"),
+                key,
+            )
         self._tide_cache_file = tide_cache_file
         self._tide_cache_file_first_update = True
 
@@ -94,6 +172,8 @@ class WordTide_Data_Coordinator:
             one_day_prediction,
             filenames.get("plot_filename"),
             mat_plot_transparent_background,
+            plot_file_mirror,
+            self._hot_path_timer,
         )
         self._long_plot_manager = Plot_Manager(
             name,
@@ -102,6 +182,8 @@ class WordTide_Data_Coordinator:
             tide_prediction_duration,
             filenames.get("plot_long_prediction_filename"),
             mat_plot_transparent_background,
+            plot_file_mirror,
+            self._hot_path_timer,
         )
 
         # unit used for display, and convert tide station distance
@@ -116,7 +198,7 @@ class WordTide_Data_Coordinator:
         self._unit_to_display = unit_to_display
 
         # instanciate server front end
-        worldtidesinfo_server = WorldTidesInfo_server(
+        worldtidesinfo_server = WorldTidesInfo_async_server(
             key,
             lat,
             lon,
@@ -142,6 +224,16 @@ class WordTide_Data_Coordinator:
         self._worldtidesinfo_server_scheduler = worldtidesinfo_server_scheduler
 
         #### Init
+        # refresh of station within window before midnight
+        self._refresh_window = min(refresh_window, MAX_REFRESH_WINDOW)
+        self._worldtidesinfo_server_scheduler.set_refresh_offset(
+            give_refresh_offset(name, self._refresh_window * 60)
+        )
+        # data of next day requested before midnight, used at midnight
+        self._prefetch_time = min(prefetch_time, MAX_PREFETCH_TIME)
+        self._worldtidesinfo_server_scheduler.set_prefetch_time(
+            self._prefetch_time * 60
+        )
         # set first trigger of scheduler
         self._worldtidesinfo_server_scheduler.setup_next_midnights()
 
@@ -156,13 +248,86 @@ class WordTide_Data_Coordinator:
             "data_datums_offset": self._worldtidesinfo_server_scheduler._Data_Retrieve.data_datums_offset,
         }
 
+    def get_tide_info_snapshot(self):
+        """give the decoded data, rebuilt only when retrieved data has changed"""
+        data_retrieve = self._worldtidesinfo_server_scheduler._Data_Retrieve
+        snapshot = self._tide_info_snapshot
+        if snapshot is not None and snapshot.is_built_from(data_retrieve):
+            self._snapshot_hit_count += 1
+            return snapshot
+
+        start_time = self._hot_path_timer.start()
+        snapshot = Tide_Info_Snapshot(data_retrieve)
+        self._hot_path_timer.stop(HOT_PATH_DECODE_TIME, start_time)
+        self._tide_info_snapshot = snapshot
+        self._snapshot_rebuild_count += 1
+        _LOGGER.debug(
+            "Tide info snapshot rebuilt for %s (version %s)",
+            self._name,
+            snapshot.get_version(),
+        )
+        return snapshot
+
+    def get_snapshot_statistics(self):
+        return {
+            "snapshot_hit": self._snapshot_hit_count,
+            "snapshot_rebuild": self._snapshot_rebuild_count,
+        }
+
+    def update_tide_state_frame(self, current_time):
+        """compute the tide state read by all entities until next update"""
+        self._tide_state_frame = Tide_State_Frame(
+            self.get_tide_info_snapshot(), current_time, self._unit_to_display
+        )
+
+    def get_tide_state_frame(self):
+        """give the tide state, computed again if data has changed in between"""
+        snapshot = self.get_tide_info_snapshot()
+        frame = self._tide_state_frame
+        if frame is None or not frame.is_built_from(snapshot):
+            frame = Tide_State_Frame(snapshot, time.time(), self._unit_to_display)
+            self._tide_state_frame = frame
+        return frame
+
     def get_credit_used(self):
         return self._credit_used
 
+    def get_global_credit_used(self):
+        return self._global_credit_used
+
+    def get_credit_counts(self, current_time):
+        """give credit of current hour, day, month for station and API key"""
+        credit_ledger = self._credit_ledger
+        if credit_ledger is None:
+            return {}
+        return {
+            "station": credit_ledger.give_station_counts(self._name, current_time),
+            "key": credit_ledger.give_key_counts(self._key, current_time),
+        }
+
+    def get_credit_budget(self, current_time):
+        """give budget of API key, projected credit at end of month"""
+        credit_budget_planner = self._credit_budget_planner
+        if credit_budget_planner is None:
+            return {}
+        return {
+            "monthly_credit_budget": credit_budget_planner.give_budget(self._key),
+            "credit_projected_month_end": credit_budget_planner.give_projected_month_end(
+                self._key, current_time
+            ),
+            "refresh_interval_days": credit_budget_planner.give_refresh_interval(
+                self._key, current_time
+            ),
+        }
+
+    def get_hot_path_timer(self):
+        return self._hot_path_timer
+
     def get_schedule_time(self):
         return {
             "data_request_time": self._worldtidesinfo_server_scheduler._Data_Retrieve.data_request_time,
             "previous_data_request_time": self._worldtidesinfo_server_scheduler._Data_Retrieve.previous_data_request_time,
+            "staged_data_request_time": self._worldtidesinfo_server_scheduler._Data_Retrieve.staged_data_request_time,
             "init_data_request_time": self._worldtidesinfo_server_scheduler._Data_Retrieve.init_data_request_time,
             "next_day_midnight": self._worldtidesinfo_server_scheduler._Data_Scheduling.next_day_midnight,
             "next_month_midnight": self._worldtidesinfo_server_scheduler._Data_Scheduling.next_month_midnight,
@@ -171,18 +336,32 @@ class WordTide_Data_Coordinator:
     def get_curve_filename(self):
         return self._tide_picture_file.full_filename()
 
+    def get_curve_picture(self):
+        """give the picture in memory of curve from server"""
+        return self._tide_picture
+
+    def get_plot_picture(self, duration_type):
+        """give the picture in memory of plot"""
+        if duration_type == LONG_DURATION:
+            return self._long_plot_manager.get_picture()
+        return self._plot_manager.get_picture()
+
     def get_server_parameter(self):
         return self._worldtidesinfo_server.give_parameter()
 
-    def _retrieve_tide_station(self):
+    async def _async_retrieve_tide_station(self):
         """TIDE STATION : Get the latest data from WorldTidesInfo."""
-        if self._worldtidesinfo_server.retrieve_tide_station():
+        session = async_get_clientsession(self._hass)
+        coalescer = async_get_fetch_pipeline(self._hass).get_request_coalescer()
+        if await self._worldtidesinfo_server.async_retrieve_tide_station(
+            session, coalescer
+        ):
             _LOGGER.debug(
                 "Init data queried at: %s",
-                self._worldtidesinfo_server.retrieve_tide_station_request_time,
+                self._worldtidesinfo_server.retrieve_tide_station_request_time(),
             )
-            self._credit_used = (
-                self._credit_used
+            self._credit_fetched = (
+                self._credit_fetched
                 + self._worldtidesinfo_server.retrieve_tide_station_credit()
             )
             init_data = self._worldtidesinfo_server.retrieve_tide_station_raw_data()
@@ -203,41 +382,99 @@ class WordTide_Data_Coordinator:
                 self._worldtidesinfo_server.retrieve_tide_station_request_time()
             )
 
-    def _retrieve_height_station(self, init_data_fetched):
+    async def _async_request_heights(
+        self, datum_flag, date, window_start, full, current_time, prefetch=False
+    ):
+        """HEIGTH : request data from window start (date), give it or None.
+
+        With incremental fetch, only the tail not yet held is requested
+        and merged : curve picture is only given by a full request"""
+        scheduler = self._worldtidesinfo_server_scheduler
+        tail_request = None
+        if self._incremental_fetch and not full and not datum_flag:
+            tail_request = scheduler.give_tail_request(
+                window_start,
+                self._worldtidesinfo_server.give_tide_height_duration(),
+                current_time,
+            )
+        request_date = date
+        request_days = None
+        if tail_request is not None:
+            request_date = tail_request["date"]
+            request_days = tail_request["days"]
+
+        session = async_get_clientsession(self._hass)
+        coalescer = async_get_fetch_pipeline(self._hass).get_request_coalescer()
+        start_time = self._hot_path_timer.start()
+        data_received = (
+            await self._worldtidesinfo_server.async_retrieve_tide_height_over_one_day(
+                session, datum_flag, coalescer, request_date, request_days
+            )
+        )
+        self._hot_path_timer.stop(HOT_PATH_FETCH_LATENCY, start_time)
+        if not data_received:
+            return None
+        # credit budget planned with the requests of the whole window
+        self._count_height_credit(tail_request is None and not prefetch)
+        data = self._worldtidesinfo_server.retrieve_tide_raw_data()
+        request_time = self._worldtidesinfo_server.retrieve_tide_request_time()
+
+        if tail_request is None:
+            scheduler.store_full_request_time(request_time)
+            return {"data": data, "full": True}
+        if not scheduler.tail_follows_data(data):
+            _LOGGER.debug(
+                "Tail of data of %s does not follow data held : whole window requested",
+                self._name,
+            )
+            return await self._async_request_heights(
+                datum_flag, date, window_start, True, current_time, prefetch
+            )
+        _LOGGER.debug(
+            "Tail of data of %s requested : %s day(s) from %s",
+            self._name,
+            request_days,
+            request_date,
+        )
+        return {
+            "data": scheduler.merge_tail_data(
+                data, window_start - ROLLING_HISTORY_DURATION
+            ),
+            "full": False,
+        }
+
+    async def _async_retrieve_height_station(self, init_data_fetched, current_time):
         """HEIGTH : Get the latest data from WorldTidesInfo."""
-        data = None
         datum_flag = (
             self._worldtidesinfo_server_scheduler.no_datum() or init_data_fetched
         )
-        if self._worldtidesinfo_server.retrieve_tide_height_over_one_day(datum_flag):
+        today_midnight = datetime.fromtimestamp(current_time).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        heights = await self._async_request_heights(
+            datum_flag,
+            "today",
+            today_midnight.timestamp(),
+            init_data_fetched,
+            current_time,
+        )
+        if heights is not None:
             _LOGGER.debug(
                 "Data queried at: %s",
                 self._worldtidesinfo_server.retrieve_tide_request_time(),
             )
 
-            # update store data
-            data = self._worldtidesinfo_server.retrieve_tide_raw_data()
+            # update store data (without the picture)
+            data = heights["data"]
             self._worldtidesinfo_server_scheduler.store_new_data(
                 data, self._worldtidesinfo_server.retrieve_tide_request_time()
             )
-            self._credit_used = (
-                self._credit_used + self._worldtidesinfo_server.retrieve_tide_credit()
-            )
 
-            # process information
-            tide_info = give_info_from_raw_data(data)
-            datum_content = tide_info.give_datum()
-            if datum_content.get("error") is None:
-                self._worldtidesinfo_server_scheduler._Data_Retrieve.data_datums_offset = datum_content.get(
-                    "datums"
-                )
-            string_picture = tide_info.give_plot_picture_without_header()
-            if string_picture.get("error") is None:
-                self._tide_picture_file.store_picture_base64(
-                    string_picture.get("image")
-                )
-            else:
-                self._tide_picture_file.remove_previous_picturefile()
+            # picture is decoded and stored in executor
+            self._tide_picture_received = self._process_height_data(
+                data, heights["full"]
+            )
+            return True
 
         else:
             _LOGGER.error(
@@ -248,12 +485,129 @@ class WordTide_Data_Coordinator:
             self._worldtidesinfo_server_scheduler.process_no_new_data(
                 self._worldtidesinfo_server.retrieve_tide_request_time()
             )
+            return False
+
+    async def _async_prefetch_height_station(self, current_time):
+        """HEIGTH : Get the data of next day from WorldTidesInfo."""
+        next_day_midnight = (
+            self._worldtidesinfo_server_scheduler._Data_Scheduling.next_day_midnight
+        )
+        datum_flag = self._worldtidesinfo_server_scheduler.no_datum()
+        heights = await self._async_request_heights(
+            datum_flag,
+            next_day_midnight.strftime("%Y-%m-%d"),
+            next_day_midnight.timestamp(),
+            False,
+            current_time,
+            prefetch=True,
+        )
+        if heights is not None:
+            _LOGGER.debug(
+                "Data of %s prefetched at: %s",
+                next_day_midnight.strftime("%Y-%m-%d"),
+                self._worldtidesinfo_server.retrieve_tide_request_time(),
+            )
+            data = heights["data"]
+            self._worldtidesinfo_server_scheduler.store_staged_data(
+                data, self._worldtidesinfo_server.retrieve_tide_request_time()
+            )
+
+            # picture stored when data is used
+            self._tide_picture_staged = self._process_height_data(
+                data, heights["full"]
+            )
+            return True
+
+        else:
+            _LOGGER.error(
+                "Error prefetching height station data from WorldTidesInfo %s: %s",
+                self._name,
+                self._worldtidesinfo_server.retrieve_tide_err_value(),
+            )
+            self._worldtidesinfo_server_scheduler.process_no_staged_data(
+                self._worldtidesinfo_server.retrieve_tide_request_time()
+            )
+            return False
+
+    def _count_height_credit(self, whole_window):
+        credit = self._worldtidesinfo_server.retrieve_tide_credit()
+        self._credit_fetched = self._credit_fetched + credit
+        if whole_window and self._credit_budget_planner is not None:
+            self._credit_budget_planner.record_refresh_credit(
+                self._key,
+                self._name,
+                credit,
+                self._worldtidesinfo_server.give_tide_height_duration(),
+                self._worldtidesinfo_server_scheduler.give_refresh_interval(),
+            )
+
+    def _process_height_data(self, data, full):
+        """keep datums of data received, give its curve picture (None : kept)"""
+        tide_info = give_info_from_raw_data(data)
+        datum_content = tide_info.give_datum()
+        if datum_content.get("error") is None:
+            self._worldtidesinfo_server_scheduler._Data_Retrieve.data_datums_offset = datum_content.get(
+                "datums"
+            )
+        if not full:
+            return None
+        return tide_info.give_plot_picture_without_header()
+
+    async def _async_use_staged_data(self, current_time):
+        """switch to data of the day prefetched : no request to server"""
+        self._worldtidesinfo_server_scheduler.use_staged_data()
+        self._worldtidesinfo_server_scheduler.setup_next_data_midnight(current_time)
+        _LOGGER.debug(
+            "Data prefetched used at: %s for %s", int(current_time), self._name
+        )
+        # curve picture not kept over restart : previous one is kept
+        self._tide_picture_received = self._tide_picture_staged
+        self._tide_picture_staged = None
+        await self._hass.async_add_executor_job(
+            self._store_height_station,
+            True,
+            self._hot_path_timer.start(),
+        )
+
+    def _store_height_station(self, data_received, submit_time=None):
+        """Write on disk the picture and the data retrieved."""
+        self._hot_path_timer.stop(HOT_PATH_EXECUTOR_QUEUE_WAIT, submit_time)
+        string_picture = self._tide_picture_received
+        self._tide_picture_received = None
+        # no curve picture with tail of data : previous one is kept
+        if data_received and string_picture is not None:
+            if string_picture.get("error") is None:
+                picture = base64.b64decode(string_picture.get("image"))
+                # written (and given to camera) only if it has changed
+                if self._tide_picture_file.store_picture_if_changed(picture):
+                    self._tide_picture.store_picture(picture)
+            else:
+                self._tide_picture_file.remove_previous_picturefile()
+
+        start_time = self._hot_path_timer.start()
+        self._tide_cache_file.store_data(
+            self._worldtidesinfo_server_scheduler.give_scheduler_image()
+        )
+        self._hot_path_timer.stop(HOT_PATH_SNAPSHOT_WRITE_TIME, start_time)
+        self._hot_path_timer.record(
+            HOT_PATH_BYTES_STORED, self._tide_cache_file.give_content_size()
+        )
+        _LOGGER.debug(
+            "Snapshot of %s written : %s bytes",
+            self._name,
+            self._tide_cache_file.give_content_size(),
+        )
 
     def check_if_tide_file_exist_for_init(self, current_time):
         # Init data (initialisation or refresh or retrieve from a file)
         # if self._worldtidesinfo_server_scheduler.init_data_to_be_fetched(current_time):
         if self._tide_cache_file_first_update:
             self._tide_cache_file_first_update = False
+            # curve picture of previous run
+            picture = self._tide_picture_file.load_picture()
+            if picture is not None:
+                self._tide_picture.store_picture(picture)
+            start_time = time.monotonic()
             if self._tide_cache_file.Fetch_Stored_Data():
                 SchedulerSnapshot = self._tide_cache_file.Data_Read()
                 _LOGGER.debug(
@@ -269,9 +623,27 @@ class WordTide_Data_Coordinator:
                         int(current_time),
                         self._name,
                     )
-                    self._worldtidesinfo_server_scheduler.use_scheduler_image_if_possible(
+                    snapshot_used = self._worldtidesinfo_server_scheduler.use_scheduler_image_if_possible(
                         SchedulerSnapshot
                     )
+                    _LOGGER.debug(
+                        "Snapshot of %s loaded : %s bytes (version %s) in %.1f ms",
+                        self._name,
+                        self._tide_cache_file.give_content_size(),
+                        SchedulerSnapshot.get("Version"),
+                        (time.monotonic() - start_time) * 1000,
+                    )
+                    if snapshot_used and self._worldtidesinfo_server_scheduler.scheduler_snapshot_legacy(
+                        SchedulerSnapshot
+                    ):
+                        # migrate file to current format
+                        _LOGGER.debug(
+                            "Snpashot migrated to current format for %s",
+                            self._name,
+                        )
+                        self._tide_cache_file.store_data(
+                            self._worldtidesinfo_server_scheduler.give_scheduler_image()
+                        )
                 else:
                     _LOGGER.debug(
                         "Error in decoding data file at: %s for %s",
@@ -279,11 +651,43 @@ class WordTide_Data_Coordinator:
                         self._name,
                     )
 
-    def _update_and_fetch_server_data(self):
-        init_data_fetched = False
+    def need_to_fetch_server_data(self, current_time):
+        """check if data has to be requested to server"""
+        # stored data not yet read : wait for it
+        if self._tide_cache_file_first_update:
+            return False
+        return (
+            self._worldtidesinfo_server_scheduler.init_data_to_be_fetched(current_time)
+            or self._worldtidesinfo_server_scheduler.data_to_be_fetched(
+                False, current_time
+            )
+            or self._worldtidesinfo_server_scheduler.data_to_be_prefetched(
+                current_time
+            )
+        )
 
-        self._credit_used = 0
-        current_time = time.time()
+    def apply_refresh_plan(self, current_time):
+        """set refresh interval (credit budget) and days requested
+
+        done once per update : not when the pipeline checks the stations"""
+        # refresh every n days, with n - 1 days more of data, to hold budget
+        refresh_interval = 1
+        if self._credit_budget_planner is not None:
+            refresh_interval = self._credit_budget_planner.give_refresh_interval(
+                self._key, current_time
+            )
+        self._worldtidesinfo_server_scheduler.set_refresh_interval(refresh_interval)
+        extra_duration = refresh_interval - 1
+        # refresh before midnight : one day more to cover the next day
+        # (data prefetched already begins the next day)
+        if self._refresh_window > 0 and self._prefetch_time == 0:
+            extra_duration = extra_duration + 1
+        self._worldtidesinfo_server.set_tide_prediction_extra_duration(extra_duration)
+
+    async def async_fetch_server_data(self, current_time):
+        ### The requests to server are done in event loop,
+        ### the files are written in executor
+        init_data_fetched = False
 
         # no data has been retrieved -at least once- or too old or change ref
         if self._worldtidesinfo_server_scheduler.init_data_to_be_fetched(current_time):
@@ -293,7 +697,7 @@ class WordTide_Data_Coordinator:
                 self._name,
             )
             # Retrieve station from server
-            self._retrieve_tide_station()
+            await self._async_retrieve_tide_station()
             self._worldtidesinfo_server_scheduler.setup_next_init_data_midnight()
             init_data_fetched = True
 
@@ -301,11 +705,64 @@ class WordTide_Data_Coordinator:
         if self._worldtidesinfo_server_scheduler.data_to_be_fetched(
             init_data_fetched, current_time
         ):
-            self._retrieve_height_station(init_data_fetched)
-            self._worldtidesinfo_server_scheduler.setup_next_data_midnight()
-            self._tide_cache_file.store_data(
-                self._worldtidesinfo_server_scheduler.give_scheduler_image()
+            data_received = await self._async_retrieve_height_station(
+                init_data_fetched, current_time
+            )
+            self._worldtidesinfo_server_scheduler.setup_next_data_midnight(
+                current_time
             )
+            await self._hass.async_add_executor_job(
+                self._store_height_station,
+                data_received,
+                self._hot_path_timer.start(),
+            )
+        # before midnight : data of next day
+        elif self._worldtidesinfo_server_scheduler.data_to_be_prefetched(
+            current_time
+        ):
+            if await self._async_prefetch_height_station(current_time):
+                # only data file written : picture is stored at midnight
+                await self._hass.async_add_executor_job(
+                    self._store_height_station,
+                    False,
+                    self._hot_path_timer.start(),
+                )
+
+    def _plot(self, current_time, submit_time=None):
+        self._hot_path_timer.stop(HOT_PATH_EXECUTOR_QUEUE_WAIT, submit_time)
+        # generate a plot curve at each update
+        # the plots are drawn by the render worker
+        data = self._worldtidesinfo_server_scheduler._Data_Retrieve.data
+        tide_info = self.get_tide_info_snapshot().get_current_tide_info()
+        self._plot_manager.submit_new_plot(data, current_time, tide_info)
+        self._long_plot_manager.submit_new_plot(data, current_time, tide_info)
+
+        # compute the tide state shared by all entities
+        self.update_tide_state_frame(current_time)
+
+    async def async_update_server_data(self):
+        ### The class is intended to be used by several sensor
+        ### but only one is forecast to update at a time
+        ### (write of new data during update)
+        current_time = time.time()
+
+        # credit ledger and budget shared by all stations
+        if self._credit_budget_planner is None:
+            self._credit_budget_planner = await async_get_credit_budget_planner(
+                self._hass
+            )
+            self._credit_budget_planner.set_budget(
+                self._key, self._name, self._monthly_credit_budget
+            )
+        self.apply_refresh_plan(current_time)
+
+        # data of the day prefetched before midnight : no wait on server
+        if self._worldtidesinfo_server_scheduler.staged_data_to_be_used(current_time):
+            await self._async_use_staged_data(current_time)
+
+        # all the stations that need data are fetched at once
+        if self.need_to_fetch_server_data(current_time):
+            await async_get_fetch_pipeline(self._hass).async_fetch(current_time)
         else:
             _LOGGER.debug(
                 "Tide data not need to be requeried at: %s for %s",
@@ -313,20 +770,36 @@ class WordTide_Data_Coordinator:
                 self._name,
             )
 
-        # generate a plot curve at each update
-        # create a plot
-        data = self._worldtidesinfo_server_scheduler._Data_Retrieve.data
-        self._plot_manager.compute_new_plot(data, current_time)
-        self._long_plot_manager.compute_new_plot(data, current_time)
+        # credit used since last update
+        self._credit_used = self._credit_fetched
+        self._credit_fetched = 0
+
+        # credit of all stations : counted once per fetch by the ledger
+        credit_ledger = await async_get_credit_ledger(self._hass)
+        self._credit_ledger = credit_ledger
+        if self._overall_count_mark is None:
+            self._overall_count_mark = credit_ledger.give_overall_count()
+        credit_ledger.record(self._key, self._name, self._credit_used, current_time)
+        overall_count = credit_ledger.give_overall_count()
+        self._global_credit_used = overall_count - self._overall_count_mark
+        self._overall_count_mark = overall_count
+
+        await self._hass.async_add_executor_job(
+            self._plot, current_time, self._hot_path_timer.start()
+        )
 
         return True
 
-    def update_server_data(self):
-        ### The class is intended to be used by several sensor
-        ### but only one is forecast to update at a time
-        ### (write of new data during update)
-        ### The function is sync (i.e. or used with async and a LOCK)
-        result = self._update_and_fetch_server_data()
+    def get_fetch_statistics(self):
+        return async_get_fetch_pipeline(self._hass).get_statistics()
+
+    def get_plot_statistics(self):
+        statistics = {
+            "plot_render_skipped": self._plot_manager.get_skipped_render_count()
+            + self._long_plot_manager.get_skipped_render_count(),
+        }
+        statistics.update(plot_render_worker.get_statistics())
+        return statistics
 
     def change_reference_point(self, lat, long):
         self._worldtidesinfo_server.change_ref_point(lat, long)
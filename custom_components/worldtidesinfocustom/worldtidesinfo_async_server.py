@@ -0,0 +1,187 @@
+"""Async front end of Word Tides Info server API."""
+# Python library
+import asyncio
+import logging
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+# PyPy Library
+import aiohttp
+
+# pyworldtidesinfo library
+from pyworldtidesinfo.worldtidesinfo_server import WorldTidesInfo_server
+
+# same server and timeout (in seconds) as pyworldtidesinfo
+SERVER_URL = "https://www.worldtides.info"
+SERVER_REQUEST_TIMEOUT = 10
+
+
+def give_parameter_key(parameter):
+    """give a key equal for parameters that compare_parameter finds equal"""
+    return (
+        parameter._version,
+        parameter._key,
+        parameter._lat,
+        parameter._lon,
+        parameter._vertical_ref,
+        parameter._tide_station_distance,
+        parameter._tide_prediction_duration,
+        parameter._plot_color,
+        parameter._plot_background,
+        parameter._unit_curve_picture,
+    )
+
+
+class WorldTidesInfo_async_server(WorldTidesInfo_server):
+    """Word Tide Info server queried with an aiohttp session"""
+
+    # the last_* fields are filled in as pyworldtidesinfo does
+    # so that the retrieve_* methods give the same information
+
+    server_url = SERVER_URL
+    # days requested beyond prediction : data held over several days
+    _tide_prediction_extra_duration = 0
+
+    def give_tide_station_resource(self):
+        """Give the URL to retrieve tide station."""
+        return (
+            "{}/api/{}?stations"
+            "&key={}&lat={}&lon={}&stationDistance={}"
+        ).format(
+            self.server_url,
+            self._Server_Parameter._version,
+            self._Server_Parameter._key,
+            self._Server_Parameter._lat,
+            self._Server_Parameter._lon,
+            self._Server_Parameter._tide_station_distance,
+        )
+
+    def give_tide_height_duration(self):
+        """Give the days requested from today."""
+        # prediction + 1 day --> to manage midnight
+        return (
+            self._Server_Parameter._tide_prediction_duration
+            + 1
+            + self._tide_prediction_extra_duration
+        )
+
+    def give_tide_height_resource(self, datum_flag, date="today", days=None):
+        """Give the URL to retrieve tide height and extrema from date.
+
+        days given : tail of data held, without curve picture"""
+        datums_string = ""
+        if datum_flag:
+            datums_string = "&datums"
+
+        plot_string = "&plot"
+        if days is None:
+            tide_prediction_total_duration = self.give_tide_height_duration()
+        else:
+            tide_prediction_total_duration = days
+            plot_string = ""
+
+        return (
+            "{}/api/{}?extremes&days={}&date={}&heights{}&timemode=24&step=900"
+            "&key={}&lat={}&lon={}&datum={}&stationDistance={}&color={}&background={}&units={}{}"
+        ).format(
+            self.server_url,
+            self._Server_Parameter._version,
+            tide_prediction_total_duration,
+            date,
+            plot_string,
+            self._Server_Parameter._key,
+            self._Server_Parameter._lat,
+            self._Server_Parameter._lon,
+            self._Server_Parameter._vertical_ref,
+            self._Server_Parameter._tide_station_distance,
+            self._Server_Parameter._plot_color,
+            self._Server_Parameter._plot_background,
+            self._Server_Parameter._unit_curve_picture,
+            datums_string,
+        )
+
+    def set_tide_prediction_extra_duration(self, extra_duration):
+        """set the days requested beyond prediction (not a server parameter)"""
+        self._tide_prediction_extra_duration = extra_duration
+
+    async def _async_get(self, session, resource):
+        """Query the server : give data or error value."""
+        try:
+            async with session.get(
+                resource,
+                timeout=aiohttp.ClientTimeout(total=SERVER_REQUEST_TIMEOUT),
+            ) as data_get:
+                if data_get.status == 200:
+                    data = await data_get.json(content_type=None)
+                    return {"data": data, "error": None}
+                return {"data": None, "error": data_get.status}
+        except ValueError as err:
+            return {"data": None, "error": err.args}
+        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+            _LOGGER.debug("WorldTidesInfo server not reachable : %s", repr(err))
+            return {"data": None, "error": repr(err)}
+
+    async def _async_get_coalesced(self, session, resource, request_key, coalescer):
+        """Query the server, sharing the request if a coalescer is given."""
+        if coalescer is None:
+            return await self._async_get(session, resource), True
+        return await coalescer.async_request(
+            request_key + give_parameter_key(self._Server_Parameter),
+            lambda: self._async_get(session, resource),
+        )
+
+    async def async_retrieve_tide_station(self, session, coalescer=None):
+        """Retrieve information related tide station only."""
+        current_time = time.time()
+
+        response, request_owner = await self._async_get_coalesced(
+            session, self.give_tide_station_resource(), ("stations",), coalescer
+        )
+        data = response.get("data")
+        data_has_been_received = data is not None
+
+        # information from server
+        self.last_tide_station_raw_data = data
+        self.last_tide_station_request_time = current_time
+        # credit is used once : by the owner of request
+        if data_has_been_received and request_owner:
+            self.last_tide_station_request_credit = data["callCount"]
+        else:
+            self.last_tide_station_request_credit = 0
+        self.last_tide_station_request_error_value = response.get("error")
+
+        return data_has_been_received
+
+    async def async_retrieve_tide_height_over_one_day(
+        self, session, datum_flag, coalescer=None, date="today", days=None
+    ):
+        """Retrieve information related to tide (date : today or YYYY-MM-DD)."""
+        current_time = time.time()
+
+        response, request_owner = await self._async_get_coalesced(
+            session,
+            self.give_tide_height_resource(datum_flag, date, days),
+            (
+                "heights",
+                datum_flag,
+                self._tide_prediction_extra_duration,
+                date,
+                days,
+            ),
+            coalescer,
+        )
+        data = response.get("data")
+        data_has_been_received = data is not None
+
+        # information from server
+        self.last_tide_raw_data = data
+        self.last_tide_request_time = current_time
+        # credit is used once : by the owner of request
+        if data_has_been_received and request_owner:
+            self.last_tide_request_credit = data["callCount"]
+        else:
+            self.last_tide_request_credit = 0
+        self.last_tide_request_error_value = response.get("error")
+
+        return data_has_been_received
@@ -0,0 +1,67 @@
+"""Monthly credit budget of API keys."""
+# Python library
+import unittest
+from datetime import datetime
+
+# Component library
+from custom_components.worldtidesinfocustom.credit_budget import (
+    Credit_Budget_Planner,
+    give_month_remaining_time,
+)
+from custom_components.worldtidesinfocustom.credit_ledger import Credit_Ledger
+
+# 20.5 days before next month (local time)
+CURRENT_TIME = datetime(2024, 1, 11, 12).timestamp()
+
+
+def give_planner(month_credit):
+    credit_ledger = Credit_Ledger()
+    credit_ledger.record("KEY", "royan", month_credit, CURRENT_TIME)
+    return Credit_Budget_Planner(credit_ledger)
+
+
+class Test_Credit_Budget_Planner(unittest.TestCase):
+    def test_month_remaining_time(self):
+        self.assertEqual(give_month_remaining_time(CURRENT_TIME), 20.5 * 86400)
+
+    def test_refresh_credit_of_interval(self):
+        planner = give_planner(0)
+        # prediction of 1 day : 2 days requested by a daily refresh
+        planner.record_refresh_credit("KEY", "royan", 1, 2, 1)
+        for refresh_interval, refresh_credit in [(1, 1), (6, 1), (7, 2)]:
+            self.assertEqual(
+                planner.give_refresh_credit("KEY", refresh_interval), refresh_credit
+            )
+        # same prediction requested to refresh every 3 days
+        planner.record_refresh_credit("KEY", "royan", 1, 4, 3)
+        self.assertEqual(planner.give_refresh_credit("KEY", 7), 2)
+        self.assertEqual(planner.give_refresh_credit("OTHER_KEY", 7), 0)
+
+    def test_refresh_interval_holds_budget(self):
+        planner = give_planner(100)
+        planner.set_budget("KEY", "royan", 110)
+        planner.record_refresh_credit("KEY", "royan", 1, 2, 1)
+        # 121 credits if daily, 107 if every 3 days
+        self.assertEqual(planner.give_refresh_interval("KEY", CURRENT_TIME), 3)
+        self.assertEqual(planner.give_projected_month_end("KEY", CURRENT_TIME), 107)
+
+    def test_refresh_interval_counts_more_days(self):
+        planner = give_planner(100)
+        planner.set_budget("KEY", "royan", 104)
+        planner.record_refresh_credit("KEY", "royan", 1, 2, 1)
+        # every 5 days : 105, every 6 days : 104,
+        # every 7 days : 8 days requested (2 credits) : 106
+        self.assertEqual(planner.give_refresh_interval("KEY", CURRENT_TIME), 6)
+
+    def test_no_budget(self):
+        planner = give_planner(100)
+        planner.record_refresh_credit("KEY", "royan", 1, 2, 1)
+        self.assertEqual(planner.give_refresh_interval("KEY", CURRENT_TIME), 1)
+        planner.set_budget("KEY", "royan", 110)
+        planner.remove_station("royan")
+        self.assertEqual(planner.give_budget("KEY"), 0)
+        self.assertEqual(planner.give_refresh_credit("KEY", 1), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
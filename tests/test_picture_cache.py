@@ -0,0 +1,58 @@
+"""Scaled pictures given by cameras."""
+# Python library
+import io
+import unittest
+
+# Pillow
+from PIL import Image
+
+# Component library
+from custom_components.worldtidesinfocustom.picture_cache import (
+    PICTURE_NOT_CACHED,
+    Resized_Picture_Cache,
+)
+
+
+def give_png(width, height):
+    image = io.BytesIO()
+    Image.new("RGB", (width, height), (2, 102, 255)).save(image, format="PNG")
+    return image.getvalue()
+
+
+def give_size(image):
+    with Image.open(io.BytesIO(image)) as picture:
+        return picture.size
+
+
+class Test_Resized_Picture_Cache(unittest.TestCase):
+    def test_no_picture(self):
+        cache = Resized_Picture_Cache()
+        self.assertIsNone(cache.give_cached_picture(1, None, 100, 50))
+        self.assertIsNone(cache.give_picture(1, None, 100, 50))
+        self.assertIsNone(cache.give_picture(1, None, None, None))
+
+    def test_scaled_picture_cached(self):
+        cache = Resized_Picture_Cache()
+        image = give_png(200, 100)
+        self.assertIs(cache.give_cached_picture(1, image, 100, 100), PICTURE_NOT_CACHED)
+        scaled_image = cache.give_picture(1, image, 100, 100)
+        self.assertEqual(give_size(scaled_image), (100, 50))
+        self.assertIs(cache.give_cached_picture(1, image, 100, 100), scaled_image)
+        self.assertEqual(cache.get_statistics()["resized_picture_count"], 1)
+
+    def test_picture_not_scaled_up_not_cached(self):
+        cache = Resized_Picture_Cache()
+        image = give_png(200, 100)
+        self.assertIs(cache.give_picture(1, image, 400, 400), image)
+        self.assertEqual(cache.get_statistics()["resized_picture_memory"], 0)
+
+    def test_new_generation(self):
+        cache = Resized_Picture_Cache()
+        image = give_png(200, 100)
+        cache.give_picture(1, image, 100, 100)
+        self.assertIs(cache.give_cached_picture(2, image, 100, 100), PICTURE_NOT_CACHED)
+        self.assertEqual(cache.get_statistics()["resized_picture_count"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
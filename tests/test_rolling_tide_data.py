@@ -0,0 +1,137 @@
+"""Rolling window of tide data."""
+# Python library
+import unittest
+from datetime import datetime
+
+# Component library
+from custom_components.worldtidesinfocustom.rolling_tide_data import (
+    ROLLING_HEIGHT_STEP,
+    ROLLING_HISTORY_DURATION,
+    give_data_end,
+    give_tail_request,
+    merge_tide_data,
+    tail_follows_data,
+)
+
+# midnight of window start (local time)
+WINDOW_START = datetime(2024, 1, 11).timestamp()
+
+
+def give_data(start, end, height=1.0, datums=True):
+    """give data with a height every step and an extrema every 6 hours"""
+    data = {
+        "station": "ROYAN",
+        "heights": [
+            {"dt": dt, "height": height}
+            for dt in range(int(start), int(end), ROLLING_HEIGHT_STEP)
+        ],
+        "extremes": [
+            {"dt": dt, "height": height, "type": "High"}
+            for dt in range(int(start), int(end), 6 * 3600)
+        ],
+    }
+    if datums:
+        data["datums"] = [{"name": "LAT", "height": 0.0}]
+    return data
+
+
+class Test_Rolling_Tide_Data(unittest.TestCase):
+    def test_tail_request(self):
+        # 2 days held from window start : tail from day after
+        data = give_data(WINDOW_START, WINDOW_START + 2 * 86400)
+        self.assertEqual(
+            give_tail_request(data, WINDOW_START, WINDOW_START + 4 * 86400),
+            {"date": "2024-01-13", "days": 2},
+        )
+
+    def test_tail_request_window_end_held(self):
+        # data held already covers window end : one day requested
+        data = give_data(WINDOW_START, WINDOW_START + 3 * 86400)
+        self.assertEqual(
+            give_tail_request(data, WINDOW_START, WINDOW_START + 2 * 86400),
+            {"date": "2024-01-14", "days": 1},
+        )
+
+    def test_no_tail_request(self):
+        self.assertIsNone(give_tail_request(None, WINDOW_START, WINDOW_START + 86400))
+        self.assertIsNone(
+            give_tail_request({"heights": []}, WINDOW_START, WINDOW_START + 86400)
+        )
+        # data held begins after window start : whole window requested
+        data = give_data(WINDOW_START + 3600, WINDOW_START + 2 * 86400)
+        self.assertIsNone(give_tail_request(data, WINDOW_START, WINDOW_START + 86400))
+
+    def test_tail_follows_data(self):
+        data = give_data(WINDOW_START, WINDOW_START + 86400)
+        data_end = give_data_end(data)
+        tail = give_data(data_end + ROLLING_HEIGHT_STEP, WINDOW_START + 2 * 86400)
+        self.assertTrue(tail_follows_data(data, tail))
+        overlap = give_data(WINDOW_START + 3600, WINDOW_START + 2 * 86400)
+        self.assertTrue(tail_follows_data(data, overlap))
+
+    def test_gap_rejected(self):
+        data = give_data(WINDOW_START, WINDOW_START + 86400)
+        data_end = give_data_end(data)
+        tail = give_data(data_end + 2 * ROLLING_HEIGHT_STEP, WINDOW_START + 2 * 86400)
+        self.assertFalse(tail_follows_data(data, tail))
+        self.assertFalse(tail_follows_data(data, {"heights": []}))
+        self.assertFalse(tail_follows_data(None, tail))
+
+    def test_tail_replaces_overlap(self):
+        data = give_data(WINDOW_START, WINDOW_START + 2 * 86400, height=1.0)
+        tail_start = WINDOW_START + 86400
+        tail = give_data(tail_start, WINDOW_START + 3 * 86400, height=2.0)
+        merged_data = merge_tide_data(data, tail, WINDOW_START)
+        heights = merged_data["heights"]
+        self.assertEqual(
+            [height["dt"] for height in heights],
+            list(
+                range(
+                    int(WINDOW_START),
+                    int(WINDOW_START + 3 * 86400),
+                    ROLLING_HEIGHT_STEP,
+                )
+            ),
+        )
+        self.assertTrue(
+            all(
+                height["height"] == 1.0
+                for height in heights
+                if height["dt"] < tail_start
+            )
+        )
+        self.assertTrue(
+            all(
+                height["height"] == 2.0
+                for height in heights
+                if height["dt"] >= tail_start
+            )
+        )
+        self.assertEqual(
+            [extrema["dt"] for extrema in merged_data["extremes"]],
+            list(range(int(WINDOW_START), int(WINDOW_START + 3 * 86400), 6 * 3600)),
+        )
+        self.assertEqual(give_data_end(merged_data), give_data_end(tail))
+
+    def test_history_trimmed(self):
+        data = give_data(WINDOW_START - 3 * 86400, WINDOW_START + 86400)
+        tail = give_data(WINDOW_START + 86400, WINDOW_START + 2 * 86400)
+        trim_time = WINDOW_START - ROLLING_HISTORY_DURATION
+        merged_data = merge_tide_data(data, tail, trim_time)
+        self.assertEqual(merged_data["heights"][0]["dt"], trim_time)
+        self.assertEqual(merged_data["extremes"][0]["dt"], trim_time)
+
+    def test_datums_carried_over(self):
+        data = give_data(WINDOW_START, WINDOW_START + 86400)
+        tail = give_data(WINDOW_START + 86400, WINDOW_START + 2 * 86400, datums=False)
+        merged_data = merge_tide_data(data, tail, WINDOW_START)
+        self.assertEqual(merged_data["datums"], data["datums"])
+        self.assertNotIn("datums", tail)
+        # datums of tail are kept
+        tail["datums"] = [{"name": "LAT", "height": 0.1}]
+        merged_data = merge_tide_data(data, tail, WINDOW_START)
+        self.assertEqual(merged_data["datums"], tail["datums"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+"""Server request scheduler : data of next day prefetched before midnight."""
+# Python library
+import unittest
+from datetime import datetime
+
+# pyworldtidesinfo library
+from pyworldtidesinfo.worldtidesinfo_server import PLOT_CURVE_UNIT_M
+
+# Component library
+from custom_components.worldtidesinfocustom.server_request_scheduler import (
+    PREFETCH_RETRY_INTERVAL,
+    WorldTidesInfo_server_scheduler,
+)
+from custom_components.worldtidesinfocustom.worldtidesinfo_async_server import (
+    WorldTidesInfo_async_server,
+)
+
+TIDE_PREDICTION_DURATION = 2
+PREFETCH_TIME = 3 * 3600
+REFRESH_OFFSET = 600
+# first fetch during the day, next midnight (local time)
+FIRST_FETCH_TIME = datetime(2024, 1, 11, 10).timestamp()
+MIDNIGHT = datetime(2024, 1, 12).timestamp()
+
+
+def give_parameter(vertical_ref="LAT"):
+    return WorldTidesInfo_async_server(
+        "KEY",
+        45.6,
+        -1.0,
+        vertical_ref,
+        50,
+        TIDE_PREDICTION_DURATION,
+        "2,102,255",
+        "255,255,255",
+        PLOT_CURVE_UNIT_M,
+    ).give_parameter()
+
+
+def give_data(start, days):
+    """give data of days from start, a height every 15 min"""
+    return {
+        "station": "ROYAN",
+        "heights": [
+            {"dt": dt, "height": 1.0}
+            for dt in range(int(start), int(start + days * 86400), 900)
+        ],
+    }
+
+
+def give_scheduler(refresh_interval=1):
+    """give scheduler of station once data of the day has been fetched"""
+    scheduler = WorldTidesInfo_server_scheduler("KEY", give_parameter())
+    scheduler.set_prefetch_time(PREFETCH_TIME)
+    scheduler.set_refresh_offset(REFRESH_OFFSET)
+    scheduler.set_refresh_interval(refresh_interval)
+    scheduler.store_init_data({"stations": []}, FIRST_FETCH_TIME)
+    scheduler.store_new_data(
+        give_data(MIDNIGHT - 86400, TIDE_PREDICTION_DURATION + refresh_interval),
+        FIRST_FETCH_TIME,
+    )
+    scheduler.setup_next_data_midnight(FIRST_FETCH_TIME)
+    return scheduler
+
+
+class Test_Prefetch(unittest.TestCase):
+    def test_prefetch_window(self):
+        scheduler = give_scheduler()
+        window_start = MIDNIGHT - PREFETCH_TIME - REFRESH_OFFSET
+        self.assertFalse(scheduler.data_to_be_prefetched(window_start - 1))
+        for current_time in [window_start, MIDNIGHT - 1]:
+            self.assertTrue(scheduler.data_to_be_prefetched(current_time))
+            # data of the day is not fetched again before midnight
+            self.assertFalse(scheduler.data_to_be_fetched(False, current_time))
+        # no data prefetched : data of the day fetched at midnight
+        self.assertFalse(scheduler.data_to_be_prefetched(MIDNIGHT))
+        self.assertTrue(scheduler.data_to_be_fetched(False, MIDNIGHT))
+
+    def test_no_prefetch(self):
+        scheduler = give_scheduler()
+        scheduler.set_prefetch_time(0)
+        self.assertFalse(scheduler.data_to_be_prefetched(MIDNIGHT - 60))
+
+    def test_no_prefetch_when_data_covers_next_day(self):
+        # credit budget : refresh every 2 days, data held covers the next day
+        scheduler = give_scheduler(refresh_interval=2)
+        self.assertTrue(scheduler.data_covers_prediction(MIDNIGHT))
+        self.assertFalse(scheduler.data_to_be_prefetched(MIDNIGHT - 60))
+        self.assertFalse(scheduler.data_to_be_fetched(False, MIDNIGHT))
+        # daily refresh : next day prefetched even if data held covers it
+        scheduler.set_refresh_interval(1)
+        self.assertTrue(scheduler.data_to_be_prefetched(MIDNIGHT - 60))
+
+    def test_prefetch_retried_after_one_hour(self):
+        scheduler = give_scheduler()
+        failure_time = MIDNIGHT - PREFETCH_TIME
+        scheduler.process_no_staged_data(failure_time)
+        self.assertFalse(
+            scheduler.data_to_be_prefetched(failure_time + PREFETCH_RETRY_INTERVAL - 1)
+        )
+        self.assertTrue(
+            scheduler.data_to_be_prefetched(failure_time + PREFETCH_RETRY_INTERVAL)
+        )
+
+    def test_switch_at_midnight_without_fetch(self):
+        scheduler = give_scheduler()
+        data = scheduler._Data_Retrieve.data
+        prefetch_time = MIDNIGHT - 60
+        staged_data = give_data(MIDNIGHT, TIDE_PREDICTION_DURATION + 1)
+        scheduler.store_staged_data(staged_data, prefetch_time)
+        # already prefetched
+        self.assertFalse(scheduler.data_to_be_prefetched(prefetch_time + 30))
+        self.assertFalse(scheduler.staged_data_to_be_used(MIDNIGHT - 1))
+
+        # midnight : data prefetched used, server not requested
+        self.assertTrue(scheduler.staged_data_to_be_used(MIDNIGHT))
+        self.assertFalse(scheduler.data_to_be_fetched(False, MIDNIGHT))
+        scheduler.use_staged_data()
+        scheduler.setup_next_data_midnight(MIDNIGHT)
+        self.assertIs(scheduler._Data_Retrieve.data, staged_data)
+        self.assertEqual(scheduler._Data_Retrieve.data_request_time, prefetch_time)
+        self.assertIs(scheduler._Data_Retrieve.previous_data, data)
+        self.assertIsNone(scheduler._Data_Retrieve.staged_data)
+        self.assertEqual(
+            scheduler._Data_Scheduling.next_day_midnight.timestamp(),
+            MIDNIGHT + 86400,
+        )
+        self.assertFalse(scheduler.data_to_be_fetched(False, MIDNIGHT + 60))
+        self.assertFalse(scheduler.data_to_be_prefetched(MIDNIGHT + 60))
+
+    def test_staged_data_not_used_the_day_after(self):
+        scheduler = give_scheduler()
+        scheduler.store_staged_data(give_data(MIDNIGHT, 3), MIDNIGHT - 60)
+        self.assertFalse(scheduler.staged_data_to_be_used(MIDNIGHT + 86400))
+
+    def test_staged_data_cleared_by_parameter_change(self):
+        scheduler = give_scheduler()
+        scheduler.store_staged_data(give_data(MIDNIGHT, 3), MIDNIGHT - 60)
+        scheduler.update_parameter(give_parameter("MLLW"))
+        self.assertIsNone(scheduler._Data_Retrieve.staged_data)
+        self.assertFalse(scheduler.staged_data_to_be_used(MIDNIGHT))
+        self.assertTrue(scheduler.data_to_be_fetched(False, MIDNIGHT))
+
+    def test_staged_data_cleared_by_later_full_fetch(self):
+        scheduler = give_scheduler()
+        scheduler.store_staged_data(give_data(MIDNIGHT, 3), MIDNIGHT - 60)
+        # data of the day fetched again before midnight : staged data kept
+        scheduler.store_new_data(give_data(MIDNIGHT - 86400, 3), MIDNIGHT - 30)
+        self.assertIsNotNone(scheduler._Data_Retrieve.staged_data)
+        # data of next day fetched after midnight : staged data useless
+        scheduler.store_new_data(give_data(MIDNIGHT, 3), MIDNIGHT + 30)
+        self.assertIsNone(scheduler._Data_Retrieve.staged_data)
+        self.assertFalse(scheduler.staged_data_to_be_used(MIDNIGHT + 60))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,257 @@
+"""Async front end of WorldTides server against a local stub server."""
+# Python library
+import asyncio
+import socket
+import unittest
+from unittest import mock
+
+# PyPy Library
+import aiohttp
+import requests
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+# pyworldtidesinfo library
+from pyworldtidesinfo.worldtidesinfo_server import (
+    PLOT_CURVE_UNIT_M,
+    WorldTidesInfo_server,
+)
+
+# Component library
+from custom_components.worldtidesinfocustom import worldtidesinfo_async_server
+from custom_components.worldtidesinfocustom.worldtidesinfo_async_server import (
+    SERVER_URL,
+    WorldTidesInfo_async_server,
+)
+
+# responses of stub server
+STATION_RESPONSE = {
+    "status": 200,
+    "callCount": 1,
+    "stations": [
+        {"name": "ROYAN", "lat": 45.6, "lon": -1.0, "timezone": "Europe/Paris"}
+    ],
+}
+HEIGHT_RESPONSE = {
+    "status": 200,
+    "callCount": 3,
+    "station": "ROYAN",
+    "responseDatum": "LAT",
+    "heights": [
+        {"dt": 1700000000, "date": "2023-11-14T22:13+0000", "height": 3.1},
+        {"dt": 1700000900, "date": "2023-11-14T22:28+0000", "height": 3.3},
+    ],
+    "extremes": [
+        {"dt": 1700003000, "date": "2023-11-14T23:03+0000", "height": 5.1, "type": "High"}
+    ],
+    "datums": [{"name": "MHWS", "height": 5.2}, {"name": "MLWS", "height": 0.8}],
+    "plot": "data:image/png;base64,iVBORw0KGgo=",
+}
+# request timeout used by tests (s)
+TEST_REQUEST_TIMEOUT = 0.2
+
+
+def give_server(server_url):
+    """give async server front end that queries server_url"""
+    server = WorldTidesInfo_async_server(
+        "KEY",
+        45.6,
+        -1.0,
+        "LAT",
+        50,
+        2,
+        "2,102,255",
+        "255,255,255",
+        PLOT_CURVE_UNIT_M,
+    )
+    server.server_url = server_url
+    return server
+
+
+def give_blocking_server():
+    return WorldTidesInfo_server(
+        "KEY",
+        45.6,
+        -1.0,
+        "LAT",
+        50,
+        2,
+        "2,102,255",
+        "255,255,255",
+        PLOT_CURVE_UNIT_M,
+    )
+
+
+def give_closed_port_url():
+    """give URL of a local port where no server listens"""
+    with socket.socket() as closed_socket:
+        closed_socket.bind(("127.0.0.1", 0))
+        port = closed_socket.getsockname()[1]
+    return "http://127.0.0.1:{}".format(port)
+
+
+class Stub_WorldTides_Server:
+    """WorldTides API answering with a fixed behaviour"""
+
+    def __init__(self):
+        # behaviour : "ok", "error" (HTTP 500), "slow" (beyond timeout)
+        self.behaviour = "ok"
+        self.requests = []
+        self.app = web.Application()
+        self.app.router.add_get("/api/{version}", self.handle)
+
+    async def handle(self, request):
+        self.requests.append(request.query)
+        if self.behaviour == "error":
+            return web.Response(status=500, text="server error")
+        if self.behaviour == "slow":
+            await asyncio.sleep(TEST_REQUEST_TIMEOUT * 5)
+        if "stations" in request.query:
+            return web.json_response(STATION_RESPONSE)
+        return web.json_response(HEIGHT_RESPONSE)
+
+
+class Test_WorldTidesInfo_async_server(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.stub = Stub_WorldTides_Server()
+        self.test_server = TestServer(self.stub.app)
+        await self.test_server.start_server()
+        self.server_url = str(self.test_server.make_url("")).rstrip("/")
+        self.session = aiohttp.ClientSession()
+        timeout_patch = mock.patch.object(
+            worldtidesinfo_async_server,
+            "SERVER_REQUEST_TIMEOUT",
+            TEST_REQUEST_TIMEOUT,
+        )
+        timeout_patch.start()
+        self.addCleanup(timeout_patch.stop)
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.test_server.close()
+
+    async def test_tide_station_received(self):
+        server = give_server(self.server_url)
+        self.assertTrue(await server.async_retrieve_tide_station(self.session))
+        self.assertEqual(server.retrieve_tide_station_raw_data(), STATION_RESPONSE)
+        self.assertEqual(server.retrieve_tide_station_credit(), 1)
+        self.assertIsNone(server.retrieve_tide_station_err_value())
+        self.assertIsNotNone(server.retrieve_tide_station_request_time())
+        self.assertEqual(self.stub.requests[0]["key"], "KEY")
+
+    async def test_tide_height_received(self):
+        server = give_server(self.server_url)
+        self.assertTrue(
+            await server.async_retrieve_tide_height_over_one_day(self.session, True)
+        )
+        self.assertEqual(server.retrieve_tide_raw_data(), HEIGHT_RESPONSE)
+        self.assertEqual(server.retrieve_tide_credit(), 3)
+        self.assertIsNone(server.retrieve_tide_err_value())
+        # prediction + 1 day, datums requested
+        self.assertEqual(self.stub.requests[0]["days"], "3")
+        self.assertIn("datums", self.stub.requests[0])
+
+    async def test_http_error(self):
+        self.stub.behaviour = "error"
+        server = give_server(self.server_url)
+        self.assertFalse(await server.async_retrieve_tide_station(self.session))
+        self.assertIsNone(server.retrieve_tide_station_raw_data())
+        self.assertEqual(server.retrieve_tide_station_credit(), 0)
+        self.assertEqual(server.retrieve_tide_station_err_value(), 500)
+        self.assertFalse(
+            await server.async_retrieve_tide_height_over_one_day(self.session, False)
+        )
+        self.assertIsNone(server.retrieve_tide_raw_data())
+        self.assertEqual(server.retrieve_tide_credit(), 0)
+        self.assertEqual(server.retrieve_tide_err_value(), 500)
+
+    async def test_connection_refused(self):
+        server = give_server(give_closed_port_url())
+        self.assertFalse(await server.async_retrieve_tide_station(self.session))
+        self.assertIsNone(server.retrieve_tide_station_raw_data())
+        self.assertEqual(server.retrieve_tide_station_credit(), 0)
+        self.assertIsNotNone(server.retrieve_tide_station_err_value())
+        self.assertFalse(
+            await server.async_retrieve_tide_height_over_one_day(self.session, False)
+        )
+        self.assertIsNone(server.retrieve_tide_raw_data())
+        self.assertEqual(server.retrieve_tide_credit(), 0)
+        self.assertIsNotNone(server.retrieve_tide_err_value())
+
+    async def test_timeout(self):
+        self.stub.behaviour = "slow"
+        server = give_server(self.server_url)
+        self.assertFalse(await server.async_retrieve_tide_station(self.session))
+        self.assertIsNone(server.retrieve_tide_station_raw_data())
+        self.assertIn("TimeoutError", server.retrieve_tide_station_err_value())
+        self.assertFalse(
+            await server.async_retrieve_tide_height_over_one_day(self.session, False)
+        )
+        self.assertIsNone(server.retrieve_tide_raw_data())
+        self.assertEqual(server.retrieve_tide_credit(), 0)
+        self.assertIn("TimeoutError", server.retrieve_tide_err_value())
+
+    async def _give_blocking_result(self, retrieve):
+        """give fields of blocking server, its requests sent to stub server"""
+        real_get = requests.get
+
+        def stub_get(resource, **kwargs):
+            return real_get(resource.replace(SERVER_URL, self.server_url), **kwargs)
+
+        server = give_blocking_server()
+        with mock.patch.object(requests, "get", stub_get):
+            # blocking call : stub server goes on in event loop
+            await asyncio.get_running_loop().run_in_executor(
+                None, retrieve, server
+            )
+        return server
+
+    async def test_same_raw_data_as_blocking_server(self):
+        for behaviour in ["ok", "error"]:
+            self.stub.behaviour = behaviour
+            blocking_server = await self._give_blocking_result(
+                lambda server: server.retrieve_tide_station()
+            )
+            server = give_server(self.server_url)
+            await server.async_retrieve_tide_station(self.session)
+            self.assertEqual(
+                server.retrieve_tide_station_raw_data(),
+                blocking_server.retrieve_tide_station_raw_data(),
+            )
+            self.assertEqual(
+                server.retrieve_tide_station_credit(),
+                blocking_server.retrieve_tide_station_credit(),
+            )
+            self.assertEqual(
+                server.retrieve_tide_station_err_value(),
+                blocking_server.retrieve_tide_station_err_value(),
+            )
+
+            blocking_server = await self._give_blocking_result(
+                lambda server: server.retrieve_tide_height_over_one_day(True)
+            )
+            server = give_server(self.server_url)
+            await server.async_retrieve_tide_height_over_one_day(self.session, True)
+            self.assertEqual(
+                server.retrieve_tide_raw_data(), blocking_server.retrieve_tide_raw_data()
+            )
+            self.assertEqual(
+                server.retrieve_tide_credit(), blocking_server.retrieve_tide_credit()
+            )
+            self.assertEqual(
+                server.retrieve_tide_err_value(),
+                blocking_server.retrieve_tide_err_value(),
+            )
+
+    async def test_same_request_as_blocking_server(self):
+        await self._give_blocking_result(
+            lambda server: server.retrieve_tide_height_over_one_day(True)
+        )
+        server = give_server(self.server_url)
+        await server.async_retrieve_tide_height_over_one_day(self.session, True)
+        blocking_request, request = self.stub.requests
+        self.assertEqual(dict(request), dict(blocking_request))
+
+
+if __name__ == "__main__":
+    unittest.main()